@@ -0,0 +1,51 @@
+"""
+Throughput of conversion requests of many coroutines: `simplebbox.array` called by every coroutine
+compared with `MicroBatcher` processing the requests in vectorised batches.
+
+    python benchmarks/bench_batching.py
+"""
+import asyncio
+import timeit
+
+import numpy as np
+
+from simplebbox import array
+from simplebbox.batching import MicroBatcher
+
+N_REQUESTS = 20000
+
+
+async def handle_scalar(boxes):
+    await asyncio.sleep(0)
+    return [array.convert(box, "cxcywh_rel", "xyxy", image_wh=(640, 480)) for box in boxes]
+
+
+async def handle_batched(batcher, boxes):
+    await asyncio.sleep(0)
+    return await batcher.convert(boxes, "cxcywh_rel", "xyxy", image_wh=(640, 480))
+
+
+async def scalar(requests):
+    return await asyncio.gather(*[handle_scalar(boxes) for boxes in requests])
+
+
+async def batched(requests):
+    async with MicroBatcher() as batcher:
+        res = await asyncio.gather(*[handle_batched(batcher, boxes) for boxes in requests])
+    return res, batcher.stats()
+
+
+def main():
+    rng = np.random.RandomState(0)
+    print("{:>6} {:>14} {:>14} {:>14}".format("boxes", "scalar, ms", "batched, ms", "requests/batch"))
+    for n_boxes in [1, 4, 16, 64]:
+        requests = rng.uniform(0, 1, size=(N_REQUESTS, n_boxes, 4)).tolist()
+        t_scalar = min(timeit.repeat(lambda: asyncio.run(scalar(requests)), number=1, repeat=3))
+        t_batched = min(timeit.repeat(lambda: asyncio.run(batched(requests)), number=1, repeat=3))
+        stats = asyncio.run(batched(requests))[1]
+        print("{:>6} {:>14.1f} {:>14.1f} {:>14.1f}".format(
+            n_boxes, t_scalar * 1e3, t_batched * 1e3, stats.mean_batch_requests))
+
+
+if __name__ == "__main__":
+    main()
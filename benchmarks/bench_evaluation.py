@@ -0,0 +1,88 @@
+"""
+Compares `simplebbox.evaluation.evaluate` with `COCOeval` of pycocotools on a synthetic dataset.
+
+    python benchmarks/bench_evaluation.py
+"""
+import contextlib
+import io
+import json
+import pathlib
+import tempfile
+import timeit
+
+import numpy as np
+from pycocotools.coco import COCO
+from pycocotools.cocoeval import COCOeval
+
+from simplebbox.evaluation import Detections, GroundTruth, evaluate
+
+N_IMAGES = 500
+N_CATEGORIES = 20
+
+
+def make_dataset(n_images, n_categories, seed=0):
+    """
+    Ground truth of all area ranges with some crowd boxes, noisy detections of it and false detections.
+    """
+    rng = np.random.RandomState(seed)
+    gt_rows, dt_rows = [], []
+    for image in range(1, n_images + 1):
+        for category in range(1, n_categories + 1):
+            for _ in range(rng.poisson(3)):
+                wh = rng.choice([8, 24, 60, 150]) * rng.uniform(0.7, 1.4, size=2)
+                xy = rng.uniform(0, 400, size=2)
+                gt_rows.append((image, category, *xy, *wh, rng.rand() < 0.05))
+                for _ in range(rng.poisson(1.5)):
+                    noise = rng.normal(scale=0.15, size=4) * np.r_[wh, wh]
+                    dt_rows.append((image, category, *(np.r_[xy, wh] + noise), round(rng.uniform(), 1)))
+            for _ in range(rng.poisson(1)):
+                dt_rows.append((image, category, *rng.uniform(0, 400, size=2), *rng.uniform(5, 100, size=2),
+                                round(rng.uniform(), 2)))
+    gt, dt = np.array(gt_rows), np.array(dt_rows)
+    dt[:, 4:6] = np.abs(dt[:, 4:6])
+    ground_truth = GroundTruth(gt[:, 0].astype(int), gt[:, 1].astype(int), gt[:, 2:6], gt[:, 6].astype(bool))
+    detections = Detections(dt[:, 0].astype(int), dt[:, 1].astype(int), dt[:, 2:6], dt[:, 6])
+    return ground_truth, detections
+
+
+def pycocotools_eval(ground_truth, detections, directory):
+    annotations = [{
+        "id": i + 1, "image_id": int(image), "category_id": int(category), "bbox": [float(v) for v in box],
+        "area": float(box[2] * box[3]), "iscrowd": int(crowd),
+    } for i, (image, category, box, crowd) in enumerate(zip(*ground_truth[:4]))]
+    images = sorted(set(ground_truth.image_ids.tolist()) | set(detections.image_ids.tolist()))
+    dataset = {
+        "images": [{"id": i} for i in images], "annotations": annotations,
+        "categories": [{"id": int(c)} for c in np.unique(ground_truth.category_ids)],
+    }
+    results = [{
+        "image_id": int(image), "category_id": int(category), "bbox": [float(v) for v in box], "score": float(score),
+    } for image, category, box, score in zip(*detections)]
+    gt_path, dt_path = directory / "gt.json", directory / "dt.json"
+    gt_path.write_text(json.dumps(dataset))
+    dt_path.write_text(json.dumps(results))
+    with contextlib.redirect_stdout(io.StringIO()):
+        coco_gt = COCO(str(gt_path))
+        coco_eval = COCOeval(coco_gt, coco_gt.loadRes(str(dt_path)), "bbox")
+        coco_eval.evaluate()
+        coco_eval.accumulate()
+        coco_eval.summarize()
+    return coco_eval
+
+
+def main():
+    ground_truth, detections = make_dataset(N_IMAGES, N_CATEGORIES)
+    print("{} images, {} ground truth boxes, {} detections".format(
+        N_IMAGES, len(ground_truth.image_ids), len(detections.image_ids)))
+    with tempfile.TemporaryDirectory() as tmp:
+        start = timeit.default_timer()
+        expected = pycocotools_eval(ground_truth, detections, pathlib.Path(tmp))
+        print("{:<16} {:>10.1f} s".format("pycocotools", timeit.default_timer() - start))
+    start = timeit.default_timer()
+    res = evaluate(ground_truth, detections)
+    print("{:<16} {:>10.1f} s".format("simplebbox", timeit.default_timer() - start))
+    assert np.allclose(res.stats, expected.stats, rtol=0, atol=1e-12)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Scaling of `bbox_numpy.fuse_boxes` compared with weighted box fusion looping over the clusters in Python.
+
+    python benchmarks/bench_fusion.py
+"""
+import timeit
+
+import numpy as np
+
+from simplebbox.numpy_array import bbox_numpy
+
+N_MODELS = 5
+
+
+def ensemble(n_objects, rng):
+    """
+    Predictions of `N_MODELS` models for a batch of 1000 x 1000 images with 100 objects of 10 classes each.
+    """
+    xy = rng.uniform(0, 1000, size=(n_objects, 2))
+    objects = np.concatenate([xy, xy + rng.uniform(10, 60, size=(n_objects, 2))], axis=1)
+    boxes = np.concatenate([objects + rng.normal(scale=2, size=objects.shape) for _ in range(N_MODELS)])
+    # class and image ids combined into one label
+    labels = np.tile(rng.randint(0, 10, size=n_objects) + 10 * (np.arange(n_objects) // 100), N_MODELS)
+    return boxes, rng.uniform(size=len(boxes)), labels
+
+
+def loop_wbf(boxes, scores, labels, iou_threshold=0.55):
+    """
+    Weighted box fusion as usually implemented: every box is compared with all fused boxes of its label.
+    """
+    fused = {}
+    for i in np.argsort(-scores):
+        clusters = fused.setdefault(labels[i], [])
+        if clusters:
+            leaders = np.array([c[0] for c in clusters])
+            iou = bbox_numpy.iou(boxes[leaders], boxes[i])
+            j = int(np.argmax(iou > iou_threshold))
+            if iou[j] > iou_threshold:
+                clusters[j].append(i)
+                continue
+        clusters.append([i])
+    res = []
+    for clusters in fused.values():
+        for c in clusters:
+            res.append((boxes[c] * scores[c, None]).sum(axis=0) / scores[c].sum())
+    return np.array(res)
+
+
+def main():
+    rng = np.random.RandomState(0)
+    print("{:>8} {:>14} {:>14}".format("boxes", "loop, ms", "fuse_boxes, ms"))
+    for n_objects in [200, 2000, 20000]:
+        boxes, scores, labels = ensemble(n_objects, rng)
+        t = min(timeit.repeat(lambda: bbox_numpy.fuse_boxes(boxes, scores, labels, n_models=N_MODELS),
+                              number=1, repeat=3))
+        loop = "-"
+        if n_objects <= 2000:
+            loop = "{:.1f}".format(min(timeit.repeat(lambda: loop_wbf(boxes, scores, labels), number=1,
+                                                     repeat=3)) * 1e3)
+        print("{:>8} {:>14} {:>14.1f}".format(len(boxes), loop, t * 1e3))
+
+
+if __name__ == "__main__":
+    main()
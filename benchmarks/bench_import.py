@@ -0,0 +1,51 @@
+"""
+Measures import time of `simplebbox` and of its first conversions in fresh interpreters,
+and checks that backends are imported only when they are used.
+
+    python benchmarks/bench_import.py
+"""
+import subprocess
+import sys
+
+REPEAT = 5
+CASES = [
+    ("import simplebbox", "import simplebbox", []),
+    ("convert a list", "import simplebbox; simplebbox.convert([1, 2, 3, 4], 'xywh', 'xyxy')", []),
+    ("convert a numpy array",
+     "import numpy, simplebbox; simplebbox.convert(numpy.ones((1, 4)), 'xywh', 'xyxy')", ["numpy"]),
+    ("convert a torch tensor",
+     "import torch, simplebbox; simplebbox.convert(torch.ones(1, 4), 'xywh', 'xyxy')", ["numpy", "torch"]),
+]
+
+TIMER = """
+import sys, time
+start = time.perf_counter()
+{code}
+elapsed = time.perf_counter() - start
+print(elapsed, ",".join(m for m in ("numpy", "torch") if m in sys.modules))
+"""
+
+
+def measure(code):
+    times = []
+    for _ in range(REPEAT):
+        out = subprocess.run([sys.executable, "-c", TIMER.format(code=code)], check=True, capture_output=True,
+                             text=True).stdout.split()
+        times.append(float(out[0]))
+    return min(times), out[1].split(",") if len(out) > 1 else []
+
+
+def main():
+    print("{:<28} {:>10}  {}".format("case", "time, ms", "backends imported"))
+    failed = False
+    for name, code, allowed in CASES:
+        elapsed, imported = measure(code)
+        unexpected = sorted(set(imported) - set(allowed))
+        failed |= bool(unexpected)
+        print("{:<28} {:>10.1f}  {}{}".format(name, elapsed * 1e3, ", ".join(imported) or "-",
+                                              "  UNEXPECTED: " + ", ".join(unexpected) if unexpected else ""))
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""
+Overhead of `simplebbox.instrumentation` on small conversions: disabled, enabled, enabled with a hook.
+
+    python benchmarks/bench_instrumentation.py
+"""
+import timeit
+
+import numpy as np
+
+from simplebbox import array, instrumentation
+from simplebbox.numpy_array import bbox_numpy
+
+N = 100000
+
+
+def hook(record):
+    pass
+
+
+def main():
+    boxes = np.random.RandomState(0).uniform(size=(16, 4))
+    box = [1., 2., 3., 4.]
+    calls = [
+        ("bbox_numpy.convert", lambda: bbox_numpy.convert(boxes, "cxcywh", "xyxy")),
+        ("array.convert", lambda: array.convert(box, "cxcywh", "xyxy")),
+    ]
+    print("{:<20} {:>12} {:>12} {:>12}".format("function", "disabled, us", "enabled, us", "hook, us"))
+    for name, call in calls:
+        times = []
+        for mode in ["disabled", "enabled", "hook"]:
+            if mode != "disabled":
+                instrumentation.enable()
+            if mode == "hook":
+                instrumentation.add_hook(hook)
+            times.append(min(timeit.repeat(call, number=N, repeat=3)) / N * 1e6)
+            instrumentation.disable()
+            if mode == "hook":
+                instrumentation.remove_hook(hook)
+        print("{:<20} {:>12.2f} {:>12.2f} {:>12.2f}".format(name, *times))
+
+
+if __name__ == "__main__":
+    main()
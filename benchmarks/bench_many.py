@@ -0,0 +1,39 @@
+"""
+Compares the batch functions of `simplebbox.array` with a comprehension over the single-box functions.
+
+    python benchmarks/bench_many.py
+"""
+import random
+import timeit
+
+import simplebbox.array as bbox_array
+
+N = 100000
+WH = (640, 480)
+CASES = [
+    ("x0y0wh_to_x0y0x1y1", (), ()),
+    ("x0y0x1y1_to_x0y0wh", (), ()),
+    ("cxcywh_to_x0y0wh", (), ()),
+    ("cxcywh_to_x0y0wh", (round,), (round,)),
+    ("cxcywh_to_x0y0x1y1", (), ()),
+    ("cxcywh_to_x0y0x1y1_int_div", (), ()),
+    ("xyxy_abs_to_rel", (WH,), (WH,)),
+    ("xyxy_rel_to_abs", (WH,), (WH,)),
+]
+
+
+def main():
+    boxes = [[random.randint(0, 500), random.randint(0, 500), random.randint(1, 100), random.randint(1, 100)]
+             for _ in range(N)]
+    print("{:<40} {:>14} {:>14} {:>8}".format("function", "single, ms", "many, ms", "speedup"))
+    for name, single_args, many_args in CASES:
+        single = getattr(bbox_array, name)
+        many = getattr(bbox_array, name + "_many")
+        t_single = min(timeit.repeat(lambda: [single(b, *single_args) for b in boxes], number=1, repeat=5))
+        t_many = min(timeit.repeat(lambda: many(boxes, *many_args), number=1, repeat=5))
+        label = name + ("({})".format(single_args[0].__name__) if single_args and callable(single_args[0]) else "")
+        print("{:<40} {:>14.1f} {:>14.1f} {:>7.1f}x".format(label, t_single * 1e3, t_many * 1e3, t_single / t_many))
+
+
+if __name__ == "__main__":
+    main()
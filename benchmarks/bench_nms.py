@@ -0,0 +1,58 @@
+"""
+Throughput of `bbox_numpy.nms` compared with a naive reference building the full IoU matrix.
+
+    python benchmarks/bench_nms.py
+"""
+import timeit
+
+import numpy as np
+
+from simplebbox.numpy_array import bbox_numpy
+
+
+def naive_nms(boxes, scores, iou_threshold):
+    iou = bbox_numpy.iou_matrix(boxes, boxes)
+    order = np.argsort(-scores)
+    suppressed = np.zeros(len(boxes), dtype=bool)
+    keep = []
+    for i in order:
+        if suppressed[i]:
+            continue
+        keep.append(i)
+        suppressed |= iou[i] > iou_threshold
+    return np.array(keep)
+
+
+def make_boxes(n, n_objects, rng):
+    """
+    Candidates scattered around `n_objects` objects, as produced by a detector before NMS.
+    """
+    centers = rng.uniform(0, 4000, size=(n_objects, 2))
+    sizes = rng.uniform(10, 100, size=(n_objects, 2))
+    owner = rng.randint(0, n_objects, size=n)
+    cxcy = centers[owner] + rng.normal(0, 3, size=(n, 2))
+    wh = sizes[owner] * rng.uniform(0.9, 1.1, size=(n, 2))
+    boxes = bbox_numpy.convert(np.concatenate([cxcy, wh], axis=1), "cxcywh", "x0y0x1y1")
+    return boxes, rng.uniform(size=n)
+
+
+def main():
+    rng = np.random.RandomState(0)
+    print("{:>8} {:>8} {:>8} {:>14} {:>14}".format("boxes", "objects", "kept", "naive, box/s", "nms, box/s"))
+    # the last cases are sparse scenes where almost every box is kept
+    for n, n_objects in [(1000, 50), (5000, 200), (5000, 2000), (20000, 500), (50000, 1000), (5000, 5000),
+                         (20000, 20000)]:
+        boxes, scores = make_boxes(n, n_objects, rng)
+        keep = bbox_numpy.nms(boxes, scores, 0.5)
+        t_nms = min(timeit.repeat(lambda: bbox_numpy.nms(boxes, scores, 0.5), number=1, repeat=3))
+        if n <= 5000:
+            assert np.array_equal(keep, naive_nms(boxes, scores, 0.5))
+            t_naive = min(timeit.repeat(lambda: naive_nms(boxes, scores, 0.5), number=1, repeat=3))
+            naive = "{:>14.0f}".format(n / t_naive)
+        else:
+            naive = "{:>14}".format("skipped")
+        print("{:>8} {:>8} {:>8} {} {:>14.0f}".format(n, n_objects, len(keep), naive, n / t_nms))
+
+
+if __name__ == "__main__":
+    main()
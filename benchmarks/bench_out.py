@@ -0,0 +1,49 @@
+"""
+Compares allocating conversions of `bbox_numpy` with writing into a preallocated `out` array.
+
+Prints time and peak memory allocated per call, as traced by `tracemalloc`.
+
+    python benchmarks/bench_out.py
+"""
+import timeit
+import tracemalloc
+
+import numpy as np
+
+from simplebbox.numpy_array import bbox_numpy
+
+N = 100000
+CONVERSIONS = [
+    "x0y0wh_to_x0y0x1y1",
+    "x0y0x1y1_to_x0y0wh",
+    "cxcywh_to_x0y0wh",
+    "cxcywh_to_x0y0x1y1",
+]
+
+
+def peak_bytes(fn):
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    start, _ = tracemalloc.get_traced_memory()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak - start
+
+
+def main():
+    boxes = np.random.rand(N, 4) * 100
+    out = np.empty_like(boxes)
+    print("{:<22} {:>12} {:>14} {:>12} {:>14}".format(
+        "conversion", "alloc, us", "alloc, bytes", "out=, us", "out=, bytes"))
+    for name in CONVERSIONS:
+        fn = getattr(bbox_numpy, name)
+        results = []
+        for call in (lambda: fn(boxes), lambda: fn(boxes, out=out)):
+            seconds = min(timeit.repeat(call, number=20, repeat=5)) / 20
+            results += [seconds * 1e6, peak_bytes(call)]
+        print("{:<22} {:>12.1f} {:>14d} {:>12.1f} {:>14d}".format(name, *results))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""
+Scaling of `simplebbox.parallel.convert_files` with the number of worker processes.
+
+Generates a synthetic YOLO dataset in a temporary directory and converts it to Pascal VOC.
+
+    python benchmarks/bench_parallel.py [n_files]
+"""
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+from simplebbox.parallel import convert_files, list_annotation_files
+
+
+def make_dataset(directory, n_files, boxes_per_file, rng):
+    for i in range(n_files):
+        boxes = rng.uniform(0.05, 0.5, size=(boxes_per_file, 4))
+        classes = rng.randint(0, 10, size=boxes_per_file)
+        with open(os.path.join(directory, "{:07d}.txt".format(i)), "w") as f:
+            f.writelines("{} {:.6f} {:.6f} {:.6f} {:.6f}\n".format(c, *b) for c, b in zip(classes, boxes))
+
+
+def main():
+    n_files = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    rng = np.random.RandomState(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        src = os.path.join(tmp, "yolo")
+        os.makedirs(src)
+        make_dataset(src, n_files, 50, rng)
+        paths = list_annotation_files(src, "yolo")
+        print("{:>8} {:>12} {:>10}".format("workers", "boxes/s", "speedup"))
+        baseline = None
+        workers = 1
+        while workers <= (os.cpu_count() or 1):
+            stats = convert_files(paths, "yolo", "voc", output_dir=os.path.join(tmp, "voc{}".format(workers)),
+                                  max_workers=workers, read_options={"image_wh": (640, 480)})
+            baseline = baseline or stats.boxes_per_second
+            print("{:>8} {:>12.0f} {:>9.2f}x".format(workers, stats.boxes_per_second,
+                                                     stats.boxes_per_second / baseline))
+            workers *= 2
+
+
+if __name__ == "__main__":
+    main()
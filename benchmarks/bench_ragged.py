@@ -0,0 +1,46 @@
+"""
+Compares ragged batch conversions of `bbox_numpy` with a loop over the images of the batch.
+
+    python benchmarks/bench_ragged.py
+"""
+import timeit
+
+import numpy as np
+
+from simplebbox.numpy_array import bbox_numpy
+
+N_IMAGES = 10000
+MAX_BOXES = 50
+
+
+def main():
+    rng = np.random.RandomState(0)
+    counts = rng.randint(0, MAX_BOXES, size=N_IMAGES)
+    offsets = np.concatenate([[0], np.cumsum(counts)])
+    image_wh = rng.randint(100, 2000, size=(N_IMAGES, 2))
+    boxes = rng.uniform(0, 1000, size=(offsets[-1], 4))
+
+    def loop(fn, *args):
+        return [fn(boxes[offsets[i]:offsets[i + 1]], *args, image_wh[i]) for i in range(N_IMAGES)]
+
+    cases = [
+        ("xyxy_abs_to_rel",
+         lambda: loop(bbox_numpy.xyxy_abs_to_rel),
+         lambda: bbox_numpy.xyxy_abs_to_rel_ragged(boxes, offsets, image_wh)),
+        ("convert xyxy -> cxcywh_rel",
+         lambda: loop(bbox_numpy.convert, "xyxy", "cxcywh_rel"),
+         lambda: bbox_numpy.convert_ragged(boxes, offsets, "xyxy", "cxcywh_rel", image_wh)),
+        ("clip",
+         lambda: loop(bbox_numpy.clip),
+         lambda: bbox_numpy.clip_ragged(boxes, offsets, image_wh)),
+    ]
+    print("{} images, {} boxes".format(N_IMAGES, offsets[-1]))
+    print("{:<30} {:>12} {:>12} {:>8}".format("function", "loop, ms", "ragged, ms", "speedup"))
+    for name, per_image, ragged in cases:
+        t_loop = min(timeit.repeat(per_image, number=1, repeat=5))
+        t_ragged = min(timeit.repeat(ragged, number=1, repeat=5))
+        print("{:<30} {:>12.1f} {:>12.1f} {:>7.1f}x".format(name, t_loop * 1e3, t_ragged * 1e3, t_loop / t_ragged))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Compares `bbox_numpy.sanitize` with the sequence of clipping and filtering steps it replaces.
+
+    python benchmarks/bench_sanitize.py
+"""
+import timeit
+import tracemalloc
+
+import numpy as np
+
+from simplebbox.numpy_array import bbox_numpy
+
+N = 1000000
+IMAGE_WH = np.array([640, 480])
+
+
+def separate_steps(cxcywh):
+    boxes = bbox_numpy.cxcywh_to_x0y0x1y1(cxcywh)
+    boxes = bbox_numpy.clip(boxes, IMAGE_WH)
+    boxes = boxes[~np.isnan(boxes).any(axis=1)]
+    wh = boxes[:, 2:] - boxes[:, :2]
+    boxes = boxes[(wh > 0).all(axis=1)]
+    wh = boxes[:, 2:] - boxes[:, :2]
+    return boxes[(wh >= 4).all(axis=1)]
+
+
+def sanitize(cxcywh):
+    return bbox_numpy.sanitize(cxcywh, IMAGE_WH, min_size=4, fmt="cxcywh")[0]
+
+
+def peak_bytes(fn, arg):
+    tracemalloc.start()
+    fn(arg)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+def main():
+    rng = np.random.RandomState(0)
+    cxcywh = np.concatenate([rng.uniform(-50, 700, size=(N, 2)), rng.uniform(-5, 100, size=(N, 2))], axis=1)
+    cxcywh[rng.rand(N) < 0.01, 0] = np.nan
+    assert np.allclose(separate_steps(cxcywh), bbox_numpy.convert(sanitize(cxcywh), "cxcywh", "xyxy"))
+    print("{:<16} {:>10} {:>14}".format("variant", "time, ms", "peak, MB"))
+    for name, fn in [("separate steps", separate_steps), ("sanitize", sanitize)]:
+        t = min(timeit.repeat(lambda: fn(cxcywh), number=1, repeat=5))
+        print("{:<16} {:>10.1f} {:>14.1f}".format(name, t * 1e3, peak_bytes(fn, cxcywh) / 2 ** 20))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Throughput of converted boxes returned by torch `DataLoader` workers: arrays pickled by the loader
+compared with handles of slots of a `SharedBoxPool`.
+
+    python benchmarks/bench_shared_memory.py
+"""
+import pathlib
+import sys
+import timeit
+import warnings
+
+import numpy as np
+import torch
+from torch.utils.data import DataLoader, Dataset
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
+
+from simplebbox.numpy_array import bbox_numpy  # noqa: E402
+from simplebbox.shared_memory import SharedBoxPool  # noqa: E402
+
+warnings.filterwarnings("ignore", message="This DataLoader will create")
+
+N_ITEMS = 200
+N_WORKERS = 2
+
+
+class Boxes(Dataset):
+    """
+    Items of `n_boxes` boxes converted from cxcywh to x0y0x1y1, returned as arrays or written into the pool.
+    """
+
+    def __init__(self, n_boxes, pool=None):
+        self.boxes = np.random.RandomState(0).uniform(1, 500, size=(n_boxes, 4)).astype(np.float32)
+        self.pool = pool
+
+    def __len__(self):
+        return N_ITEMS
+
+    def __getitem__(self, index):
+        if self.pool is None:
+            return bbox_numpy.cxcywh_to_x0y0x1y1(self.boxes)
+        return self.pool.write(self.boxes, src="cxcywh", dst="x0y0x1y1")
+
+
+def identity(item):
+    return item
+
+
+def consume_arrays(n_boxes):
+    loader = DataLoader(Boxes(n_boxes), batch_size=None, num_workers=N_WORKERS, collate_fn=identity)
+    return sum(float(torch.from_numpy(boxes)[0, 0]) for boxes in loader)
+
+
+def consume_pool(n_boxes):
+    with SharedBoxPool(n_slots=4 * N_WORKERS + 2, slot_boxes=n_boxes) as pool:
+        loader = DataLoader(Boxes(n_boxes, pool), batch_size=None, num_workers=N_WORKERS, collate_fn=identity)
+        total = 0.
+        for handle in loader:
+            with pool.borrow(handle, as_tensor=True) as boxes:
+                total += float(boxes[0, 0])
+        return total
+
+
+def main():
+    print("{:>10} {:>18} {:>18}".format("boxes", "pickle, Mboxes/s", "pool, Mboxes/s"))
+    for n_boxes in [1000, 100000, 1000000]:
+        assert consume_arrays(n_boxes) == consume_pool(n_boxes)
+        t_pickle = min(timeit.repeat(lambda: consume_arrays(n_boxes), number=1, repeat=3))
+        t_pool = min(timeit.repeat(lambda: consume_pool(n_boxes), number=1, repeat=3))
+        total = N_ITEMS * n_boxes / 1e6
+        print("{:>10} {:>18.1f} {:>18.1f}".format(n_boxes, total / t_pickle, total / t_pool))
+
+
+if __name__ == "__main__":
+    main()
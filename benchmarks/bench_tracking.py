@@ -0,0 +1,75 @@
+"""
+Per-frame latency of `IoUTracker` on synthetic sequences compared with association by a full IoU matrix
+and a greedy assignment in Python.
+
+    python benchmarks/bench_tracking.py
+"""
+import timeit
+
+import numpy as np
+
+from simplebbox.numpy_array import bbox_numpy
+from simplebbox.tracking import IoUTracker
+
+N_FRAMES = 50
+
+
+def sequence(n, rng):
+    """
+    Frames of `n` objects moving over a 10000 x 10000 scene, with noise, missed detections and false positives.
+    """
+    xy = rng.uniform(0, 10000, size=(n, 2))
+    wh = rng.uniform(20, 80, size=(n, 2))
+    velocity = rng.uniform(-5, 5, size=(n, 2))
+    for frame in range(N_FRAMES):
+        p = xy + velocity * frame
+        boxes = np.concatenate([p, p + wh], axis=1) + rng.normal(scale=1, size=(n, 4))
+        boxes = boxes[rng.rand(n) > 0.05]
+        noise = rng.uniform(0, 10000, size=(n // 20, 2))
+        boxes = np.concatenate([boxes, np.concatenate([noise, noise + 40], axis=1)])
+        yield boxes, rng.uniform(0.2, 1, size=len(boxes))
+
+
+def full_matrix_update(tracks, boxes, iou_threshold=0.3):
+    """
+    Association as done without the tracker: the full IoU matrix and a greedy loop over the sorted pairs.
+    """
+    if len(tracks):
+        iou = bbox_numpy.iou_matrix(boxes, tracks)
+        rows, cols = np.nonzero(iou > iou_threshold)
+        used_rows, used_cols = set(), set()
+        for i in np.argsort(-iou[rows, cols]):
+            if rows[i] not in used_rows and cols[i] not in used_cols:
+                used_rows.add(rows[i])
+                used_cols.add(cols[i])
+    return boxes
+
+
+def latencies(update, frames):
+    res = []
+    for boxes, scores in frames:
+        start = timeit.default_timer()
+        update(boxes, scores)
+        res.append(timeit.default_timer() - start)
+    return np.array(res[1:]) * 1e3
+
+
+def main():
+    print("{:>8} {:>22} {:>22}".format("objects", "tracker p50/p99, ms", "full matrix p50/p99, ms"))
+    for n in [100, 1000, 5000]:
+        frames = list(sequence(n, np.random.RandomState(0)))
+        tracker = IoUTracker(min_hits=1)
+        t = latencies(tracker.update, frames)
+        state = [np.empty((0, 4))]
+
+        def baseline(boxes, scores):
+            state[0] = full_matrix_update(state[0], boxes)
+
+        b = latencies(baseline, frames)
+        print("{:>8} {:>22} {:>22}".format(
+            n, "{:.2f} / {:.2f}".format(*np.percentile(t, [50, 99])),
+            "{:.2f} / {:.2f}".format(*np.percentile(b, [50, 99]))))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""
+Compares a composed `simplebbox.transforms` chain with applying the augmentation steps to boxes one by one.
+
+    python benchmarks/bench_transforms.py
+"""
+import timeit
+
+import numpy as np
+
+from simplebbox import transforms as T
+from simplebbox.numpy_array import bbox_numpy
+
+N = 1000000
+SRC_WH = np.array([1280, 720])
+DST_WH = np.array([640, 640])
+
+
+def step_by_step(cxcywh):
+    boxes = bbox_numpy.cxcywh_to_x0y0x1y1(cxcywh)
+    s = min(DST_WH / SRC_WH)
+    boxes = boxes * s
+    boxes[:, [1, 3]] += (DST_WH[1] - SRC_WH[1] * s) / 2
+    boxes = np.stack([DST_WH[0] - boxes[:, 2], boxes[:, 1], DST_WH[0] - boxes[:, 0], boxes[:, 3]], axis=1)
+    boxes = boxes - [32, 32, 32, 32]
+    return bbox_numpy.xyxy_abs_to_rel(bbox_numpy.x0y0x1y1_to_x0y0wh(boxes), np.array([576, 576]))
+
+
+def main():
+    rng = np.random.RandomState(0)
+    cxcywh = np.concatenate([rng.uniform(0, 700, size=(N, 2)), rng.uniform(1, 100, size=(N, 2))], axis=1)
+    chain = T.compose(T.letterbox(SRC_WH, DST_WH), T.hflip(DST_WH[0]), T.crop(32, 32, 576, 576))
+    fused = lambda: chain.apply(cxcywh, src="cxcywh", dst="xywh_rel")  # noqa: E731
+    assert np.allclose(fused(), step_by_step(cxcywh))
+    t_steps = min(timeit.repeat(lambda: step_by_step(cxcywh), number=1, repeat=5))
+    t_fused = min(timeit.repeat(fused, number=1, repeat=5))
+    print("{} boxes: step by step {:.1f} ms, composed {:.1f} ms, {:.1f}x".format(
+        N, t_steps * 1e3, t_fused * 1e3, t_steps / t_fused))
+
+
+if __name__ == "__main__":
+    main()
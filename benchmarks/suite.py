@@ -0,0 +1,240 @@
+"""
+Benchmark suite of the conversions of all backends: `simplebbox.array`, `bbox_numpy` and `bbox_torch`.
+
+Every conversion is run for every backend, batch size, dtype and memory layout (contiguous or strided rows).
+Prints boxes per second and bytes allocated per call, and stores the results as JSON named by the commit,
+so that runs of different commits can be compared.
+
+    python benchmarks/suite.py --quick
+    python benchmarks/suite.py --compare benchmarks/results/<old commit>.json
+
+With `--compare` the exit status is 1 if any case is slower than `--threshold` times the old time.
+
+Bytes are the peak of memory traced by `tracemalloc` for lists and numpy and the total size of tensors
+created by the torch operators, or null for torch versions without the dispatch mode used to count them.
+Lists are benchmarked up to `--max-list-size` boxes and only contiguous, with Python ints for int32
+and floats for float64.
+"""
+import argparse
+import json
+import pathlib
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import torch
+
+try:
+    # private torch APIs, allocations of torch are not measured without them
+    from torch.utils._python_dispatch import TorchDispatchMode
+    from torch.utils._pytree import tree_leaves
+except ImportError:
+    TorchDispatchMode = None
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
+
+from simplebbox import array  # noqa: E402
+from simplebbox.numpy_array import bbox_numpy  # noqa: E402
+from simplebbox.torch_tensor import bbox_torch  # noqa: E402
+
+SIZES = (1, 100, 10000, 1000000, 10000000)
+QUICK_SIZES = (1, 100, 10000)
+DTYPES = ("int32", "float32", "float64")
+BACKENDS = ("list", "numpy", "torch")
+LAYOUTS = ("contiguous", "strided")
+WH = (640, 480)
+# conversion name, arguments after the boxes, name of the batch function of `simplebbox.array`
+CONVERSIONS = (
+    ("x0y0wh_to_x0y0x1y1", (), "x0y0wh_to_x0y0x1y1_many"),
+    ("x0y0x1y1_to_x0y0wh", (), "x0y0x1y1_to_x0y0wh_many"),
+    ("cxcywh_to_x0y0wh", (), "cxcywh_to_x0y0wh_many"),
+    ("cxcywh_to_x0y0wh_int_div", (), "cxcywh_to_x0y0wh_int_div_many"),
+    ("cxcywh_to_x0y0x1y1", (), "cxcywh_to_x0y0x1y1_many"),
+    ("cxcywh_to_x0y0x1y1_int_div", (), "cxcywh_to_x0y0x1y1_int_div_many"),
+    ("xyxy_abs_to_rel", ("wh",), "xyxy_abs_to_rel_many"),
+    ("xyxy_rel_to_abs", ("wh",), "xyxy_rel_to_abs_many"),
+    ("convert", ("cxcywh", "xyxy_rel", "wh"), None),
+)
+
+
+if TorchDispatchMode is not None:
+    class _AllocationCounter(TorchDispatchMode):
+        """
+        Sums the sizes of the storages of tensors created by torch operators, not counting views and in-place results.
+        """
+
+        def __init__(self):
+            super().__init__()
+            self.bytes = 0
+
+        def __torch_dispatch__(self, func, types, args=(), kwargs=None):
+            res = func(*args, **(kwargs or {}))
+            inputs = {t.untyped_storage().data_ptr() for t in tree_leaves((args, kwargs))
+                      if isinstance(t, torch.Tensor)}
+            for t in tree_leaves(res):
+                if isinstance(t, torch.Tensor) and t.untyped_storage().data_ptr() not in inputs:
+                    self.bytes += t.untyped_storage().nbytes()
+            return res
+
+
+def make_boxes(backend, dtype, layout, size, rng):
+    values = rng.uniform(1, 500, size=(2 * size if layout == "strided" else size, 4))
+    values = values.astype(dtype)
+    if layout == "strided":
+        values = values[::2]
+    if backend == "numpy":
+        return values
+    if backend == "torch":
+        return torch.from_numpy(values)
+    return values.tolist()
+
+
+def make_call(backend, name, args, many, boxes, dtype):
+    if backend == "list":
+        wh = WH
+        args = tuple(wh if a == "wh" else a for a in args)
+        if many is not None:
+            fn = getattr(array, many)
+            return lambda: fn(boxes, *args)
+        fn = getattr(array, name)
+        return lambda: [fn(box, *args) for box in boxes]
+    processor = bbox_numpy if backend == "numpy" else bbox_torch
+    wh = np.array(WH, dtype=dtype) if backend == "numpy" else torch.tensor(WH, dtype=getattr(torch, dtype))
+    args = tuple(wh if a == "wh" else a for a in args)
+    fn = getattr(processor, name)
+    return lambda: fn(boxes, *args)
+
+
+def seconds_per_call(call, min_time):
+    call()
+    times = []
+    while sum(times) < min_time or len(times) < 3:
+        start = time.perf_counter()
+        call()
+        times.append(time.perf_counter() - start)
+        if len(times) >= 10000:
+            break
+    return min(times)
+
+
+def bytes_per_call(backend, call):
+    if backend == "torch":
+        if TorchDispatchMode is None:
+            return None
+        with _AllocationCounter() as counter:
+            call()
+        return counter.bytes
+    tracemalloc.start()
+    try:
+        call()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def commit():
+    try:
+        sha = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True)
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], capture_output=True,
+                               text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+    return sha.stdout.strip() + ("-dirty" if dirty.stdout.strip() else "")
+
+
+def cases(sizes, max_list_size, name_filter):
+    for name, args, many in CONVERSIONS:
+        if name_filter and name_filter not in name:
+            continue
+        for backend in BACKENDS:
+            for dtype in DTYPES:
+                if backend == "list" and dtype == "float32":
+                    continue
+                for layout in LAYOUTS:
+                    if backend == "list" and layout == "strided":
+                        continue
+                    for size in sizes:
+                        if backend == "list" and size > max_list_size:
+                            continue
+                        yield name, args, many, backend, dtype, layout, size
+
+
+def key(record):
+    return record["conversion"], record["backend"], record["dtype"], record["layout"], record["size"]
+
+
+def run(args):
+    rng = np.random.RandomState(0)
+    records = []
+    header = "{:<28} {:<6} {:<8} {:<10} {:>9} {:>14} {:>14}".format(
+        "conversion", "backend", "dtype", "layout", "size", "boxes/s", "bytes/call")
+    print(header)
+    for name, conversion_args, many, backend, dtype, layout, size in cases(args.sizes, args.max_list_size,
+                                                                           args.filter):
+        boxes = make_boxes(backend, dtype, layout, size, rng)
+        call = make_call(backend, name, conversion_args, many, boxes, dtype)
+        seconds = seconds_per_call(call, args.min_time)
+        record = {
+            "conversion": name, "backend": backend, "dtype": dtype, "layout": layout, "size": size,
+            "seconds": seconds, "boxes_per_second": size / seconds, "bytes": bytes_per_call(backend, call),
+        }
+        records.append(record)
+        print("{:<28} {:<6} {:<8} {:<10} {:>9} {:>14.4g} {:>14}".format(
+            name, backend, dtype, layout, size, record["boxes_per_second"],
+            "n/a" if record["bytes"] is None else record["bytes"]))
+        del boxes, call
+    return records
+
+
+def compare(records, path, threshold):
+    old = {key(r): r for r in json.loads(pathlib.Path(path).read_text())["results"]}
+    print("\nComparison with {} (time ratio new / old, regressions above {:.2f}):".format(path, threshold))
+    regressions = 0
+    for record in records:
+        previous = old.get(key(record))
+        if previous is None:
+            continue
+        ratio = record["seconds"] / previous["seconds"]
+        if ratio > threshold:
+            regressions += 1
+            print("{:<28} {:<6} {:<8} {:<10} {:>9} {:>8.2f}x slower".format(*key(record), ratio))
+    print("{} regressions out of {} compared cases".format(regressions, sum(key(r) in old for r in records)))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=lambda s: tuple(int(v) for v in s.split(",")), default=SIZES,
+                        help="comma separated batch sizes")
+    parser.add_argument("--quick", action="store_const", dest="sizes", const=QUICK_SIZES,
+                        help="only sizes " + ",".join(map(str, QUICK_SIZES)))
+    parser.add_argument("--max-list-size", type=int, default=100000)
+    parser.add_argument("--filter", default="", help="run conversions with names containing the string")
+    parser.add_argument("--min-time", type=float, default=0.2, help="minimal time in seconds spent per case")
+    parser.add_argument("--output", help="JSON file of the results, benchmarks/results/<commit>.json by default")
+    parser.add_argument("--compare", help="JSON file of results of another run")
+    parser.add_argument("--threshold", type=float, default=1.2, help="time ratio reported as a regression")
+    args = parser.parse_args(argv)
+
+    records = run(args)
+    sha = commit()
+    output = pathlib.Path(args.output or pathlib.Path(__file__).parent / "results" / "{}.json".format(sha))
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps({
+        "commit": sha,
+        "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "machine": {"python": platform.python_version(), "platform": platform.platform(),
+                    "processor": platform.processor(), "numpy": np.__version__, "torch": torch.__version__},
+        "results": records,
+    }, indent=1))
+    print("\nResults written to {}".format(output))
+    if args.compare and compare(records, args.compare, args.threshold):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
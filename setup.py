@@ -31,6 +31,11 @@ setup(
         'Programming Language :: Python :: 3.8',
     ],
     description="Functions for bounding box processing",
+    entry_points={
+        'console_scripts': [
+            'simplebbox-convert=simplebbox.cli:main',
+        ],
+    },
     install_requires=requirements,
     license="MIT license",
     long_description=readme + '\n\n' + history,
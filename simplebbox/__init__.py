@@ -3,3 +3,11 @@
 __author__ = """Sergey Matyunin"""
 __email__ = 'serge-m@users.noreply.github.com'
 __version__ = '0.0.10'
+
+import os  # noqa: E402
+
+from simplebbox.backends import convert, get_backend, register_backend  # noqa: E402,F401
+
+if os.environ.get("SIMPLEBBOX_INSTRUMENTATION", "") not in ("", "0"):
+    from simplebbox import instrumentation
+    instrumentation.enable()
@@ -1,14 +1,204 @@
+import copy
+import math
+
+from simplebbox._formats import compile_plan, is_integral, parse_format
+
+
 def atleast_2d(x):
     if x.ndim == 1:
         return x.reshape(1, *x.shape)
     return x
 
 
+def _target(arr, out, inplace):
+    """
+    Returns the array the result has to be written to, or None if a new array must be allocated.
+    """
+    if inplace:
+        if out is not None:
+            raise ValueError("`out` and `inplace=True` cannot be used together")
+        return arr
+    if out is not None and tuple(out.shape) != tuple(arr.shape):
+        raise ValueError("`out` must have shape {}, got {}".format(tuple(arr.shape), tuple(out.shape)))
+    return out
+
+
+PRECISIONS = ("preserve", "float16", "float32", "float64", "int16", "int32", "int64")
+ROUNDINGS = ("round", "floor", "ceil", "trunc")
+
+
 class ArrayProcessor:
-    def __init__(self, stack_fn):
+    """
+    Batch conversions of bounding boxes stored in arrays.
+
+    Every conversion accepts optional `out` and `inplace` arguments:
+
+    out : array of the same shape as the input. If given, the result is written into it
+        column by column, without stacking intermediate columns, and `out` is returned.
+        The dtype of `out` must be able to hold the result (e.g. float for true division).
+        `out` may be the input array itself.
+    inplace : if True, the input array is overwritten with the result and returned.
+
+    By default the dtype of results follows the type promotion of the backend, e.g. integer inputs
+    of conversions with division give float64 results. `with_precision` returns a processor
+    with a fixed dtype policy instead; it does not apply to results written to `out`.
+
+    Parameters
+    ----------
+    stack_fn : stacks a list of arrays along a new last axis
+    asarray_fn : creates an array from nested lists of numbers, placed like the given array (e.g. on its device)
+    astype_fn : casts an array to the given dtype
+    is_floating_fn : returns True if the given array has a floating point dtype
+    concat_fn : concatenates a list of arrays along the given existing axis
+    xp : module providing numpy-compatible element-wise functions (maximum, minimum, arctan, ...)
+    round_fn : rounds a floating array with the given rounding mode and casts it to the given dtype
+    dtype_fn : returns the dtype of the backend with the given name, e.g. "float32"
+    repeat_fn : repeats rows of an array the given numbers of times
+    arange_fn : returns integers 0, ..., n - 1 as an int64 array placed like the given array, used by `fuse_boxes`
+    name : name of the processor, e.g. "numpy", used by `simplebbox.instrumentation`
+    """
+
+    def __init__(self, stack_fn, asarray_fn=None, astype_fn=None, is_floating_fn=None, concat_fn=None, xp=None,
+                 round_fn=None, dtype_fn=None, repeat_fn=None, arange_fn=None, name=None):
+        self.name = name
         self.stack = stack_fn
+        self.asarray = asarray_fn
+        self.astype = astype_fn
+        self.is_floating = is_floating_fn
+        self.concat = concat_fn
+        self.xp = xp
+        self.round = round_fn
+        self.get_dtype = dtype_fn
+        self.repeat = repeat_fn
+        self.arange = arange_fn
+        self.precision = None
+        self.rounding = "round"
+        self._plan_constants = {}
 
-    def x0y0wh_to_x0y0x1y1(self, x0y0wh):
+    def with_precision(self, dtype="preserve", rounding="round"):
+        """
+        Returns a processor computing conversions with a fixed dtype policy.
+
+        Parameters
+        ----------
+        dtype : dtype of the results.
+            "preserve" keeps the dtype of the input, e.g. float16 and float32 inputs are not upcast to float64.
+            "float16", "float32" or "float64": inputs are cast to this dtype and all the computations are done in it.
+            "int16", "int32" or "int64": results are rounded and cast to this dtype.
+        rounding : rounding of floating values to integer results: "round" (half to even, as Python `round`),
+            "floor", "ceil" or "trunc". Integer results of conversions with division are computed in float64
+            and rounded in the same order as `simplebbox.array` functions with `convert_fn=round`
+            (or `math.floor`, ...), so the results are identical to theirs.
+        """
+        if dtype not in PRECISIONS:
+            raise ValueError("dtype must be one of {}".format(", ".join(PRECISIONS)))
+        if rounding not in ROUNDINGS:
+            raise ValueError("rounding must be one of {}".format(", ".join(ROUNDINGS)))
+        res = copy.copy(self)
+        res.precision = dtype
+        res.rounding = rounding
+        return res
+
+    def _cast_input(self, arr, divides=True):
+        """
+        Casts the input to the dtype of computations required by the precision policy.
+
+        Returns the cast input, the dtype of the result and whether it is floating.
+        Floating results are computed in their dtype. Integer results are computed in float64
+        if the conversion divides, otherwise in the dtype of the input.
+        The dtype of the result is None if no policy is set.
+        """
+        if self.precision is None:
+            return arr, None, None
+        if self.precision == "preserve":
+            dtype, floating = arr.dtype, self.is_floating(arr)
+        else:
+            dtype, floating = self.get_dtype(self.precision), self.precision.startswith("float")
+        if floating:
+            arr = self.astype(arr, dtype)
+        elif divides:
+            arr = self.astype(arr, self.get_dtype("float64"))
+        return arr, dtype, floating
+
+    def _finish(self, res, dtype, floating):
+        """
+        Casts the result to the dtype required by the precision policy, rounding floats to integers in one pass.
+        """
+        if dtype is None or res.dtype == dtype:
+            return res
+        if floating or not self.is_floating(res):
+            return self.astype(res, dtype)
+        return self.round(res, self.rounding, dtype)
+
+    def _round_float(self, arr, floating):
+        """
+        Rounds intermediate values of conversions with integer results, keeping the floating dtype.
+        """
+        if floating is None or floating:
+            return arr
+        return self.round(arr, self.rounding, arr.dtype)
+
+    def _to_x0y0x1y1(self, boxes, fmt):
+        layout, _ = parse_format(fmt)
+        if layout == "x0y0x1y1":
+            return boxes
+        return self.convert(boxes, layout, "x0y0x1y1")
+
+    def _to_cxcywh(self, boxes, fmt):
+        layout, _ = parse_format(fmt)
+        if layout == "cxcywh":
+            return boxes
+        return self.convert(boxes, layout, "cxcywh")
+
+    def convert(self, boxes, src, dst, image_wh=None):
+        """
+        Converts bounding boxes between any two formats in one vectorised pass.
+
+        A format is a layout ("x0y0x1y1", "x0y0wh" or "cxcywh", also "xyxy" and "xywh")
+        with an optional suffix "_abs" or "_rel", e.g. "cxcywh_rel".
+        The chain of conversions between the formats is folded into one 4x4 matrix,
+        so the boxes are processed by a single matrix product followed, for conversions between
+        absolute and relative coordinates, by a single scaling by `image_wh`.
+        Compiled matrices are cached per source format, destination format and dtype.
+
+        Integer inputs stay integer if the conversion does not need divisions.
+
+        Parameters
+        ----------
+        boxes : array of boxes stored in the last axis
+        src : format of the input
+        dst : format of the result
+        image_wh : width and height of the image(s), required for conversions between absolute
+            and relative coordinates. Must be broadcastable against `boxes[..., :2]`.
+        """
+        plan = compile_plan(src, dst)
+        if plan.scale_power and image_wh is None:
+            raise ValueError("image_wh is required to convert from {!r} to {!r}".format(src, dst))
+        boxes, dtype, floating = self._cast_input(boxes, divides=plan.scale_power != 0 or not is_integral(plan))
+        if dtype is not None and image_wh is not None:
+            image_wh = self.astype(image_wh, boxes.dtype)
+        key = (plan, boxes.dtype, getattr(boxes, "device", None))
+        matrix = self._plan_constants.get(key)
+        if matrix is None:
+            matrix = self.asarray(plan.matrix, boxes)
+            if is_integral(plan) or self.is_floating(boxes):
+                matrix = self.astype(matrix, boxes.dtype)
+            self._plan_constants[key] = matrix
+        if matrix.dtype != boxes.dtype:
+            boxes = self.astype(boxes, matrix.dtype)
+        res = boxes @ matrix
+        if plan.scale_power:
+            scale = self.concat([image_wh, image_wh], -1)
+            if plan.scale_power > 0:
+                res *= self.astype(scale, res.dtype)
+            elif self.is_floating(res):
+                res /= self.astype(scale, res.dtype)
+            else:
+                # integer boxes give floating relative coordinates
+                res = res / scale
+        return self._finish(res, dtype, floating)
+
+    def x0y0wh_to_x0y0x1y1(self, x0y0wh, out=None, inplace=False):
         """
         Converts a bounding box from format
         (min x, min y, width, height) to
@@ -21,15 +211,25 @@ class ArrayProcessor:
 
         """
         arr = x0y0wh
+        out = _target(arr, out, inplace)
+        if out is not None:
+            out[..., 0] = arr[..., 0]
+            out[..., 1] = arr[..., 1]
+            out[..., 2] = arr[..., 2]
+            out[..., 3] = arr[..., 3]
+            out[..., 2] += out[..., 0]
+            out[..., 3] += out[..., 1]
+            return out
+        arr, dtype, floating = self._cast_input(arr, divides=False)
         res = [
             arr[..., 0],
             arr[..., 1],
             arr[..., 0] + arr[..., 2],
             arr[..., 1] + arr[..., 3]
         ]
-        return self.stack(res).reshape(*arr.shape[:-1], len(res))
+        return self._finish(self.stack(res), dtype, floating)
 
-    def x0y0x1y1_to_x0y0wh(self, x0y0x1y1):
+    def x0y0x1y1_to_x0y0wh(self, x0y0x1y1, out=None, inplace=False):
         """
         Converts a bounding box from format
         (min x, min y, max x, max y) to
@@ -41,15 +241,25 @@ class ArrayProcessor:
         must be stored as the last axis of the array.
         """
         arr = x0y0x1y1
+        out = _target(arr, out, inplace)
+        if out is not None:
+            out[..., 0] = arr[..., 0]
+            out[..., 1] = arr[..., 1]
+            out[..., 2] = arr[..., 2]
+            out[..., 3] = arr[..., 3]
+            out[..., 2] -= out[..., 0]
+            out[..., 3] -= out[..., 1]
+            return out
+        arr, dtype, floating = self._cast_input(arr, divides=False)
         res = [
             arr[..., 0],
             arr[..., 1],
             arr[..., 2] - arr[..., 0],
             arr[..., 3] - arr[..., 1]
         ]
-        return self.stack(res).reshape(*arr.shape[:-1], len(res))
+        return self._finish(self.stack(res), dtype, floating)
 
-    def cxcywh_to_x0y0wh(self, cxcywh):
+    def cxcywh_to_x0y0wh(self, cxcywh, out=None, inplace=False):
         """
         Converts a bounding box from format
         (center x, center y, width, height) to
@@ -62,15 +272,25 @@ class ArrayProcessor:
 
         """
         arr = cxcywh
+        out = _target(arr, out, inplace)
+        if out is not None:
+            out[..., 0] = arr[..., 0]
+            out[..., 1] = arr[..., 1]
+            out[..., 2] = arr[..., 2]
+            out[..., 3] = arr[..., 3]
+            out[..., 0] -= out[..., 2] / 2
+            out[..., 1] -= out[..., 3] / 2
+            return out
+        arr, dtype, floating = self._cast_input(arr)
         res = [
             arr[..., 0] - arr[..., 2] / 2,
             arr[..., 1] - arr[..., 3] / 2,
             arr[..., 2],
             arr[..., 3]
         ]
-        return self.stack(res).reshape(*arr.shape[:-1], len(res))
+        return self._finish(self.stack(res), dtype, floating)
 
-    def cxcywh_to_x0y0wh_int_div(self, cxcywh):
+    def cxcywh_to_x0y0wh_int_div(self, cxcywh, out=None, inplace=False):
         """
         Converts a bounding box from format
         (center x, center y, width, height) to
@@ -80,15 +300,25 @@ class ArrayProcessor:
         In the coordinate system of a screen (min x, min y) corresponds to the left top corner of the box.
         """
         arr = cxcywh
+        out = _target(arr, out, inplace)
+        if out is not None:
+            out[..., 0] = arr[..., 0]
+            out[..., 1] = arr[..., 1]
+            out[..., 2] = arr[..., 2]
+            out[..., 3] = arr[..., 3]
+            out[..., 0] -= out[..., 2] // 2
+            out[..., 1] -= out[..., 3] // 2
+            return out
+        arr, dtype, floating = self._cast_input(arr, divides=False)
         res = [
             arr[..., 0] - arr[..., 2] // 2,
             arr[..., 1] - arr[..., 3] // 2,
             arr[..., 2],
             arr[..., 3]
         ]
-        return self.stack(res).reshape(*arr.shape[:-1], len(res))
+        return self._finish(self.stack(res), dtype, floating)
 
-    def cxcywh_to_x0y0x1y1(self, cxcywh):
+    def cxcywh_to_x0y0x1y1(self, cxcywh, out=None, inplace=False):
         """
         Converts a bounding box from format
         (center x, center y, width, height) to
@@ -97,17 +327,30 @@ class ArrayProcessor:
         In the coordinate system of a screen (min x, min y) corresponds to the left top corner of the box.
         """
         arr = cxcywh
-        x0 = arr[..., 0] - arr[..., 2] / 2
-        y0 = arr[..., 1] - arr[..., 3] / 2
+        out = _target(arr, out, inplace)
+        if out is not None:
+            out[..., 0] = arr[..., 0]
+            out[..., 1] = arr[..., 1]
+            out[..., 2] = arr[..., 2]
+            out[..., 3] = arr[..., 3]
+            out[..., 0] -= out[..., 2] / 2
+            out[..., 1] -= out[..., 3] / 2
+            out[..., 2] += out[..., 0]
+            out[..., 3] += out[..., 1]
+            return out
+        arr, dtype, floating = self._cast_input(arr)
+        # integer max x is the rounded min x plus width, as in `simplebbox.array`
+        x0 = self._round_float(arr[..., 0] - arr[..., 2] / 2, floating)
+        y0 = self._round_float(arr[..., 1] - arr[..., 3] / 2, floating)
         res = [
             x0,
             y0,
             x0 + arr[..., 2],
             y0 + arr[..., 3]
         ]
-        return self.stack(res).reshape(*arr.shape[:-1], len(res))
+        return self._finish(self.stack(res), dtype, floating)
 
-    def cxcywh_to_x0y0x1y1_int_div(self, cxcywh):
+    def cxcywh_to_x0y0x1y1_int_div(self, cxcywh, out=None, inplace=False):
         """
         Converts a bounding box from format
         (center x, center y, width, height) to
@@ -116,17 +359,29 @@ class ArrayProcessor:
         In the coordinate system of a screen (min x, min y) corresponds to the left top corner of the box.
         """
         arr = cxcywh
-        x0 = arr[..., 0] - arr[..., 2] // 2
-        y0 = arr[..., 1] - arr[..., 3] // 2
+        out = _target(arr, out, inplace)
+        if out is not None:
+            out[..., 0] = arr[..., 0]
+            out[..., 1] = arr[..., 1]
+            out[..., 2] = arr[..., 2]
+            out[..., 3] = arr[..., 3]
+            out[..., 0] -= out[..., 2] // 2
+            out[..., 1] -= out[..., 3] // 2
+            out[..., 2] += out[..., 0]
+            out[..., 3] += out[..., 1]
+            return out
+        arr, dtype, floating = self._cast_input(arr, divides=False)
+        x0 = self._round_float(arr[..., 0] - arr[..., 2] // 2, floating)
+        y0 = self._round_float(arr[..., 1] - arr[..., 3] // 2, floating)
         res = [
             x0,
             y0,
             x0 + arr[..., 2],
             y0 + arr[..., 3]
         ]
-        return self.stack(res).reshape(*arr.shape[:-1], len(res))
+        return self._finish(self.stack(res), dtype, floating)
 
-    def xyxy_abs_to_rel(self, xyxy, image_wh):
+    def xyxy_abs_to_rel(self, xyxy, image_wh, out=None, inplace=False):
         """
         Converts a bounding box from format (x, y, width, height) or (x, y, x, y) from absolute to relative values
         with respect to image width and height.
@@ -136,18 +391,28 @@ class ArrayProcessor:
         image_wh : tuple of width and height of image
 
         """
-        x0 = xyxy[..., 0]
-        y0 = xyxy[..., 1]
-        x1 = xyxy[..., 2]
-        y1 = xyxy[..., 3]
+        out = _target(xyxy, out, inplace)
+        if out is not None:
+            out[..., 0] = xyxy[..., 0]
+            out[..., 1] = xyxy[..., 1]
+            out[..., 2] = xyxy[..., 2]
+            out[..., 3] = xyxy[..., 3]
+            out[..., 0] /= image_wh[..., 0]
+            out[..., 1] /= image_wh[..., 1]
+            out[..., 2] /= image_wh[..., 0]
+            out[..., 3] /= image_wh[..., 1]
+            return out
+        xyxy, dtype, floating = self._cast_input(xyxy)
+        if dtype is not None:
+            image_wh = self.astype(image_wh, xyxy.dtype)
         w = image_wh[..., 0]
         h = image_wh[..., 1]
-        return self.stack([
-            x0 / w, y0 / h,
-            x1 / w, y1 / h
-        ])
+        return self._finish(self.stack([
+            xyxy[..., 0] / w, xyxy[..., 1] / h,
+            xyxy[..., 2] / w, xyxy[..., 3] / h
+        ]), dtype, floating)
 
-    def xyxy_rel_to_abs(self, xyxy, image_wh):
+    def xyxy_rel_to_abs(self, xyxy, image_wh, out=None, inplace=False):
         """
         Converts a bounding box from format (x, y, width, height) or (x, y, x, y) from relative to absolute values
         with respect to image width and height.
@@ -159,13 +424,643 @@ class ArrayProcessor:
 
 
         """
-        x0 = xyxy[..., 0]
-        y0 = xyxy[..., 1]
-        x1 = xyxy[..., 2]
-        y1 = xyxy[..., 3]
+        out = _target(xyxy, out, inplace)
+        if out is not None:
+            out[..., 0] = xyxy[..., 0]
+            out[..., 1] = xyxy[..., 1]
+            out[..., 2] = xyxy[..., 2]
+            out[..., 3] = xyxy[..., 3]
+            out[..., 0] *= image_wh[..., 0]
+            out[..., 1] *= image_wh[..., 1]
+            out[..., 2] *= image_wh[..., 0]
+            out[..., 3] *= image_wh[..., 1]
+            return out
+        xyxy, dtype, floating = self._cast_input(xyxy)
+        if dtype is not None:
+            image_wh = self.astype(image_wh, xyxy.dtype)
         w = image_wh[..., 0]
         h = image_wh[..., 1]
+        return self._finish(self.stack([
+            xyxy[..., 0] * w, xyxy[..., 1] * h,
+            xyxy[..., 2] * w, xyxy[..., 3] * h
+        ]), dtype, floating)
+
+    def clip(self, boxes, image_wh=None, fmt="x0y0x1y1"):
+        """
+        Clips boxes to the image: coordinates are limited to [0, width] and [0, height],
+        or to [0, 1] for relative formats.
+
+        Parameters
+        ----------
+        boxes : array of boxes stored in the last axis
+        image_wh : width and height of the image(s), broadcastable against `boxes[..., :2]`.
+            Required for absolute formats.
+        fmt : format of the boxes, the result has the same format
+        """
+        layout, relative = parse_format(fmt)
+        if not relative and image_wh is None:
+            raise ValueError("image_wh is required to clip boxes of format {!r}".format(fmt))
+        xyxy = self._to_x0y0x1y1(boxes, layout)
+        if relative:
+            res = xyxy.clip(0, 1)
+        else:
+            w, h = image_wh[..., 0], image_wh[..., 1]
+            res = self.stack([
+                self.xp.minimum(xyxy[..., 0].clip(min=0), w),
+                self.xp.minimum(xyxy[..., 1].clip(min=0), h),
+                self.xp.minimum(xyxy[..., 2].clip(min=0), w),
+                self.xp.minimum(xyxy[..., 3].clip(min=0), h),
+            ])
+        if layout == "x0y0x1y1":
+            return res
+        return self.convert(res, "x0y0x1y1", layout)
+
+    def _ragged_image_wh(self, boxes, offsets, image_wh):
+        """
+        Returns sizes of the images of every box of a ragged batch, an array of shape (total_boxes, 2).
+        """
+        if offsets.shape[0] != image_wh.shape[0] + 1:
+            raise ValueError("offsets must have n_images + 1 = {} elements, got {}".format(
+                image_wh.shape[0] + 1, offsets.shape[0]))
+        if int(offsets[-1]) != boxes.shape[0]:
+            raise ValueError("the last offset must be the number of boxes {}, got {}".format(
+                boxes.shape[0], int(offsets[-1])))
+        return self.repeat(image_wh, offsets[1:] - offsets[:-1])
+
+    def xyxy_abs_to_rel_ragged(self, boxes, offsets, image_wh, out=None, inplace=False):
+        """
+        Converts boxes of a ragged batch of images from absolute to relative values.
+
+        A ragged batch stores boxes of all images in one array of shape (total_boxes, 4):
+        boxes of image `i` are `boxes[offsets[i]:offsets[i + 1]]`, e.g. as returned by `BoxStore.range`.
+        The whole batch is processed in one vectorised call, without padding or loops over the images.
+
+        Parameters
+        ----------
+        boxes : array of shape (total_boxes, 4), format (x, y, width, height) or (x, y, x, y)
+        offsets : integer array of shape (n_images + 1,) with offsets[0] = 0 and offsets[-1] = total_boxes
+        image_wh : array of shape (n_images, 2) with width and height of every image
+        """
+        return self.xyxy_abs_to_rel(boxes, self._ragged_image_wh(boxes, offsets, image_wh), out, inplace)
+
+    def xyxy_rel_to_abs_ragged(self, boxes, offsets, image_wh, out=None, inplace=False):
+        """
+        Converts boxes of a ragged batch of images from relative to absolute values.
+        See `xyxy_abs_to_rel_ragged` for the parameters.
+        """
+        return self.xyxy_rel_to_abs(boxes, self._ragged_image_wh(boxes, offsets, image_wh), out, inplace)
+
+    def convert_ragged(self, boxes, offsets, src, dst, image_wh=None):
+        """
+        Converts boxes of a ragged batch of images between any two formats with `convert`.
+        See `xyxy_abs_to_rel_ragged` for the parameters.
+        `image_wh` is required only for conversions between absolute and relative coordinates.
+        """
+        if image_wh is not None:
+            image_wh = self._ragged_image_wh(boxes, offsets, image_wh)
+        return self.convert(boxes, src, dst, image_wh)
+
+    def clip_ragged(self, boxes, offsets, image_wh=None, fmt="x0y0x1y1"):
+        """
+        Clips boxes of a ragged batch of images to their images with `clip`.
+        See `xyxy_abs_to_rel_ragged` for the parameters.
+        """
+        if image_wh is not None:
+            image_wh = self._ragged_image_wh(boxes, offsets, image_wh)
+        return self.clip(boxes, image_wh, fmt)
+
+    def x0y0x1y1_columns(self, boxes, fmt="x0y0x1y1"):
+        """
+        Returns columns (x0, y0, x1, y1) of boxes in format `fmt` without creating a converted array.
+        Relative boxes give relative columns.
+        """
+        layout, _ = parse_format(fmt)
+        a0, a1, a2, a3 = boxes[..., 0], boxes[..., 1], boxes[..., 2], boxes[..., 3]
+        if layout == "x0y0x1y1":
+            return a0, a1, a2, a3
+        if layout == "x0y0wh":
+            return a0, a1, a0 + a2, a1 + a3
+        x0 = a0 - a2 / 2
+        y0 = a1 - a3 / 2
+        return x0, y0, x0 + a2, y0 + a3
+
+    def sanitize(self, boxes, image_wh=None, min_size=0, min_area=0, fmt="x0y0x1y1", clip=True):
+        """
+        Clips boxes to the image and drops invalid and too small boxes in one call.
+
+        The coordinates are processed column by column: the boxes are clipped to [0, width] x [0, height]
+        (or to [0, 1] for relative formats), and boxes with non-positive width or height
+        (empty, inverted or containing NaN), a side smaller than `min_size` or area smaller than `min_area`
+        are dropped. Only the kept boxes are assembled into the result.
+
+        Parameters
+        ----------
+        boxes : array of shape (N, 4)
+        image_wh : width and height of the image(s), broadcastable against `boxes[..., 0]`.
+            Absolute boxes are clipped only if it is given.
+        min_size : minimal width and height of the kept boxes after clipping
+        min_area : minimal area of the kept boxes after clipping
+        fmt : format of the boxes, the result has the same format
+        clip : if False, the boxes are only filtered
+
+        Returns
+        -------
+        tuple of the kept boxes, an array of shape (K, 4), and their indices in `boxes`
+        """
+        layout, relative = parse_format(fmt)
+        x0, y0, x1, y1 = self.x0y0x1y1_columns(boxes, layout)
+        if clip and relative:
+            x0, y0, x1, y1 = x0.clip(0, 1), y0.clip(0, 1), x1.clip(0, 1), y1.clip(0, 1)
+        elif clip and image_wh is not None:
+            w, h = image_wh[..., 0], image_wh[..., 1]
+            minimum = self.xp.minimum
+            x0, y0 = minimum(x0.clip(min=0), w), minimum(y0.clip(min=0), h)
+            x1, y1 = minimum(x1.clip(min=0), w), minimum(y1.clip(min=0), h)
+        w = x1 - x0
+        h = y1 - y0
+        mask = (w > 0) & (h > 0)
+        if min_size:
+            mask &= (w >= min_size) & (h >= min_size)
+        if min_area:
+            mask &= w * h >= min_area
+        keep = self.xp.argwhere(mask)[:, 0]
+        x0, y0, w, h = x0[keep], y0[keep], w[keep], h[keep]
+        if layout == "x0y0x1y1":
+            res = [x0, y0, x0 + w, y0 + h]
+        elif layout == "x0y0wh":
+            res = [x0, y0, w, h]
+        else:
+            res = [x0 + w / 2, y0 + h / 2, w, h]
+        return self.stack(res), keep
+
+    def sanitize_ragged(self, boxes, offsets, image_wh=None, min_size=0, min_area=0, fmt="x0y0x1y1", clip=True):
+        """
+        Sanitizes boxes of a ragged batch of images with `sanitize`.
+        See `xyxy_abs_to_rel_ragged` for the description of ragged batches.
+
+        Returns
+        -------
+        tuple of the kept boxes, their indices in `boxes` and offsets of the images in the kept boxes
+        """
+        if image_wh is not None:
+            image_wh = self._ragged_image_wh(boxes, offsets, image_wh)
+        res, keep = self.sanitize(boxes, image_wh, min_size, min_area, fmt, clip)
+        return res, keep, self.xp.searchsorted(keep, offsets)
+
+    def encode_boxes(self, boxes, anchors, weights=(1., 1., 1., 1.), fmt="x0y0x1y1", anchor_fmt="x0y0x1y1"):
+        """
+        Encodes boxes as regression deltas (dx, dy, dw, dh) with respect to anchors:
+
+            dx = wx * (cx - anchor cx) / anchor width,  dw = ww * log(width / anchor width)
+
+        and similarly dy and dh, where (wx, wy, ww, wh) are `weights`, e.g. (10, 10, 5, 5) for Faster R-CNN.
+
+        Parameters
+        ----------
+        boxes : array of boxes stored in the last axis, e.g. of shape (B, A, 4)
+        anchors : array of anchors broadcastable against `boxes`, e.g. of shape (A, 4)
+        weights : weights of the deltas
+        fmt : format of the boxes
+        anchor_fmt : format of the anchors. Boxes and anchors must be both absolute or both relative.
+
+        Returns
+        -------
+        array of deltas of the broadcast shape of `boxes` and `anchors`
+        """
+        if parse_format(fmt)[1] != parse_format(anchor_fmt)[1]:
+            raise ValueError("boxes {!r} and anchors {!r} must be both absolute or both relative".format(
+                fmt, anchor_fmt))
+        wx, wy, ww, wh = weights
+        b = self._to_cxcywh(boxes, fmt)
+        a = self._to_cxcywh(anchors, anchor_fmt)
+        aw, ah = a[..., 2], a[..., 3]
         return self.stack([
-            x0 * w, y0 * h,
-            x1 * w, y1 * h
+            wx * (b[..., 0] - a[..., 0]) / aw,
+            wy * (b[..., 1] - a[..., 1]) / ah,
+            ww * self.xp.log(b[..., 2] / aw),
+            wh * self.xp.log(b[..., 3] / ah),
         ])
+
+    def decode_boxes(self, deltas, anchors, weights=(1., 1., 1., 1.), fmt="x0y0x1y1", anchor_fmt="x0y0x1y1",
+                     clamp=math.log(1000. / 16), image_wh=None):
+        """
+        Decodes regression deltas (dx, dy, dw, dh) into boxes, the inverse of `encode_boxes`.
+
+        The decoded centers and sizes are turned directly into the columns of format `fmt`,
+        including scaling between absolute and relative coordinates, so no intermediate boxes are created.
+
+        Parameters
+        ----------
+        deltas : array of deltas stored in the last axis, e.g. of shape (B, A, 4)
+        anchors : array of anchors broadcastable against `deltas`, e.g. of shape (A, 4)
+        weights : weights of the deltas used for encoding
+        fmt : format of the result
+        anchor_fmt : format of the anchors
+        clamp : upper limit of dw / ww and dh / wh, prevents overflow of the exponent
+        image_wh : width and height of the image(s), required if exactly one of `fmt` and `anchor_fmt` is relative
+
+        Returns
+        -------
+        array of boxes of the broadcast shape of `deltas` and `anchors`
+        """
+        layout, relative = parse_format(fmt)
+        _, anchors_relative = parse_format(anchor_fmt)
+        if relative != anchors_relative and image_wh is None:
+            raise ValueError("image_wh is required to decode boxes from {!r} anchors to {!r}".format(anchor_fmt, fmt))
+        xp = self.xp
+        wx, wy, ww, wh = weights
+        a = self._to_cxcywh(anchors, anchor_fmt)
+        aw, ah = a[..., 2], a[..., 3]
+        cx = deltas[..., 0] / wx * aw + a[..., 0]
+        cy = deltas[..., 1] / wy * ah + a[..., 1]
+        w = xp.exp((deltas[..., 2] / ww).clip(max=clamp)) * aw
+        h = xp.exp((deltas[..., 3] / wh).clip(max=clamp)) * ah
+        if layout == "cxcywh":
+            res = [cx, cy, w, h]
+        else:
+            x0 = cx - w / 2
+            y0 = cy - h / 2
+            res = [x0, y0, w, h] if layout == "x0y0wh" else [x0, y0, x0 + w, y0 + h]
+        if relative and not anchors_relative:
+            res = [res[0] / image_wh[..., 0], res[1] / image_wh[..., 1],
+                   res[2] / image_wh[..., 0], res[3] / image_wh[..., 1]]
+        elif anchors_relative and not relative:
+            res = [res[0] * image_wh[..., 0], res[1] * image_wh[..., 1],
+                   res[2] * image_wh[..., 0], res[3] * image_wh[..., 1]]
+        return self.stack(res)
+
+    def _overlap(self, a, b, kind, eps):
+        """
+        Computes IoU of kind "iou", "giou", "diou" or "ciou" between boxes `a` and `b` in format x0y0x1y1
+        broadcasting their leading axes. The coordinates are processed column by column,
+        so no temporaries with the trailing axis of size 4 are created.
+        """
+        xp = self.xp
+        ax0, ay0, ax1, ay1 = a[..., 0], a[..., 1], a[..., 2], a[..., 3]
+        bx0, by0, bx1, by1 = b[..., 0], b[..., 1], b[..., 2], b[..., 3]
+        aw, ah = ax1 - ax0, ay1 - ay0
+        bw, bh = bx1 - bx0, by1 - by0
+
+        inter = (xp.minimum(ax1, bx1) - xp.maximum(ax0, bx0)).clip(min=0) * \
+            (xp.minimum(ay1, by1) - xp.maximum(ay0, by0)).clip(min=0)
+        union = aw * ah + bw * bh - inter
+        # IoU of boxes with an empty union (zero-area boxes) is 0 and not NaN
+        iou = inter / xp.where(union > 0, union, 1)
+        if kind == "iou":
+            return iou
+
+        hull_w = xp.maximum(ax1, bx1) - xp.minimum(ax0, bx0)
+        hull_h = xp.maximum(ay1, by1) - xp.minimum(ay0, by0)
+        if kind == "giou":
+            hull = hull_w * hull_h
+            return iou - (hull - union) / (hull + eps)
+
+        center_dist2 = ((bx0 + bx1 - ax0 - ax1) ** 2 + (by0 + by1 - ay0 - ay1) ** 2) / 4
+        diou = iou - center_dist2 / (hull_w ** 2 + hull_h ** 2 + eps)
+        if kind == "diou":
+            return diou
+
+        v = (4 / math.pi ** 2) * (xp.arctan(bw / (bh + eps)) - xp.arctan(aw / (ah + eps))) ** 2
+        alpha = v / (1 - iou + v + eps)
+        return diou - alpha * v
+
+    def _overlap_matrix(self, a, b, kind, fmt, chunk_size, eps):
+        a = self._to_x0y0x1y1(a, fmt)
+        b = self._to_x0y0x1y1(b, fmt)[..., None, :, :]
+        n = a.shape[-2]
+        if chunk_size is None or n <= chunk_size:
+            return self._overlap(a[..., :, None, :], b, kind, eps)
+        return self.concat([
+            self._overlap(a[..., start:start + chunk_size, None, :], b, kind, eps)
+            for start in range(0, n, chunk_size)
+        ], -2)
+
+    def iou_matrix(self, a, b, fmt="x0y0x1y1", chunk_size=None):
+        """
+        Computes intersection over union for every pair of boxes from `a` and `b`.
+        IoU of boxes with an empty union, e.g. of two zero-area boxes, is 0.
+
+        Parameters
+        ----------
+        a : array of shape (..., N, 4)
+        b : array of shape (..., M, 4)
+        fmt : format of the boxes, e.g. "x0y0x1y1", "x0y0wh" or "cxcywh"
+        chunk_size : if given, rows of `a` are processed in chunks of this size,
+            so temporaries have at most chunk_size * M elements.
+
+        Returns
+        -------
+        array of shape (..., N, M)
+        """
+        return self._overlap_matrix(a, b, "iou", fmt, chunk_size, 0)
+
+    def giou_matrix(self, a, b, fmt="x0y0x1y1", chunk_size=None, eps=1e-7):
+        """
+        Computes generalized intersection over union for every pair of boxes from `a` and `b`.
+        See `iou_matrix` for the parameters.
+        """
+        return self._overlap_matrix(a, b, "giou", fmt, chunk_size, eps)
+
+    def diou_matrix(self, a, b, fmt="x0y0x1y1", chunk_size=None, eps=1e-7):
+        """
+        Computes distance intersection over union for every pair of boxes from `a` and `b`.
+        See `iou_matrix` for the parameters.
+        """
+        return self._overlap_matrix(a, b, "diou", fmt, chunk_size, eps)
+
+    def ciou_matrix(self, a, b, fmt="x0y0x1y1", chunk_size=None, eps=1e-7):
+        """
+        Computes complete intersection over union for every pair of boxes from `a` and `b`.
+        See `iou_matrix` for the parameters.
+        """
+        return self._overlap_matrix(a, b, "ciou", fmt, chunk_size, eps)
+
+    def iou(self, a, b, fmt="x0y0x1y1"):
+        """
+        Computes intersection over union of corresponding boxes of `a` and `b`, 0 for boxes with an empty union.
+        Leading axes of the arrays are broadcast, e.g. for (N, 4) inputs the result has shape (N,).
+        """
+        return self._overlap(self._to_x0y0x1y1(a, fmt), self._to_x0y0x1y1(b, fmt), "iou", 0)
+
+    def giou(self, a, b, fmt="x0y0x1y1", eps=1e-7):
+        """
+        Computes generalized intersection over union of corresponding boxes of `a` and `b`. See `iou`.
+        """
+        return self._overlap(self._to_x0y0x1y1(a, fmt), self._to_x0y0x1y1(b, fmt), "giou", eps)
+
+    def diou(self, a, b, fmt="x0y0x1y1", eps=1e-7):
+        """
+        Computes distance intersection over union of corresponding boxes of `a` and `b`. See `iou`.
+        """
+        return self._overlap(self._to_x0y0x1y1(a, fmt), self._to_x0y0x1y1(b, fmt), "diou", eps)
+
+    def ciou(self, a, b, fmt="x0y0x1y1", eps=1e-7):
+        """
+        Computes complete intersection over union of corresponding boxes of `a` and `b`. See `iou`.
+        """
+        return self._overlap(self._to_x0y0x1y1(a, fmt), self._to_x0y0x1y1(b, fmt), "ciou", eps)
+
+    def nms(self, boxes, scores, iou_threshold, fmt="x0y0x1y1", max_pairs=1 << 22):
+        """
+        Greedy non-maximum suppression.
+
+        Boxes are visited in the order of decreasing score. Every visited box is kept and
+        suppresses the remaining boxes overlapping it with IoU above `iou_threshold`.
+        Overlapping pairs are found by sorting and binary search as in `fuse_boxes` and all boxes are decided
+        in vectorised rounds, so the time grows as N log N plus the number of overlapping candidates
+        and neither time nor memory is spent on a full N x N IoU matrix.
+
+        Parameters
+        ----------
+        boxes : array of shape (N, 4)
+        scores : array of shape (N,)
+        iou_threshold : boxes with IoU greater than the threshold are suppressed
+        fmt : format of the boxes
+        max_pairs : maximal number of candidate pairs processed at once, bounds the memory
+
+        Returns
+        -------
+        indices of the kept boxes sorted by decreasing score
+        """
+        return self._nms(self._to_x0y0x1y1(boxes, fmt), scores, None, iou_threshold, max_pairs)
+
+    def batched_nms(self, boxes, scores, classes, iou_threshold, fmt="x0y0x1y1", max_pairs=1 << 22):
+        """
+        Non-maximum suppression applied independently to boxes of every class.
+
+        Only boxes of the same class are paired, so all classes are processed at once.
+
+        Parameters
+        ----------
+        classes : integer array of shape (N,) with class labels of the boxes
+
+        Returns
+        -------
+        indices of the kept boxes sorted by decreasing score
+        """
+        return self._nms(self._to_x0y0x1y1(boxes, fmt), scores, classes, iou_threshold, max_pairs)
+
+    def _nms(self, boxes, scores, labels, iou_threshold, max_pairs):
+        xp = self.xp
+        order = xp.argsort(-scores)
+        if self.arange is None:
+            # the generic processor of array API namespaces visits the boxes one by one,
+            # boxes of different labels are shifted apart so that they never overlap
+            if labels is not None and len(boxes):
+                boxes = boxes + (labels * (boxes.max() - boxes.min() + 1))[:, None]
+            keep = []
+            while len(order):
+                i = order[0]
+                keep.append(i)
+                order = order[1:]
+                order = order[self._overlap(boxes[i], boxes[order], "iou", 0) <= iou_threshold]
+            return self.stack(keep) if keep else order
+        rows, cols = self._overlapping_pairs(boxes[order], None if labels is None else labels[order], iou_threshold,
+                                             max_pairs)
+        return order[self._greedy_leaders(rows, cols, boxes.shape[0])]
+
+    def soft_nms(self, boxes, scores, sigma=0.5, iou_threshold=0.3, score_threshold=0.001, method="gaussian",
+                 fmt="x0y0x1y1"):
+        """
+        Soft non-maximum suppression (Bodla et al., 2017).
+
+        Instead of removing overlapping boxes, their scores are decayed depending on IoU with the selected box.
+        Boxes with scores not greater than `score_threshold` are dropped.
+
+        Parameters
+        ----------
+        sigma : parameter of the gaussian decay `exp(-iou^2 / sigma)`
+        iou_threshold : for the linear decay `1 - iou`, only boxes with IoU above the threshold are decayed
+        method : "gaussian" or "linear"
+
+        Returns
+        -------
+        tuple of indices of the kept boxes in the order of selection and their decayed scores
+        """
+        if method not in ("gaussian", "linear"):
+            raise ValueError("Unknown soft-NMS method {!r}".format(method))
+        xp = self.xp
+        boxes = self._to_x0y0x1y1(boxes, fmt)
+        order = xp.argsort(-scores)
+        order = order[scores[order] > score_threshold]
+        remaining = scores[order]
+        keep, kept_scores = [], []
+        while len(order):
+            j = xp.argmax(remaining)
+            keep.append(order[j])
+            kept_scores.append(remaining[j])
+            iou = self._overlap(boxes[order[j]], boxes[order], "iou", 0)
+            if method == "gaussian":
+                weight = xp.exp(-iou ** 2 / sigma)
+            else:
+                weight = 1 - iou * (iou > iou_threshold)
+            weight[j] = 0
+            remaining = remaining * weight
+            alive = remaining > score_threshold
+            order, remaining = order[alive], remaining[alive]
+        if not keep:
+            return order, remaining
+        return self.stack(keep), self.stack(kept_scores)
+
+    def _overlapping_pairs(self, boxes, labels, iou_threshold, max_pairs):
+        """
+        Finds pairs of boxes in format x0y0x1y1 with equal labels and IoU above `iou_threshold`.
+
+        Boxes are split into horizontal strips as high as the highest box, so a box overlaps only boxes of its
+        own strip and of the adjacent ones. Boxes are sorted by the left edge shifted by the label and the strip,
+        so the candidates of a box are two contiguous ranges found by binary search: the following boxes
+        of its strip starting left of its right edge and the boxes of the next strip overlapping it horizontally.
+        IoU is computed only for these candidates, at most about `max_pairs` of them at once.
+
+        Returns
+        -------
+        tuple of index arrays (i, j) with i < j
+        """
+        xp = self.xp
+        n = boxes.shape[0]
+        float64 = self.get_dtype("float64")
+        x0, y0, x1, y1 = (self.astype(boxes[:, c], float64) for c in range(4))
+        positions = self.arange(n, boxes)
+        if not n:
+            return positions, positions
+        low = x0.min()
+        max_w = float((x1 - x0).max().clip(min=0))
+        # a pair of strips is separated by more than the extent of the boxes and the widest box
+        span = float(xp.maximum(x0.max(), x1.max()) - low) + max_w + 1
+        y_low = y0.min()
+        # strips not lower than 1 / n of the extent, so there are at most n + 1 of them
+        height = max(float((y1 - y0).max()), float(xp.maximum(y0.max(), y1.max()) - y_low) / n)
+        strip = (y0 - y_low) // height if height > 0 else y0 * 0
+        key = strip if labels is None else self.astype(labels, float64) * (n + 2) + strip
+        x0, x1 = x0 - low + key * span, x1 - low + key * span
+        order = xp.argsort(x0)
+        x0, x1 = x0[order], x1[order]
+        begins = self.concat([positions + 1, xp.searchsorted(x0, x0 + (span - max_w), side="right")], 0)
+        counts = (self.concat([xp.searchsorted(x0, x1), xp.searchsorted(x0, x1 + span)], 0) - begins).clip(min=0)
+        owners = self.concat([positions, positions], 0)
+        ends = xp.cumsum(counts, 0)
+        rows, cols = [positions[:0]], [positions[:0]]
+        start = 0
+        while start < 2 * n:
+            base = int(ends[start - 1]) if start else 0
+            stop = max(int(xp.searchsorted(ends, base + max_pairs, side="right")), start + 1)
+            c = counts[start:stop]
+            i = self.repeat(owners[start:stop], c)
+            # j runs from begin to begin + count - 1 for every owner
+            j = self.arange(int(ends[stop - 1]) - base, boxes) + \
+                self.repeat(begins[start:stop] - (ends[start:stop] - c - base), c)
+            i, j = order[i], order[j]
+            overlapping = self._overlap(boxes[i], boxes[j], "iou", 0) > iou_threshold
+            rows.append(xp.minimum(i, j)[overlapping])
+            cols.append(xp.maximum(i, j)[overlapping])
+            start = stop
+        return self.concat(rows, 0), self.concat(cols, 0)
+
+    def _greedy_leaders(self, rows, cols, n):
+        """
+        Selects the boxes kept by greedy non-maximum suppression from the pairs (rows, cols) of overlapping boxes
+        sorted by decreasing score (rows < cols).
+
+        Instead of visiting the boxes one by one, all boxes are decided in rounds: a box suppressed by a kept box
+        is suppressed, a box not overlapping any box that may still be kept is kept. Every round is vectorised
+        over the remaining pairs; the number of rounds is the length of the longest chain of suppressions.
+        """
+        xp = self.xp
+        leader = xp.zeros_like(self.arange(n, rows), dtype=bool)
+        suppressed = xp.zeros_like(leader)
+        while not bool((leader | suppressed).all()):
+            suppressed |= xp.bincount(cols[leader[rows]], minlength=n) > 0
+            blocked = xp.bincount(cols[~suppressed[rows]], minlength=n) > 0
+            leader |= ~(suppressed | blocked)
+            pending = ~suppressed[rows] & ~(leader | suppressed)[cols]
+            rows, cols = rows[pending], cols[pending]
+        return leader
+
+    def fuse_boxes(self, boxes, scores, labels=None, iou_threshold=0.55, method="wbf", n_models=None,
+                   fmt="x0y0x1y1", max_pairs=1 << 22):
+        """
+        Merges clusters of overlapping boxes, e.g. predictions of an ensemble of detectors.
+
+        Clusters are formed as by greedy non-maximum suppression: the boxes kept by `nms` lead the clusters
+        and every other box joins the cluster of the highest scored leader overlapping it with IoU
+        above `iou_threshold`. Overlapping pairs are found by sorting and binary search, so the time grows
+        as N log N plus the number of overlapping candidates rather than as N ** 2; merging uses weighted
+        sums per cluster without loops over the clusters.
+
+        Methods of merging:
+
+        * "wbf": weighted box fusion (Solovyev et al., 2019), coordinates averaged with scores as weights,
+          the score is the mean score of the cluster multiplied by min(size, n_models) / n_models
+          if `n_models` is given;
+        * "soft_vote": coordinates averaged with weights score * IoU with the leader, the score of the leader;
+        * "average": plain means of coordinates and scores.
+
+        Model weights of weighted box fusion can be applied by scaling the scores beforehand.
+        Fusion relies on integer array indexing and `bincount`, so it is supported by `bbox_numpy`
+        and `bbox_torch` but not by the generic processor of array API namespaces.
+
+        Parameters
+        ----------
+        boxes : array of shape (N, 4)
+        scores : floating array of shape (N,)
+        labels : optional integer array of shape (N,), boxes with different labels are never merged.
+            Class and image ids of a batch can be combined into one label.
+        iou_threshold : boxes with IoU greater than the threshold are merged
+        method : "wbf", "soft_vote" or "average"
+        n_models : number of models of the ensemble, used by "wbf"
+        fmt : format of the boxes and of the result
+        max_pairs : maximal number of candidate pairs processed at once, bounds the memory
+
+        Returns
+        -------
+        tuple of the merged boxes (K, 4), their scores (K,) and indices of the leaders of the clusters (K,),
+        sorted by decreasing score of the leaders; labels of the merged boxes are `labels[leaders]`
+        """
+        if method not in ("wbf", "soft_vote", "average"):
+            raise ValueError("Unknown fusion method {!r}".format(method))
+        if self.arange is None:
+            raise TypeError("fuse_boxes is supported only by processors with arange_fn, e.g. bbox_numpy")
+        xp = self.xp
+        layout, _ = parse_format(fmt)
+        boxes = self._to_x0y0x1y1(boxes, fmt)
+        if not self.is_floating(boxes):
+            boxes = self.astype(boxes, scores.dtype)
+        n = boxes.shape[0]
+        order = xp.argsort(-scores)
+        boxes, scores = boxes[order], scores[order]
+        rows, cols = self._overlapping_pairs(boxes, None if labels is None else labels[order], iou_threshold,
+                                             max_pairs)
+        leader = self._greedy_leaders(rows, cols, n)
+
+        # every box joins the first leader overlapping it
+        joins = leader[rows]
+        rows, cols = rows[joins], cols[joins]
+        by_box = xp.argsort(cols * n + rows)
+        rows, cols = rows[by_box], cols[by_box]
+        first = self.concat([cols[:1] >= 0, cols[1:] != cols[:-1]], 0)
+        cluster_leader = self.arange(n, boxes)
+        cluster_leader[cols[first]] = rows[first]
+        cluster = (xp.cumsum(self.astype(leader, cols.dtype), 0) - 1)[cluster_leader]
+        k = int(leader.sum())
+
+        if method == "average":
+            weights = xp.ones_like(scores)
+        elif method == "wbf":
+            weights = scores
+        else:
+            weights = scores * self._overlap(boxes, boxes[cluster_leader], "iou", 0)
+        total = xp.bincount(cluster, weights=weights, minlength=k)
+        res = self.astype(self.stack([
+            xp.bincount(cluster, weights=boxes[:, c] * weights, minlength=k) / total for c in range(4)
+        ]), boxes.dtype)
+        if method == "soft_vote":
+            fused_scores = scores[leader]
+        else:
+            size = xp.bincount(cluster, minlength=k)
+            fused_scores = xp.bincount(cluster, weights=scores, minlength=k) / size
+            if method == "wbf" and n_models is not None:
+                fused_scores = fused_scores * size.clip(max=n_models) / n_models
+            fused_scores = self.astype(fused_scores, scores.dtype)
+        if layout != "x0y0x1y1":
+            res = self.convert(res, "x0y0x1y1", layout)
+        return res, fused_scores, order[leader]
@@ -0,0 +1,117 @@
+"""
+Format vocabulary and compilation of format conversion chains into a single linear map.
+
+A format name consists of the coordinate layout and an optional suffix `_abs` or `_rel`,
+e.g. "cxcywh_rel" or "x0y0x1y1". Layouts without a suffix are absolute.
+"""
+from collections import deque, namedtuple
+from functools import lru_cache
+
+LAYOUTS = ("x0y0x1y1", "x0y0wh", "cxcywh")
+
+_ALIASES = {
+    "xyxy": "x0y0x1y1",
+    "xywh": "x0y0wh",
+    "ltrb": "x0y0x1y1",
+    "ltwh": "x0y0wh",
+}
+
+# Direct conversions between layouts. Row i of a matrix holds the weights of the input coordinates
+# that sum up to the output coordinate i.
+_EDGES = {
+    ("x0y0wh", "x0y0x1y1"): ((1, 0, 0, 0), (0, 1, 0, 0), (1, 0, 1, 0), (0, 1, 0, 1)),
+    ("x0y0x1y1", "x0y0wh"): ((1, 0, 0, 0), (0, 1, 0, 0), (-1, 0, 1, 0), (0, -1, 0, 1)),
+    ("cxcywh", "x0y0x1y1"): ((1, 0, -0.5, 0), (0, 1, 0, -0.5), (1, 0, 0.5, 0), (0, 1, 0, 0.5)),
+    ("x0y0x1y1", "cxcywh"): ((0.5, 0, 0.5, 0), (0, 0.5, 0, 0.5), (-1, 0, 1, 0), (0, -1, 0, 1)),
+    ("cxcywh", "x0y0wh"): ((1, 0, -0.5, 0), (0, 1, 0, -0.5), (0, 0, 1, 0), (0, 0, 0, 1)),
+}
+
+_IDENTITY = ((1, 0, 0, 0), (0, 1, 0, 0), (0, 0, 1, 0), (0, 0, 0, 1))
+
+Plan = namedtuple("Plan", ["path", "matrix", "scale_power"])
+Plan.__doc__ = """
+Compiled conversion between two formats.
+
+path : sequence of layouts visited by the conversion
+matrix : 4x4 matrix in row-vector form, i.e. the result is `boxes @ matrix`
+scale_power : 1 if the result has to be multiplied by (w, h, w, h) of the image,
+    -1 if it has to be divided by it, 0 if the image size is not needed
+"""
+
+
+def parse_format(fmt):
+    """
+    Splits a format name into the layout and a flag of relative coordinates.
+
+    >>> parse_format("cxcywh_rel")
+    ('cxcywh', True)
+    >>> parse_format("xyxy")
+    ('x0y0x1y1', False)
+    """
+    layout, relative = fmt, False
+    for suffix, is_relative in (("_rel", True), ("_abs", False)):
+        if fmt.endswith(suffix):
+            layout, relative = fmt[:-len(suffix)], is_relative
+            break
+    layout = _ALIASES.get(layout, layout)
+    if layout not in LAYOUTS:
+        raise ValueError("Unknown bounding box format {!r}. Supported layouts: {}".format(fmt, ", ".join(LAYOUTS)))
+    return layout, relative
+
+
+def _find_path(src, dst):
+    previous = {src: None}
+    queue = deque([src])
+    while queue:
+        node = queue.popleft()
+        if node == dst:
+            break
+        for a, b in _EDGES:
+            if a == node and b not in previous:
+                previous[b] = node
+                queue.append(b)
+    path = [dst]
+    while previous[path[-1]] is not None:
+        path.append(previous[path[-1]])
+    return tuple(reversed(path))
+
+
+def _matmul(a, b):
+    return tuple(
+        tuple(sum(a[i][k] * b[k][j] for k in range(4)) for j in range(4))
+        for i in range(4)
+    )
+
+
+@lru_cache(maxsize=None)
+def compile_plan(src, dst):
+    """
+    Finds the chain of conversions from `src` to `dst` format and folds it into one linear map.
+
+    Scaling between absolute and relative coordinates commutes with all layout conversions,
+    so it is applied once after the matrix product.
+
+    >>> compile_plan("x0y0wh", "x0y0x1y1").matrix
+    ((1, 0, 1, 0), (0, 1, 0, 1), (0, 0, 1, 0), (0, 0, 0, 1))
+    >>> compile_plan("cxcywh_rel", "xyxy_abs").scale_power
+    1
+    """
+    src_layout, src_relative = parse_format(src)
+    dst_layout, dst_relative = parse_format(dst)
+    path = _find_path(src_layout, dst_layout)
+    matrix = _IDENTITY
+    for a, b in zip(path, path[1:]):
+        matrix = _matmul(_EDGES[(a, b)], matrix)
+    # transpose to apply the matrix from the right to boxes stored in the last axis
+    matrix = tuple(
+        tuple(int(v) if float(v).is_integer() else v for v in column)
+        for column in zip(*matrix)
+    )
+    return Plan(path, matrix, int(src_relative) - int(dst_relative))
+
+
+def is_integral(plan):
+    """
+    Returns True if the plan maps integer coordinates to integer coordinates.
+    """
+    return plan.scale_power == 0 and all(isinstance(v, int) for row in plan.matrix for v in row)
@@ -0,0 +1,188 @@
+"""
+Anchor (prior box) grids of detectors.
+"""
+import math
+from collections import OrderedDict, namedtuple
+
+import numpy as np
+from simplebbox._formats import parse_format
+from simplebbox.backends import get_backend
+
+__all__ = ["AnchorGenerator", "CacheInfo"]
+
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "entries", "bytes"])
+
+
+def _nbytes(arr):
+    nbytes = getattr(arr, "nbytes", None)
+    return nbytes if nbytes is not None else arr.element_size() * arr.numel()
+
+
+class AnchorGenerator:
+    """
+    Generates anchors for feature maps of several levels.
+
+    Level `i` has stride `strides[i]`: cell (x, y) of its feature map is centered at
+    ((x + offset) * stride, (y + offset) * stride) of the image. Every cell gets an anchor for each combination
+    of a size of `sizes[i]` and an aspect ratio (height / width) of `aspect_ratios[i]`,
+    having the area of size ** 2. Anchors are ordered by row, column, size and aspect ratio of the cells.
+
+    Grids are cached in an LRU cache keyed by the level, feature map size, image size, dtype and device.
+    The cache is bounded both by the number of grids and by their total size in bytes.
+    Cached grids are returned without copying and must not be modified; numpy grids are read-only.
+
+    Parameters
+    ----------
+    strides : strides of the levels
+    sizes : sizes of the anchors of every level, a number or a sequence of numbers per level
+    aspect_ratios : aspect ratios of the anchors, a sequence for all levels or a sequence of sequences per level
+    fmt : format of the anchors, e.g. "x0y0x1y1" or "cxcywh_rel". Relative formats require `image_wh`.
+    offset : position of the anchor centers within the cells
+    cache_size : maximal number of cached grids
+    max_cache_bytes : maximal total size of cached grids
+
+    >>> generator = AnchorGenerator(strides=[16], sizes=[32], aspect_ratios=[1.])
+    >>> generator([(2, 1)])[0].tolist()
+    [[-8.0, -8.0, 24.0, 24.0], [8.0, -8.0, 40.0, 24.0]]
+    """
+
+    def __init__(self, strides, sizes, aspect_ratios=(0.5, 1., 2.), fmt="x0y0x1y1", offset=0.5, cache_size=32,
+                 max_cache_bytes=64 << 20):
+        if len(strides) != len(sizes):
+            raise ValueError("strides and sizes must have the same number of levels")
+        if aspect_ratios and isinstance(aspect_ratios[0], (int, float)):
+            aspect_ratios = [aspect_ratios] * len(strides)
+        if len(aspect_ratios) != len(strides):
+            raise ValueError("aspect_ratios must be given for all levels or for each level")
+        parse_format(fmt)
+        self.strides = list(strides)
+        self.sizes = [tuple(s) if isinstance(s, (list, tuple)) else (s,) for s in sizes]
+        self.aspect_ratios = [tuple(r) for r in aspect_ratios]
+        self.fmt = fmt
+        self.offset = offset
+        self.cache_size = cache_size
+        self.max_cache_bytes = max_cache_bytes
+        self._cell_wh = [self._cell_anchors(s, r) for s, r in zip(self.sizes, self.aspect_ratios)]
+        self._cache = OrderedDict()
+        self._cache_bytes = 0
+        self._hits = 0
+        self._misses = 0
+
+    @staticmethod
+    def _cell_anchors(sizes, aspect_ratios):
+        return np.array([
+            (size / math.sqrt(ratio), size * math.sqrt(ratio)) for size in sizes for ratio in aspect_ratios
+        ])
+
+    def num_anchors_per_location(self):
+        """
+        Returns the number of anchors of a cell for every level.
+        """
+        return [len(wh) for wh in self._cell_wh]
+
+    def cache_info(self):
+        """
+        Returns statistics of the cache: numbers of hits and misses, number and total size of cached grids.
+        """
+        return CacheInfo(self._hits, self._misses, len(self._cache), self._cache_bytes)
+
+    def cache_clear(self):
+        self._cache.clear()
+        self._cache_bytes = 0
+        self._hits = self._misses = 0
+
+    def _grid(self, level, xs, ys):
+        """
+        Returns anchors of cells `xs` x `ys` of the level in format cxcywh,
+        an array of shape (len(ys) * len(xs) * A, 4).
+        """
+        stride = self.strides[level]
+        cell_wh = self._cell_wh[level]
+        cy, cx = np.meshgrid((ys + self.offset) * stride, (xs + self.offset) * stride, indexing="ij")
+        res = np.empty((cx.size, len(cell_wh), 4))
+        res[..., 0] = cx.reshape(-1, 1)
+        res[..., 1] = cy.reshape(-1, 1)
+        res[..., 2:] = cell_wh
+        return res.reshape(-1, 4)
+
+    def _emit(self, cxcywh, image_wh, like):
+        backend = get_backend(like)
+        anchors = backend.astype(backend.asarray(cxcywh, like), like.dtype)
+        layout, relative = parse_format(self.fmt)
+        if layout == "cxcywh" and not relative:
+            return anchors
+        if relative and image_wh is None:
+            raise ValueError("image_wh is required for anchors of format {!r}".format(self.fmt))
+        if image_wh is not None:
+            image_wh = backend.astype(backend.asarray(list(image_wh), like), like.dtype)
+        return backend.convert(anchors, "cxcywh", self.fmt, image_wh)
+
+    def _cached(self, key, create):
+        res = self._cache.get(key)
+        if res is not None:
+            self._hits += 1
+            self._cache.move_to_end(key)
+            return res
+        self._misses += 1
+        res = create()
+        nbytes = _nbytes(res)
+        if nbytes <= self.max_cache_bytes and self.cache_size > 0:
+            if isinstance(res, np.ndarray):
+                res.flags.writeable = False
+            self._cache[key] = res
+            self._cache_bytes += nbytes
+            while len(self._cache) > self.cache_size or self._cache_bytes > self.max_cache_bytes:
+                _, evicted = self._cache.popitem(last=False)
+                self._cache_bytes -= _nbytes(evicted)
+        return res
+
+    def __call__(self, feature_wh, image_wh=None, like=None):
+        """
+        Returns anchors of all levels.
+
+        Parameters
+        ----------
+        feature_wh : width and height of the feature map of every level
+        image_wh : width and height of the image, required for relative formats
+        like : numpy array or torch tensor defining the type, dtype and device of the anchors,
+            float32 numpy arrays by default
+
+        Returns
+        -------
+        list of arrays of shape (height * width * A, 4), one per level
+        """
+        if len(feature_wh) != len(self.strides):
+            raise ValueError("feature_wh must be given for {} levels".format(len(self.strides)))
+        like = np.empty(0, dtype=np.float32) if like is None else like
+        image_wh = None if image_wh is None else tuple(int(v) for v in image_wh)
+        res = []
+        for level, (w, h) in enumerate(feature_wh):
+            key = (level, int(w), int(h), image_wh, type(like), str(like.dtype), str(getattr(like, "device", "")))
+            res.append(self._cached(key, lambda: self._emit(
+                self._grid(level, np.arange(w), np.arange(h)), image_wh, like)))
+        return res
+
+    def tiles(self, level, feature_wh, tile_wh, image_wh=None, like=None):
+        """
+        Generates anchors of a level tile by tile, without creating the whole grid. Tiles are not cached.
+
+        Parameters
+        ----------
+        level : index of the level
+        feature_wh : width and height of the feature map
+        tile_wh : width and height of a tile in cells
+        image_wh, like : see `__call__`
+
+        Yields
+        ------
+        tuples ((x0, y0, x1, y1), anchors): the window of cells of the tile and their anchors
+        of shape ((y1 - y0) * (x1 - x0) * A, 4) ordered as in `__call__`
+        """
+        like = np.empty(0, dtype=np.float32) if like is None else like
+        w, h = feature_wh
+        tw, th = tile_wh
+        for y0 in range(0, h, th):
+            for x0 in range(0, w, tw):
+                x1, y1 = min(x0 + tw, w), min(y0 + th, h)
+                cxcywh = self._grid(level, np.arange(x0, x1), np.arange(y0, y1))
+                yield (x0, y0, x1, y1), self._emit(cxcywh, image_wh, like)
@@ -0,0 +1,429 @@
+"""
+Streaming conversion of annotation files between COCO, YOLO and Pascal VOC.
+
+Readers are generators of `ImageBoxes` with boxes of one image in the native format of the annotation
+format (see `FORMATS`). `convert_annotations` collects them into chunks of boxes, converts every chunk
+with a single call of `bbox_numpy.convert` and passes the results to a writer,
+so memory does not depend on the size of the dataset.
+"""
+import array
+import json
+import os
+import tempfile
+import time
+import xml.etree.ElementTree as ET
+from collections import namedtuple
+
+import numpy as np
+from simplebbox._formats import compile_plan
+from simplebbox.numpy_array import bbox_numpy
+
+__all__ = [
+    "ImageBoxes", "ConversionStats", "FORMATS",
+    "read_coco", "read_yolo", "read_voc", "read_yolo_file", "read_voc_file", "list_files",
+    "CocoWriter", "YoloWriter", "VocWriter",
+    "convert_annotations",
+]
+
+ImageBoxes = namedtuple("ImageBoxes", ["file_name", "width", "height", "boxes", "labels"])
+ImageBoxes.__doc__ = """
+Boxes of one image.
+
+file_name : name of the image file
+width, height : size of the image, None if unknown
+boxes : array of shape (N, 4)
+labels : list of N class names
+"""
+
+ConversionStats = namedtuple("ConversionStats", ["images", "boxes", "seconds"])
+ConversionStats.boxes_per_second = property(lambda self: self.boxes / self.seconds if self.seconds else float("inf"))
+
+
+class _JsonReader:
+    """
+    Incremental reader of JSON text from a file. Values are decoded one by one from a buffer
+    which is refilled as needed, so arrays can be iterated without loading them.
+    """
+
+    def __init__(self, f, chunk_size=1 << 16):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self, size):
+        data = self.f.read(size)
+        self.eof = not data
+        self.buf = self.buf[self.pos:] + data
+        self.pos = 0
+
+    def peek(self):
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in " \t\r\n":
+                self.pos += 1
+            if self.pos < len(self.buf) or self.eof:
+                return self.buf[self.pos:self.pos + 1]
+            self._fill(self.chunk_size)
+
+    def take(self, char):
+        if self.peek() != char:
+            raise ValueError("Invalid JSON: expected {!r} at {!r}".format(char, self.buf[self.pos:self.pos + 20]))
+        self.pos += 1
+
+    def value(self):
+        self.peek()
+        size = self.chunk_size
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.pos)
+                # a number at the end of the buffer may continue in the file
+                if end < len(self.buf) or self.eof:
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            self._fill(size)
+            size *= 2
+
+    def items(self):
+        self.take("[")
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield self.value()
+            char = self.peek()
+            self.take(char)
+            if char == "]":
+                return
+            if char != ",":
+                raise ValueError("Invalid JSON: expected ',' or ']'")
+
+
+def _iter_json_array(path, key):
+    """
+    Iterates over items of the array stored under `key` in the top-level object of a JSON file.
+    Other top-level arrays are skipped item by item.
+    """
+    with open(path, encoding="utf-8") as f:
+        reader = _JsonReader(f)
+        reader.take("{")
+        if reader.peek() == "}":
+            return
+        while True:
+            name = reader.value()
+            reader.take(":")
+            if reader.peek() == "[":
+                items = reader.items()
+                if name == key:
+                    yield from items
+                    return
+                for _ in items:
+                    pass
+            else:
+                reader.value()
+            char = reader.peek()
+            reader.take(char)
+            if char == "}":
+                return
+            if char != ",":
+                raise ValueError("Invalid JSON: expected ',' or '}'")
+
+
+def read_coco(path, grouped=False):
+    """
+    Reads a COCO detection file. Boxes are in format x0y0wh. Every image of the file is yielded once,
+    images without annotations with empty boxes.
+
+    The file is read three times: for categories, for images and for annotations. Annotations need not be
+    grouped by image: by default their boxes are collected in compact arrays (about 40 bytes per annotation)
+    and yielded in the order of the images. With `grouped=True` consecutive annotations of the same image are
+    yielded as they are read, so only categories and image sizes are kept in memory; images without
+    annotations follow at the end, and `ValueError` is raised if annotations of an image are not consecutive.
+    """
+    categories = {c["id"]: c["name"] for c in _iter_json_array(path, "categories")}
+    images = {im["id"]: (im["file_name"], im.get("width"), im.get("height"))
+              for im in _iter_json_array(path, "images")}
+    if not grouped:
+        yield from _read_coco_ungrouped(path, categories, images)
+        return
+    done = set()
+    image_id, boxes, labels = None, [], []
+    for ann in _iter_json_array(path, "annotations"):
+        if ann["image_id"] != image_id:
+            if boxes:
+                yield ImageBoxes(*images[image_id], np.array(boxes, dtype=float), labels)
+            image_id, boxes, labels = ann["image_id"], [], []
+            if image_id in done:
+                raise ValueError("Annotations of image {} are not grouped, read them with grouped=False".format(
+                    image_id))
+            done.add(image_id)
+        boxes.append(ann["bbox"])
+        labels.append(categories.get(ann["category_id"], str(ann["category_id"])))
+    if boxes:
+        yield ImageBoxes(*images[image_id], np.array(boxes, dtype=float), labels)
+    for image_id, image in images.items():
+        if image_id not in done:
+            yield ImageBoxes(*image, np.zeros((0, 4)), [])
+
+
+def _read_coco_ungrouped(path, categories, images):
+    index = {image_id: i for i, image_id in enumerate(images)}
+    image_indices, category_ids, boxes = array.array("q"), array.array("q"), array.array("d")
+    for ann in _iter_json_array(path, "annotations"):
+        image_indices.append(index[ann["image_id"]])
+        category_ids.append(ann["category_id"])
+        boxes.extend(ann["bbox"])
+    image_indices = np.frombuffer(image_indices, dtype=np.int64)
+    order = np.argsort(image_indices, kind="stable")
+    category_ids = np.frombuffer(category_ids, dtype=np.int64)[order]
+    boxes = np.frombuffer(boxes, dtype=float).reshape(-1, 4)[order]
+    ends = np.cumsum(np.bincount(image_indices, minlength=len(images))).tolist()
+    start = 0
+    for image, end in zip(images.values(), ends):
+        labels = [categories.get(c, str(c)) for c in category_ids[start:end].tolist()]
+        yield ImageBoxes(*image, boxes[start:end], labels)
+        start = end
+
+
+def _image_size(image_wh, name):
+    if image_wh is None:
+        return None, None
+    if isinstance(image_wh, dict):
+        return image_wh.get(name, (None, None))
+    return tuple(image_wh)
+
+
+def read_yolo_file(path, classes=None, image_wh=None, image_ext=".jpg"):
+    """
+    Reads one YOLO label file. Returns `ImageBoxes` with boxes in format cxcywh_rel.
+    See `read_yolo` for the parameters.
+    """
+    with open(path) as f:
+        rows = [line.split() for line in f if line.strip()]
+    file_name = os.path.splitext(os.path.basename(path))[0] + image_ext
+    boxes = np.array([row[1:5] for row in rows], dtype=float).reshape(-1, 4)
+    labels = [classes[int(row[0])] if classes else row[0] for row in rows]
+    return ImageBoxes(file_name, *_image_size(image_wh, file_name), boxes, labels)
+
+
+def list_files(directory, ext):
+    """
+    Returns sorted paths of annotation files with extension `ext` in a directory.
+    """
+    return [
+        os.path.join(directory, name) for name in sorted(os.listdir(directory))
+        if name.endswith(ext) and name != "classes.txt"
+    ]
+
+
+def read_yolo(directory, classes=None, image_wh=None, image_ext=".jpg"):
+    """
+    Reads YOLO label files `*.txt` of a directory. Boxes are in format cxcywh_rel.
+
+    Parameters
+    ----------
+    classes : optional list of class names, indexed by the class numbers of the files
+    image_wh : optional size of the images: a (width, height) pair for all images or
+        a dict mapping file names of the images to sizes. Required for conversion to absolute coordinates.
+    image_ext : extension of the image files
+    """
+    for path in list_files(directory, ".txt"):
+        yield read_yolo_file(path, classes, image_wh, image_ext)
+
+
+def read_voc_file(path):
+    """
+    Reads one Pascal VOC annotation file. Returns `ImageBoxes` with boxes in format x0y0x1y1.
+    """
+    root = ET.parse(path).getroot()
+    size = root.find("size")
+    width, height = (None, None) if size is None else \
+        (int(float(size.findtext("width"))), int(float(size.findtext("height"))))
+    boxes, labels = [], []
+    for obj in root.iter("object"):
+        box = obj.find("bndbox")
+        boxes.append([float(box.findtext(tag)) for tag in ("xmin", "ymin", "xmax", "ymax")])
+        labels.append(obj.findtext("name"))
+    file_name = root.findtext("filename") or os.path.splitext(os.path.basename(path))[0] + ".jpg"
+    return ImageBoxes(file_name, width, height, np.array(boxes, dtype=float).reshape(-1, 4), labels)
+
+
+def read_voc(directory):
+    """
+    Reads Pascal VOC annotation files `*.xml` of a directory. Boxes are in format x0y0x1y1.
+    """
+    for path in list_files(directory, ".xml"):
+        yield read_voc_file(path)
+
+
+class CocoWriter:
+    """
+    Writes a COCO detection file. Expects boxes in format x0y0wh.
+
+    Annotations are written to the file as they arrive, image records are collected in a temporary file
+    and appended on `close`.
+    """
+
+    def __init__(self, path):
+        self._f = open(path, "w", encoding="utf-8")
+        self._f.write('{"annotations": [')
+        self._images = tempfile.TemporaryFile("w+", encoding="utf-8")
+        self._image_ids = {}
+        self._category_ids = {}
+        self._n_annotations = 0
+
+    def write(self, image):
+        image_id = self._image_ids.get(image.file_name)
+        if image_id is None:
+            image_id = self._image_ids[image.file_name] = len(self._image_ids) + 1
+            self._images.write(("," if image_id > 1 else "") + json.dumps(
+                {"id": image_id, "file_name": image.file_name, "width": image.width, "height": image.height}))
+        for box, label in zip(image.boxes.tolist(), image.labels):
+            category_id = self._category_ids.setdefault(label, len(self._category_ids) + 1)
+            self._n_annotations += 1
+            self._f.write(("," if self._n_annotations > 1 else "") + json.dumps({
+                "id": self._n_annotations, "image_id": image_id, "category_id": category_id,
+                "bbox": box, "area": box[2] * box[3], "iscrowd": 0,
+            }))
+
+    def close(self):
+        self._f.write('], "images": [')
+        self._images.seek(0)
+        for chunk in iter(lambda: self._images.read(1 << 16), ""):
+            self._f.write(chunk)
+        self._images.close()
+        self._f.write('], "categories": ')
+        json.dump([{"id": i, "name": name} for name, i in self._category_ids.items()], self._f)
+        self._f.write("}")
+        self._f.close()
+
+
+class YoloWriter:
+    """
+    Writes YOLO label files and `classes.txt` to a directory. Expects boxes in format cxcywh_rel.
+
+    Parameters
+    ----------
+    classes : optional list of class names defining class numbers. Labels which are not in the list
+        are numbered after them in the order of appearance. Line i of `classes.txt` is the name of class i.
+    """
+
+    def __init__(self, directory, classes=None):
+        self.directory = directory
+        self.classes = list(classes or [])
+        self._numbers = {name: i for i, name in enumerate(self.classes)}
+        self._written = set()
+        os.makedirs(directory, exist_ok=True)
+
+    def _number(self, label):
+        number = self._numbers.get(label)
+        if number is None:
+            number = self._numbers[label] = len(self._numbers)
+        return number
+
+    def write(self, image):
+        stem = os.path.splitext(image.file_name)[0]
+        mode = "a" if stem in self._written else "w"
+        self._written.add(stem)
+        with open(os.path.join(self.directory, stem + ".txt"), mode) as f:
+            for box, label in zip(image.boxes.tolist(), image.labels):
+                f.write("{} {:.6f} {:.6f} {:.6f} {:.6f}\n".format(self._number(label), *box))
+
+    def close(self):
+        names = sorted(self._numbers, key=self._numbers.get)
+        with open(os.path.join(self.directory, "classes.txt"), "w") as f:
+            f.writelines(name + "\n" for name in names)
+
+
+class VocWriter:
+    """
+    Writes Pascal VOC annotation files to a directory. Expects boxes in format x0y0x1y1.
+    Boxes of an image which was already written are added to its file.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self._written = set()
+        os.makedirs(directory, exist_ok=True)
+
+    def write(self, image):
+        stem = os.path.splitext(image.file_name)[0]
+        path = os.path.join(self.directory, stem + ".xml")
+        if stem in self._written:
+            tree = ET.parse(path)
+            root = tree.getroot()
+        else:
+            self._written.add(stem)
+            root = ET.Element("annotation")
+            ET.SubElement(root, "filename").text = image.file_name
+            if image.width is not None:
+                size = ET.SubElement(root, "size")
+                ET.SubElement(size, "width").text = str(image.width)
+                ET.SubElement(size, "height").text = str(image.height)
+                ET.SubElement(size, "depth").text = "3"
+            tree = ET.ElementTree(root)
+        for box, label in zip(image.boxes.tolist(), image.labels):
+            obj = ET.SubElement(root, "object")
+            ET.SubElement(obj, "name").text = label
+            bndbox = ET.SubElement(obj, "bndbox")
+            for tag, value in zip(("xmin", "ymin", "xmax", "ymax"), box):
+                # integers are written without a fraction, other values with 6 decimals
+                ET.SubElement(bndbox, tag).text = "{:.6f}".format(value).rstrip("0").rstrip(".")
+        tree.write(path)
+
+    def close(self):
+        pass
+
+
+FORMATS = {
+    "coco": ("x0y0wh", read_coco, CocoWriter),
+    "yolo": ("cxcywh_rel", read_yolo, YoloWriter),
+    "voc": ("x0y0x1y1", read_voc, VocWriter),
+}
+
+
+def _chunks(images, chunk_size):
+    chunk, n_boxes = [], 0
+    for image in images:
+        chunk.append(image)
+        n_boxes += len(image.boxes)
+        if n_boxes >= chunk_size:
+            yield chunk
+            chunk, n_boxes = [], 0
+    if chunk:
+        yield chunk
+
+
+def convert_annotations(images, src, dst, writer, chunk_size=1 << 16):
+    """
+    Converts boxes of `images` from format `src` to `dst` and passes them to `writer.write`.
+
+    Boxes of consecutive images are converted together in chunks of about `chunk_size` boxes,
+    with a single call of `bbox_numpy.convert` per chunk.
+
+    Returns
+    -------
+    ConversionStats with the numbers of images and boxes and the time spent.
+    """
+    start = time.perf_counter()
+    needs_size = compile_plan(src, dst).scale_power != 0
+    n_images = n_boxes = 0
+    for chunk in _chunks(images, chunk_size):
+        counts = [len(image.boxes) for image in chunk]
+        boxes = np.concatenate([image.boxes for image in chunk])
+        image_wh = None
+        if needs_size:
+            if any(image.width is None for image in chunk):
+                raise ValueError("Image sizes are required to convert from {} to {}".format(src, dst))
+            image_wh = np.repeat(np.array([[image.width, image.height] for image in chunk], dtype=float),
+                                 counts, axis=0)
+        converted = bbox_numpy.convert(boxes, src, dst, image_wh)
+        for image, image_boxes in zip(chunk, np.split(converted, np.cumsum(counts)[:-1])):
+            writer.write(image._replace(boxes=image_boxes))
+        n_images += len(chunk)
+        n_boxes += len(boxes)
+    return ConversionStats(n_images, n_boxes, time.perf_counter() - start)
@@ -1,5 +1,7 @@
 from typing import Union, List, Tuple
 
+from simplebbox._formats import compile_plan, parse_format
+
 float_or_int = Union[float, int]
 list_or_tuple = Union[List, Tuple]
 pair = Union[
@@ -202,3 +204,254 @@ def xyxy_rel_to_abs(xyxy: list_or_tuple, image_wh: pair, convert_fn=lambda x: x)
         convert_fn(x0 * w), convert_fn(y0 * h),
         convert_fn(x1 * w), convert_fn(y1 * h)
     ))
+
+
+def convert(box: list_or_tuple, src: str, dst: str, image_wh: pair = None, convert_fn=lambda x: x) -> list_or_tuple:
+    """
+    Converts a bounding box between any two formats, see `simplebbox._formats`.
+    A format is a layout ("x0y0x1y1", "x0y0wh" or "cxcywh", also "xyxy" and "xywh")
+    with an optional suffix "_abs" or "_rel". The type of the input is preserved.
+
+    `convert_fn` is applied once to every exact coordinate of the result, as by `ArrayProcessor.convert`
+    with a precision policy. The functions of single conversions, e.g. `cxcywh_to_x0y0x1y1`, round
+    the min corner first and add the size to it, so their results may differ by one.
+
+    Parameters
+    ----------
+    image_wh : tuple of width and height of image. Required for conversions between absolute and relative values.
+
+    >>> convert([100, 200, 10, 20], "x0y0wh", "x0y0x1y1")
+    [100, 200, 110, 220]
+    >>> convert((0.5, 0.5, 0.5, 0.25), "cxcywh_rel", "xyxy_abs", image_wh=(400, 200), convert_fn=round)
+    (100, 75, 300, 125)
+    >>> convert([100, 200, 11, 21], "cxcywh", "x0y0x1y1", convert_fn=round)
+    [94, 190, 106, 210]
+    >>> cxcywh_to_x0y0x1y1([100, 200, 11, 21], convert_fn=round)
+    [94, 190, 105, 211]
+    """
+    plan = compile_plan(src, dst)
+    matrix = plan.matrix
+    res = [
+        sum(m * v for m, v in zip((row[j] for row in matrix), box) if m)
+        for j in range(4)
+    ]
+    if plan.scale_power:
+        if image_wh is None:
+            raise ValueError("image_wh is required to convert from {!r} to {!r}".format(src, dst))
+        w, h = image_wh
+        if plan.scale_power > 0:
+            res = [res[0] * w, res[1] * h, res[2] * w, res[3] * h]
+        else:
+            res = [res[0] / w, res[1] / h, res[2] / w, res[3] / h]
+    return type(box)(convert_fn(v) for v in res)
+
+
+def sanitize(box: list_or_tuple, image_wh: pair = None, min_size: float_or_int = 0, min_area: float_or_int = 0,
+             fmt: str = "x0y0x1y1", clip: bool = True) -> Union[list_or_tuple, None]:
+    """
+    Clips a bounding box to the image and validates it. The type of the input is preserved.
+
+    The box is clipped to [0, width] x [0, height], or to [0, 1] for relative formats.
+    Absolute boxes are clipped only if `image_wh` is given.
+
+    Parameters
+    ----------
+    image_wh : tuple of width and height of image
+    min_size : minimal width and height of the box after clipping
+    min_area : minimal area of the box after clipping
+    fmt : format of the box, the result has the same format
+    clip : if False, the box is only validated
+
+    Returns
+    -------
+    The clipped box or None if it has non-positive width or height (empty, inverted or containing NaN),
+    a side smaller than `min_size` or area smaller than `min_area`.
+
+    >>> sanitize([-10, 20, 30, 40], image_wh=(25, 100))
+    [0, 20, 25, 40]
+    >>> sanitize((5, 5, 2, 20), fmt="x0y0wh", min_size=4) is None
+    True
+    >>> sanitize([30, 20, 10, 40]) is None
+    True
+    """
+    layout, relative = parse_format(fmt)
+    a0, a1, a2, a3 = box
+    if layout == "x0y0x1y1":
+        x0, y0, x1, y1 = a0, a1, a2, a3
+    elif layout == "x0y0wh":
+        x0, y0, x1, y1 = a0, a1, a0 + a2, a1 + a3
+    else:
+        x0, y0 = a0 - a2 / 2, a1 - a3 / 2
+        x1, y1 = x0 + a2, y0 + a3
+    if clip and (relative or image_wh is not None):
+        w, h = (1, 1) if relative else image_wh
+        x0, y0 = min(max(x0, 0), w), min(max(y0, 0), h)
+        x1, y1 = min(max(x1, 0), w), min(max(y1, 0), h)
+    w = x1 - x0
+    h = y1 - y0
+    if not (w > 0 and h > 0 and w >= min_size and h >= min_size and w * h >= min_area):
+        return None
+    if layout == "x0y0x1y1":
+        return type(box)((x0, y0, x1, y1))
+    if layout == "x0y0wh":
+        return type(box)((x0, y0, w, h))
+    return type(box)((x0 + w / 2, y0 + h / 2, w, h))
+
+
+# Batch variants.
+#
+# The functions below process a sequence of boxes in one call. Coordinates are unpacked directly in
+# a list comprehension building the resulting boxes as lists, `convert_fn` is called only if it is given.
+# Other types of boxes (e.g. tuples) are restored afterwards in a single pass.
+
+def _as_sequence(boxes):
+    return boxes if isinstance(boxes, (list, tuple)) else list(boxes)
+
+
+def _restore_types(res: List[list], boxes) -> List[list_or_tuple]:
+    types = set(map(type, boxes))
+    if types <= {list}:
+        return res
+    if types == {tuple}:
+        return list(map(tuple, res))
+    return [type(box)(r) for box, r in zip(boxes, res)]
+
+
+def x0y0wh_to_x0y0x1y1_many(boxes) -> List[list_or_tuple]:
+    """
+    Batch version of `x0y0wh_to_x0y0x1y1`. Returns a list of converted boxes,
+    the type of each box is preserved.
+
+    >>> x0y0wh_to_x0y0x1y1_many([[100, 200, 10, 20], (10, 20, 10, 20)])
+    [[100, 200, 110, 220], (10, 20, 20, 40)]
+    """
+    boxes = _as_sequence(boxes)
+    res = [[x0, y0, x0 + w, y0 + h] for x0, y0, w, h in boxes]
+    return _restore_types(res, boxes)
+
+
+def x0y0x1y1_to_x0y0wh_many(boxes) -> List[list_or_tuple]:
+    """
+    Batch version of `x0y0x1y1_to_x0y0wh`. Returns a list of converted boxes,
+    the type of each box is preserved.
+
+    >>> x0y0x1y1_to_x0y0wh_many([[100, 200, 110, 220], [10, 20, 20, 40]])
+    [[100, 200, 10, 20], [10, 20, 10, 20]]
+    """
+    boxes = _as_sequence(boxes)
+    res = [[x0, y0, x1 - x0, y1 - y0] for x0, y0, x1, y1 in boxes]
+    return _restore_types(res, boxes)
+
+
+def cxcywh_to_x0y0wh_many(boxes, convert_fn=None) -> List[list_or_tuple]:
+    """
+    Batch version of `cxcywh_to_x0y0wh`. Returns a list of converted boxes,
+    the type of each box is preserved.
+
+    >>> cxcywh_to_x0y0wh_many([[100, 200, 10, 20], [100, 200, 11, 21]], convert_fn=round)
+    [[95, 190, 10, 20], [94, 190, 11, 21]]
+    """
+    boxes = _as_sequence(boxes)
+    f = convert_fn
+    if f is None:
+        res = [[cx - w / 2, cy - h / 2, w, h] for cx, cy, w, h in boxes]
+    else:
+        res = [[f(cx - w / 2), f(cy - h / 2), f(w), f(h)] for cx, cy, w, h in boxes]
+    return _restore_types(res, boxes)
+
+
+def cxcywh_to_x0y0wh_int_div_many(boxes, convert_fn=None) -> List[list_or_tuple]:
+    """
+    Batch version of `cxcywh_to_x0y0wh_int_div`. Returns a list of converted boxes,
+    the type of each box is preserved.
+
+    >>> cxcywh_to_x0y0wh_int_div_many([[100, 200, 10, 20], [100, 200, 11, 21]])
+    [[95, 190, 10, 20], [95, 190, 11, 21]]
+    """
+    boxes = _as_sequence(boxes)
+    f = convert_fn
+    if f is None:
+        res = [[cx - w // 2, cy - h // 2, w, h] for cx, cy, w, h in boxes]
+    else:
+        res = [[f(cx - w // 2), f(cy - h // 2), f(w), f(h)] for cx, cy, w, h in boxes]
+    return _restore_types(res, boxes)
+
+
+def cxcywh_to_x0y0x1y1_many(boxes, convert_fn=None) -> List[list_or_tuple]:
+    """
+    Batch version of `cxcywh_to_x0y0x1y1`. Returns a list of converted boxes,
+    the type of each box is preserved.
+
+    >>> cxcywh_to_x0y0x1y1_many([[100, 200, 10, 20], [100, 200, 11, 21]], convert_fn=round)
+    [[95, 190, 105, 210], [94, 190, 105, 211]]
+    """
+    boxes = _as_sequence(boxes)
+    f = convert_fn
+    if f is None:
+        res = [
+            [cx - w / 2, cy - h / 2, cx - w / 2 + w, cy - h / 2 + h]
+            for cx, cy, w, h in boxes
+        ]
+    else:
+        res = [
+            [x0, y0, f(x0 + w), f(y0 + h)]
+            for cx, cy, w, h in boxes
+            for x0, y0 in ((f(cx - w / 2), f(cy - h / 2)),)
+        ]
+    return _restore_types(res, boxes)
+
+
+def cxcywh_to_x0y0x1y1_int_div_many(boxes, convert_fn=None) -> List[list_or_tuple]:
+    """
+    Batch version of `cxcywh_to_x0y0x1y1_int_div`. Returns a list of converted boxes,
+    the type of each box is preserved.
+
+    >>> cxcywh_to_x0y0x1y1_int_div_many([[100, 200, 10, 20], [100, 200, 11, 21]])
+    [[95, 190, 105, 210], [95, 190, 106, 211]]
+    """
+    boxes = _as_sequence(boxes)
+    f = convert_fn
+    if f is None:
+        res = [
+            [cx - w // 2, cy - h // 2, cx - w // 2 + w, cy - h // 2 + h]
+            for cx, cy, w, h in boxes
+        ]
+    else:
+        res = [
+            [x0, y0, f(x0 + w), f(y0 + h)]
+            for cx, cy, w, h in boxes
+            for x0, y0 in ((f(cx - w // 2), f(cy - h // 2)),)
+        ]
+    return _restore_types(res, boxes)
+
+
+def xyxy_abs_to_rel_many(boxes, image_wh: pair) -> List[list_or_tuple]:
+    """
+    Batch version of `xyxy_abs_to_rel` for boxes of the same image. Returns a list of converted boxes,
+    the type of each box is preserved.
+
+    >>> xyxy_abs_to_rel_many([[100, 200, 200, 50], [0, 0, 400, 100]], [400, 200])
+    [[0.25, 1.0, 0.5, 0.25], [0.0, 0.0, 1.0, 0.5]]
+    """
+    boxes = _as_sequence(boxes)
+    w, h = image_wh
+    res = [[x0 / w, y0 / h, x1 / w, y1 / h] for x0, y0, x1, y1 in boxes]
+    return _restore_types(res, boxes)
+
+
+def xyxy_rel_to_abs_many(boxes, image_wh: pair, convert_fn=None) -> List[list_or_tuple]:
+    """
+    Batch version of `xyxy_rel_to_abs` for boxes of the same image. Returns a list of converted boxes,
+    the type of each box is preserved.
+
+    >>> xyxy_rel_to_abs_many([[0.25, 1.0, 0.5, 0.25], (0., 0., 1., 0.5)], [400, 200], int)
+    [[100, 200, 200, 50], (0, 0, 400, 100)]
+    """
+    boxes = _as_sequence(boxes)
+    w, h = image_wh
+    f = convert_fn
+    if f is None:
+        res = [[x0 * w, y0 * h, x1 * w, y1 * h] for x0, y0, x1, y1 in boxes]
+    else:
+        res = [[f(x0 * w), f(y0 * h), f(x1 * w), f(y1 * h)] for x0, y0, x1, y1 in boxes]
+    return _restore_types(res, boxes)
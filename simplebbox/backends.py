@@ -0,0 +1,123 @@
+"""
+Choice of the backend matching the type of the boxes.
+
+Backends are registered by the name of the top-level package defining the array type
+and are imported on first use, so `import simplebbox` imports neither numpy nor torch.
+"""
+import importlib
+
+__all__ = ["register_backend", "get_backend", "convert"]
+
+_REGISTRY = {
+    "numpy": "simplebbox.numpy_array:bbox_numpy",
+    "torch": "simplebbox.torch_tensor:bbox_torch",
+}
+# processors resolved for array types and for array namespaces without a registered backend
+_BY_TYPE = {}
+_BY_NAMESPACE = {}
+
+
+def register_backend(package, processor):
+    """
+    Registers a backend for arrays defined in `package` (e.g. "cupy") or having an array namespace from it.
+
+    Parameters
+    ----------
+    package : name of the top-level package
+    processor : `ArrayProcessor` or a string "module:attribute" naming it, imported on first use
+    """
+    _REGISTRY[package] = processor
+    _BY_TYPE.clear()
+    for name in [name for name in _BY_NAMESPACE if name.partition(".")[0] == package]:
+        del _BY_NAMESPACE[name]
+
+
+def _load(package):
+    processor = _REGISTRY[package]
+    if isinstance(processor, str):
+        module, attribute = processor.split(":")
+        processor = getattr(importlib.import_module(module), attribute)
+        _REGISTRY[package] = processor
+    return processor
+
+
+def _array_api_processor(xp):
+    """
+    Creates a processor for an array namespace following the Python array API standard.
+    It supports the conversions of boxes, but not the functions relying on array methods such as `clip`.
+    """
+    from simplebbox._array_processor import ArrayProcessor
+    return ArrayProcessor(
+        stack_fn=lambda arrays: xp.stack(arrays, axis=-1),
+        asarray_fn=lambda values, like: xp.asarray(values, device=like.device),
+        astype_fn=xp.astype,
+        is_floating_fn=lambda arr: xp.isdtype(arr.dtype, "real floating"),
+        concat_fn=lambda arrays, axis: xp.concat(arrays, axis=axis),
+        xp=xp,
+        round_fn=lambda arr, rounding, dtype: xp.astype(getattr(xp, rounding)(arr), dtype),
+        dtype_fn=lambda name: getattr(xp, name),
+        repeat_fn=lambda arr, counts: xp.repeat(arr, counts, axis=0),
+        name=xp.__name__,
+    )
+
+
+def _resolve(boxes):
+    package = type(boxes).__module__.partition(".")[0]
+    if package in _REGISTRY:
+        return _load(package)
+    namespace_fn = getattr(boxes, "__array_namespace__", None)
+    if namespace_fn is None:
+        raise TypeError("No simplebbox backend for boxes of type {}.{}".format(
+            type(boxes).__module__, type(boxes).__name__))
+    xp = namespace_fn()
+    package = xp.__name__.partition(".")[0]
+    if package in _REGISTRY:
+        return _load(package)
+    processor = _BY_NAMESPACE.get(xp.__name__)
+    if processor is None:
+        processor = _BY_NAMESPACE[xp.__name__] = _array_api_processor(xp)
+    return processor
+
+
+def get_backend(boxes):
+    """
+    Returns the backend for the boxes:
+
+    * module `simplebbox.array` for lists and tuples;
+    * `bbox_numpy` for numpy arrays;
+    * `bbox_torch` for torch tensors;
+    * a registered backend or a generic processor for other arrays supporting `__array_namespace__`.
+    """
+    if isinstance(boxes, (list, tuple)):
+        return importlib.import_module("simplebbox.array")
+    processor = _BY_TYPE.get(type(boxes))
+    if processor is None:
+        processor = _BY_TYPE[type(boxes)] = _resolve(boxes)
+    return processor
+
+
+def convert(boxes, src, dst, image_wh=None):
+    """
+    Converts boxes between any two formats with the backend matching the type of `boxes`.
+
+    Parameters
+    ----------
+    boxes : a box or a sequence of boxes as lists or tuples, or an array of boxes stored in the last axis
+    src : format of the input, e.g. "x0y0wh" or "cxcywh_rel"
+    dst : format of the result
+    image_wh : width and height of the image(s), required for conversions between absolute
+        and relative coordinates. May be a tuple for array inputs too.
+
+    >>> convert([100, 200, 10, 20], "xywh", "xyxy")
+    [100, 200, 110, 220]
+    >>> convert([(0.5, 0.5, 0.5, 0.25)], "cxcywh_rel", "xyxy", image_wh=(400, 200))
+    [(100.0, 75.0, 300.0, 125.0)]
+    """
+    backend = get_backend(boxes)
+    if isinstance(boxes, (list, tuple)):
+        if not boxes or isinstance(boxes[0], (list, tuple)):
+            return type(boxes)(backend.convert(box, src, dst, image_wh) for box in boxes)
+        return backend.convert(boxes, src, dst, image_wh)
+    if isinstance(image_wh, (list, tuple)):
+        image_wh = backend.asarray(image_wh, boxes)
+    return backend.convert(boxes, src, dst, image_wh)
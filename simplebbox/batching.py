@@ -0,0 +1,238 @@
+"""
+Micro-batching of small box requests issued by many coroutines.
+
+Requests collected within a short window are concatenated and processed by one vectorised call
+of an `ArrayProcessor`; the results are split and returned to the awaiting callers.
+
+>>> import asyncio
+>>> async def main():
+...     async with MicroBatcher() as batcher:
+...         return await asyncio.gather(
+...             batcher.convert([[100, 200, 10, 20]], "x0y0wh", "x0y0x1y1"),
+...             batcher.convert((0.5, 0.5, 0.5, 0.25), "cxcywh_rel", "xyxy", image_wh=(400, 200)))
+>>> asyncio.run(main())
+[[[100, 200, 110, 220]], (100.0, 75.0, 300.0, 125.0)]
+"""
+import asyncio
+import time
+from collections import namedtuple
+
+import numpy as np
+from simplebbox.numpy_array import bbox_numpy
+
+__all__ = ["MicroBatcher", "BatcherStats"]
+
+BatcherStats = namedtuple("BatcherStats", [
+    "requests", "batches", "boxes", "mean_batch_requests", "mean_latency", "max_latency", "boxes_per_second",
+    "max_queue_depth",
+])
+BatcherStats.__doc__ = """
+Counters of a `MicroBatcher` since its start or the last `reset_stats`.
+
+requests, batches, boxes : numbers of processed requests, of vectorised calls and of boxes
+mean_batch_requests : mean number of requests per vectorised call
+mean_latency, max_latency : time from submitting a request to its result, in seconds
+boxes_per_second : boxes processed per second of the time spent in the vectorised calls
+max_queue_depth : maximal number of requests waiting in the queue
+"""
+
+_Request = namedtuple("_Request", ["key", "boxes", "extra", "single", "box_type", "future", "submitted"])
+
+
+class MicroBatcher:
+    """
+    Collects conversion and IoU requests of many coroutines into batches processed by one vectorised call.
+
+    A batch is closed when it has `max_batch_boxes` boxes or `max_delay` seconds after its first request.
+    Requests wait in a queue of at most `max_queue` requests; submitting to a full queue waits, which slows
+    the producers down to the speed of the processing.
+
+    Use the batcher as an async context manager, or call `start` and `close`, in a running event loop.
+
+    Parameters
+    ----------
+    processor : `ArrayProcessor` processing the batches, `bbox_numpy` by default
+    max_batch_boxes : maximal number of boxes of a batch (a single larger request is processed alone)
+    max_delay : maximal time in seconds a request waits for other requests
+    max_queue : maximal number of waiting requests
+    """
+
+    def __init__(self, processor=bbox_numpy, max_batch_boxes=8192, max_delay=0.001, max_queue=10000):
+        self.processor = processor
+        self.max_batch_boxes = max_batch_boxes
+        self.max_delay = max_delay
+        self.max_queue = max_queue
+        self._queue = None
+        self._worker = None
+        self.reset_stats()
+
+    async def __aenter__(self):
+        self.start()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    def start(self):
+        if self._worker is None:
+            self._queue = asyncio.Queue(self.max_queue)
+            self._worker = asyncio.get_running_loop().create_task(self._run())
+
+    async def close(self):
+        """
+        Processes the waiting requests and stops the worker.
+        """
+        if self._worker is not None:
+            await self._queue.put(None)
+            await self._worker
+            self._worker = None
+            # requests of producers which were waiting for the full queue
+            rest = []
+            while not self._queue.empty():
+                request = self._queue.get_nowait()
+                if request is not None:
+                    rest.append(request)
+            if rest:
+                self._process(rest)
+
+    def reset_stats(self):
+        self._requests = self._batches = self._boxes = 0
+        self._latency_sum = self._latency_max = self._busy = 0.
+        self._max_depth = 0
+
+    def stats(self):
+        return BatcherStats(
+            self._requests, self._batches, self._boxes, self._requests / max(self._batches, 1),
+            self._latency_sum / max(self._requests, 1), self._latency_max,
+            self._boxes / self._busy if self._busy else 0., self._max_depth)
+
+    async def _submit(self, key, boxes, extra=None):
+        if self._worker is None:
+            self.start()
+        arr = np.asarray(boxes)
+        single = arr.ndim == 1 and arr.size > 0
+        n_boxes = 1 if single else len(boxes)
+        arr = arr.reshape(-1, 4)
+        if len(arr) != n_boxes:
+            raise ValueError("Expected a box or a sequence of boxes of 4 coordinates, got shape {}".format(
+                np.shape(boxes)))
+        if isinstance(boxes, np.ndarray):
+            # results are arrays too
+            box_type = None
+        else:
+            box_type = type(boxes) if single else type(boxes[0]) if n_boxes else list
+            if issubclass(box_type, np.ndarray):
+                box_type = np.asarray
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put(_Request(key + (arr.dtype.kind,), arr, extra, single, box_type, future,
+                                       time.perf_counter()))
+        self._max_depth = max(self._max_depth, self._queue.qsize())
+        return await future
+
+    async def convert(self, boxes, src, dst, image_wh=None):
+        """
+        Converts a box or a sequence of boxes as `simplebbox.array.convert`, batched with other requests.
+        The types of the boxes are preserved; numpy arrays of shape (4,) or (N, 4) give numpy arrays.
+        """
+        return await self._submit(("convert", src, dst, image_wh is None), boxes, image_wh)
+
+    async def iou(self, a, b, fmt="x0y0x1y1"):
+        """
+        Computes IoU of corresponding boxes of `a` and `b`, single boxes or sequences of boxes,
+        batched with other requests. Returns a float or a list of floats.
+        """
+        b = np.asarray(b).reshape(-1, 4)
+        n_boxes = np.asarray(a).size // 4
+        if len(b) != n_boxes:
+            raise ValueError("a and b must have the same number of boxes, got {} and {}".format(n_boxes, len(b)))
+        return await self._submit(("iou", fmt), a, b)
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        closing = False
+        while not closing:
+            request = await self._queue.get()
+            if request is None:
+                break
+            batch, n_boxes = [request], len(request.boxes)
+            deadline = loop.time() + self.max_delay
+            while n_boxes < self.max_batch_boxes:
+                try:
+                    request = self._queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    # the producers fill the queue meanwhile
+                    await asyncio.sleep(timeout)
+                    continue
+                if request is None:
+                    closing = True
+                    break
+                batch.append(request)
+                n_boxes += len(request.boxes)
+            self._process(batch)
+
+    def _process(self, batch):
+        start = time.perf_counter()
+        groups = {}
+        for request in batch:
+            groups.setdefault(request.key, []).append(request)
+        for key, requests in groups.items():
+            try:
+                results = self._compute(key, requests)
+            except Exception as e:
+                if len(requests) == 1:
+                    self._set_exception(requests[0], e)
+                    continue
+                # a bad request fails only itself
+                results = []
+                for request in requests:
+                    try:
+                        results.extend(self._compute(key, [request]))
+                    except Exception as e:
+                        self._set_exception(request, e)
+                        results.append(None)
+            for request, res in zip(requests, results):
+                if not request.future.done():
+                    request.future.set_result(res)
+        done = time.perf_counter()
+        self._busy += done - start
+        self._batches += 1
+        self._requests += len(batch)
+        for request in batch:
+            self._boxes += len(request.boxes)
+            latency = done - request.submitted
+            self._latency_sum += latency
+            self._latency_max = max(self._latency_max, latency)
+
+    @staticmethod
+    def _set_exception(request, e):
+        if not request.future.done():
+            request.future.set_exception(e)
+
+    def _compute(self, key, requests):
+        """
+        Processes the requests of one kind with one vectorised call; returns the results of the requests.
+        """
+        p = self.processor
+        boxes = np.concatenate([r.boxes for r in requests])
+        counts = [len(r.boxes) for r in requests]
+        splits = np.cumsum(counts)[:-1]
+        if key[0] == "iou":
+            values = p.iou(boxes, np.concatenate([r.extra for r in requests]), fmt=key[1]).tolist()
+            res, start = [], 0
+            for r, n in zip(requests, counts):
+                res.append(values[start] if r.single else values[start:start + n])
+                start += n
+            return res
+        image_wh = None
+        if requests[0].extra is not None:
+            image_wh = np.repeat(np.asarray([r.extra for r in requests]), counts, axis=0)
+        converted = p.convert(boxes, key[1], key[2], image_wh)
+        res = []
+        for r, rows in zip(requests, np.split(converted, splits)):
+            if r.box_type is not None:
+                rows = [r.box_type(row) for row in rows.tolist()]
+            res.append(rows[0] if r.single else rows)
+        return res
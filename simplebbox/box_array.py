@@ -0,0 +1,165 @@
+import numpy as np
+from simplebbox._formats import compile_plan, is_integral, parse_format
+
+__all__ = ["BoxArray"]
+
+
+def _format_name(fmt):
+    layout, relative = parse_format(fmt)
+    return layout + "_rel" if relative else layout
+
+
+class BoxArray:
+    """
+    Compact container of bounding boxes tagged with their format.
+
+    Coordinates are stored as structure of arrays: one contiguous numpy buffer of shape (4, N)
+    holding the columns of the boxes. `numpy()` and `torch()` return (N, 4) views of the buffer
+    without copying, so the boxes can be passed to `bbox_numpy` and `bbox_torch` directly.
+
+    Conversions to other formats are computed on first access and cached.
+    Slicing returns views of the buffer (and of the cached conversions).
+
+    Parameters
+    ----------
+    boxes : array-like of shape (N, 4), e.g. a list of boxes
+    fmt : format of the boxes, e.g. "x0y0wh" or "cxcywh_rel"
+    image_wh : optional (width, height) of the image, required for conversions between absolute and relative values
+    dtype : optional dtype of the buffer
+
+    >>> boxes = BoxArray([[100, 200, 10, 20], [10, 20, 10, 20]], fmt="x0y0wh")
+    >>> boxes.x0y0x1y1.tolist()
+    [[100, 200, 110, 220], [10, 20, 20, 40]]
+    >>> boxes[1:].to("cxcywh").numpy().tolist()
+    [[15.0, 30.0, 10.0, 20.0]]
+    """
+    __slots__ = ("_columns", "fmt", "image_wh", "_cache")
+
+    def __init__(self, boxes, fmt="x0y0x1y1", image_wh=None, dtype=None):
+        columns = np.ascontiguousarray(np.asarray(boxes, dtype=dtype).reshape(-1, 4).T)
+        self._init(columns, fmt, image_wh)
+
+    def _init(self, columns, fmt, image_wh):
+        self._columns = columns
+        self.fmt = _format_name(fmt)
+        self.image_wh = None if image_wh is None else tuple(image_wh)
+        self._cache = {self.fmt: self}
+
+    @classmethod
+    def from_columns(cls, columns, fmt="x0y0x1y1", image_wh=None):
+        """
+        Wraps an existing array of shape (4, N) without copying.
+        """
+        if columns.ndim != 2 or columns.shape[0] != 4:
+            raise ValueError("columns must have shape (4, N), got {}".format(columns.shape))
+        res = cls.__new__(cls)
+        res._init(columns, fmt, image_wh)
+        return res
+
+    @classmethod
+    def concatenate(cls, arrays):
+        """
+        Concatenates box arrays of the same format and image size.
+        """
+        arrays = list(arrays)
+        fmt, image_wh = arrays[0].fmt, arrays[0].image_wh
+        if any(a.fmt != fmt or a.image_wh != image_wh for a in arrays):
+            raise ValueError("Only box arrays of the same format and image size can be concatenated")
+        return cls.from_columns(np.concatenate([a._columns for a in arrays], axis=1), fmt, image_wh)
+
+    @property
+    def columns(self):
+        """
+        The underlying buffer of shape (4, N).
+        """
+        return self._columns
+
+    @property
+    def dtype(self):
+        return self._columns.dtype
+
+    def __len__(self):
+        return self._columns.shape[1]
+
+    def __repr__(self):
+        return "BoxArray({!r}, fmt={!r}, image_wh={!r})".format(self.numpy().tolist(), self.fmt, self.image_wh)
+
+    def __getitem__(self, item):
+        if isinstance(item, (int, np.integer)):
+            item = slice(item, item + 1 or None)
+        cache = {}
+        for fmt, converted in self._cache.items():
+            sliced = self.__class__.from_columns(converted._columns[:, item], fmt, self.image_wh)
+            sliced._cache = cache
+            cache[fmt] = sliced
+        return cache[self.fmt]
+
+    def __array__(self, dtype=None, copy=None):
+        return self.numpy() if dtype is None else self.numpy().astype(dtype)
+
+    def numpy(self):
+        """
+        Returns the boxes as a numpy array of shape (N, 4). The array is a view of the buffer.
+        """
+        return self._columns.T
+
+    def torch(self):
+        """
+        Returns the boxes as a torch tensor of shape (N, 4) sharing memory with the buffer.
+        """
+        import torch
+        return torch.from_numpy(self._columns).T
+
+    def to(self, fmt):
+        """
+        Returns the boxes converted to format `fmt`. The result is cached.
+        """
+        fmt = _format_name(fmt)
+        res = self._cache.get(fmt)
+        if res is None:
+            res = self.__class__.from_columns(self._convert_columns(fmt), fmt, self.image_wh)
+            res._cache = self._cache
+            self._cache[fmt] = res
+        return res
+
+    def _convert_columns(self, fmt):
+        plan = compile_plan(self.fmt, fmt)
+        matrix = np.asarray(plan.matrix).T
+        if is_integral(plan) or np.issubdtype(self.dtype, np.floating):
+            matrix = matrix.astype(self.dtype)
+        # (4, 4) @ (4, N) produces the columns of the result directly
+        res = matrix @ self._columns
+        if plan.scale_power:
+            if self.image_wh is None:
+                raise ValueError("image_wh is required to convert from {!r} to {!r}".format(self.fmt, fmt))
+            if plan.scale_power > 0:
+                res *= np.asarray(self.image_wh, dtype=res.dtype)[[0, 1, 0, 1], None]
+            else:
+                # out of place, integer boxes give floating relative coordinates
+                res = res / np.asarray(self.image_wh)[[0, 1, 0, 1], None]
+        return res
+
+    def _layout(self, layout):
+        _, relative = parse_format(self.fmt)
+        return self.to(layout + "_rel" if relative else layout).numpy()
+
+    @property
+    def x0y0x1y1(self):
+        """
+        Boxes in format (min x, min y, max x, max y), absolute or relative as the boxes themselves.
+        """
+        return self._layout("x0y0x1y1")
+
+    @property
+    def x0y0wh(self):
+        """
+        Boxes in format (min x, min y, width, height), absolute or relative as the boxes themselves.
+        """
+        return self._layout("x0y0wh")
+
+    @property
+    def cxcywh(self):
+        """
+        Boxes in format (center x, center y, width, height), absolute or relative as the boxes themselves.
+        """
+        return self._layout("cxcywh")
@@ -0,0 +1,166 @@
+"""
+On-disk storage of boxes of many images.
+
+A store consists of two files:
+
+* the data file: a header of `HEADER_SIZE` bytes followed by packed boxes of shape (N, 4),
+  float32 or int32, little-endian;
+* the index file (the data file name with suffix ".idx"): int64 end offsets of the boxes of every image,
+  i.e. boxes of image `i` are rows `ends[i - 1]:ends[i]` of the data.
+
+The writer only appends, the reader maps both files with `numpy.memmap`,
+so boxes of any image or range of images are accessed without loading the store.
+"""
+import os
+import struct
+
+import numpy as np
+from simplebbox._formats import parse_format
+from simplebbox.numpy_array import bbox_numpy
+
+__all__ = ["BoxStoreWriter", "BoxStore"]
+
+MAGIC = b"SBBOXES"
+VERSION = 1
+HEADER_SIZE = 64
+_HEADER = struct.Struct("<7sB4s16s")
+_DTYPES = {"float32": b"<f4", "int32": b"<i4"}
+
+
+def _index_path(path):
+    return str(path) + ".idx"
+
+
+def _read_header(f):
+    magic, version, dtype, fmt = _HEADER.unpack(f.read(HEADER_SIZE)[:_HEADER.size])
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("Not a box store of version {}".format(VERSION))
+    return np.dtype(dtype.rstrip(b"\0").decode()), fmt.rstrip(b"\0").decode()
+
+
+class BoxStoreWriter:
+    """
+    Appends boxes of images to a store. Images get consecutive ids starting from 0.
+    An existing store is opened for appending with its dtype and format; `ValueError` is raised
+    if `fmt` or `dtype` are given and differ from them.
+
+    Parameters
+    ----------
+    path : path of the data file
+    fmt : format of the stored boxes, e.g. "x0y0wh", "x0y0x1y1" for a new store by default
+    dtype : "float32" or "int32", "float32" for a new store by default
+
+    >>> import tempfile, os
+    >>> path = os.path.join(tempfile.mkdtemp(), "boxes.bin")
+    >>> with BoxStoreWriter(path, fmt="x0y0wh") as writer:
+    ...     writer.append([[100, 200, 10, 20]])
+    ...     writer.append([[1, 2, 3, 4], [5, 6, 7, 8]])
+    0
+    1
+    >>> BoxStore(path)[1].tolist()
+    [[1.0, 2.0, 3.0, 4.0], [5.0, 6.0, 7.0, 8.0]]
+    """
+
+    def __init__(self, path, fmt=None, dtype=None):
+        self.path = path
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                self.dtype, self.fmt = _read_header(f)
+            if fmt is not None and parse_format(fmt) != parse_format(self.fmt):
+                raise ValueError("{} stores boxes in format {}, not {}".format(path, self.fmt, fmt))
+            if dtype is not None and np.dtype(dtype) != self.dtype:
+                raise ValueError("{} stores boxes of dtype {}, not {}".format(path, self.dtype.name, dtype))
+            ends = np.fromfile(_index_path(path), dtype="<i8")
+            self._n_images = len(ends)
+            self._n_boxes = int(ends[-1]) if len(ends) else 0
+            # drop boxes of an interrupted append not recorded in the index
+            with open(path, "r+b") as f:
+                f.truncate(HEADER_SIZE + self._n_boxes * 4 * self.dtype.itemsize)
+        else:
+            fmt = fmt or "x0y0x1y1"
+            dtype = dtype or "float32"
+            if dtype not in _DTYPES:
+                raise ValueError("dtype must be one of {}".format(", ".join(_DTYPES)))
+            parse_format(fmt)
+            self.dtype, self.fmt = np.dtype(_DTYPES[dtype]), fmt
+            with open(path, "wb") as f:
+                f.write(_HEADER.pack(MAGIC, VERSION, _DTYPES[dtype], fmt.encode()).ljust(HEADER_SIZE, b"\0"))
+            open(_index_path(path), "wb").close()
+            self._n_images = 0
+            self._n_boxes = 0
+        self._data = open(path, "ab")
+        self._index = open(_index_path(path), "ab")
+
+    def append(self, boxes):
+        """
+        Appends boxes of shape (N, 4) of the next image. Returns the id of the image.
+        """
+        boxes = np.ascontiguousarray(boxes, dtype=self.dtype).reshape(-1, 4)
+        self._data.write(boxes.tobytes())
+        self._n_boxes += len(boxes)
+        self._index.write(struct.pack("<q", self._n_boxes))
+        self._n_images += 1
+        return self._n_images - 1
+
+    def flush(self):
+        self._data.flush()
+        self._index.flush()
+
+    def close(self):
+        self._data.close()
+        self._index.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class BoxStore:
+    """
+    Read-only random access to a store created by `BoxStoreWriter`.
+
+    Boxes are returned as views of memory-mapped files, so nothing is copied until the boxes are used.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self.dtype, self.fmt = _read_header(f)
+        self.ends = np.memmap(_index_path(path), dtype="<i8", mode="r") \
+            if os.path.getsize(_index_path(path)) else np.zeros(0, dtype="<i8")
+        n_boxes = int(self.ends[-1]) if len(self.ends) else 0
+        self.data = np.memmap(path, dtype=self.dtype, mode="r", offset=HEADER_SIZE, shape=(n_boxes, 4)) \
+            if n_boxes else np.zeros((0, 4), dtype=self.dtype)
+
+    def __len__(self):
+        return len(self.ends)
+
+    def _start(self, image_id):
+        return int(self.ends[image_id - 1]) if image_id > 0 else 0
+
+    def __getitem__(self, image_id):
+        """
+        Returns boxes of the image as an array of shape (N, 4).
+        """
+        if not -len(self) <= image_id < len(self):
+            raise IndexError("image id {} out of range".format(image_id))
+        image_id %= len(self)
+        return self.data[self._start(image_id):int(self.ends[image_id])]
+
+    def range(self, start, stop):
+        """
+        Returns boxes of images `start`, ..., `stop - 1` and offsets of the images within them:
+        boxes of image `start + i` are `boxes[offsets[i]:offsets[i + 1]]`.
+        """
+        start, stop, _ = slice(start, stop).indices(len(self))
+        first = self._start(start)
+        offsets = np.concatenate([[0], self.ends[start:stop] - first])
+        return self.data[first:first + int(offsets[-1])], offsets
+
+    def convert(self, image_id, dst, image_wh=None):
+        """
+        Returns boxes of the image converted from the format of the store to `dst` with `bbox_numpy.convert`.
+        """
+        return bbox_numpy.convert(self[image_id], self.fmt, dst, image_wh)
@@ -0,0 +1,59 @@
+"""
+Command line interface.
+
+    simplebbox-convert --from coco --to yolo annotations.json labels/
+"""
+import argparse
+import sys
+
+from simplebbox.annotations import FORMATS, convert_annotations
+
+
+def _size(text):
+    width, height = text.lower().split("x")
+    return int(width), int(height)
+
+
+def _read_classes(path):
+    with open(path) as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="simplebbox-convert",
+        description="Converts annotations between COCO (json file), YOLO (directory of txt files) "
+                    "and Pascal VOC (directory of xml files).")
+    parser.add_argument("src", help="input file or directory")
+    parser.add_argument("dst", help="output file or directory")
+    parser.add_argument("--from", dest="src_format", choices=sorted(FORMATS), required=True)
+    parser.add_argument("--to", dest="dst_format", choices=sorted(FORMATS), required=True)
+    parser.add_argument("--classes", help="file with class names, one per line, for YOLO input and output")
+    parser.add_argument("--image-size", type=_size, metavar="WxH",
+                        help="size of all images, required to read YOLO labels into absolute coordinates")
+    parser.add_argument("--grouped", action="store_true",
+                        help="annotations of COCO input are grouped by image: stream them with constant memory")
+    parser.add_argument("--chunk-size", type=int, default=1 << 16, help="number of boxes converted at once")
+    args = parser.parse_args(argv)
+
+    classes = _read_classes(args.classes) if args.classes else None
+    src_fmt, read, _ = FORMATS[args.src_format]
+    dst_fmt, _, writer_cls = FORMATS[args.dst_format]
+    if args.src_format == "yolo":
+        images = read(args.src, classes=classes, image_wh=args.image_size)
+    elif args.src_format == "coco":
+        images = read(args.src, grouped=args.grouped)
+    else:
+        images = read(args.src)
+    writer = writer_cls(args.dst, classes=classes) if args.dst_format == "yolo" else writer_cls(args.dst)
+    try:
+        stats = convert_annotations(images, src_fmt, dst_fmt, writer, chunk_size=args.chunk_size)
+    finally:
+        writer.close()
+    print("{} images, {} boxes in {:.2f} s, {:.0f} boxes/s".format(
+        stats.images, stats.boxes, stats.seconds, stats.boxes_per_second), file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
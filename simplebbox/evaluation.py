@@ -0,0 +1,303 @@
+"""
+COCO-style evaluation of detections: average precision and recall at the standard COCO breakpoints.
+
+The results reproduce `pycocotools.cocoeval.COCOeval` with `iouType="bbox"`. Instead of looping over images,
+categories and detections in Python, detections of all (image, category) pairs are matched to the ground truth
+simultaneously: at step `i` the i-th best detections of all the pairs are matched for all IoU thresholds at once.
+Categories are independent, so they can be evaluated in parallel shards.
+
+>>> gt = GroundTruth(image_ids=[1, 1], category_ids=[1, 2], boxes=[[10, 10, 20, 20], [50, 50, 10, 10]])
+>>> dt = Detections(image_ids=[1, 1], category_ids=[1, 2], boxes=[[10, 10, 20, 20], [0, 0, 5, 5]], scores=[.9, .8])
+>>> round(float(evaluate(gt, dt).stats[0]), 3)
+0.5
+"""
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from simplebbox._formats import parse_format
+from simplebbox.numpy_array import bbox_numpy
+
+__all__ = [
+    "GroundTruth", "Detections", "Evaluation", "evaluate", "IOU_THRESHOLDS", "RECALL_THRESHOLDS", "AREA_RANGES",
+    "MAX_DETS", "STAT_NAMES",
+]
+
+IOU_THRESHOLDS = np.linspace(.5, .95, 10)
+RECALL_THRESHOLDS = np.linspace(.0, 1., 101)
+AREA_RANGES = (("all", 0, 1e5 ** 2), ("small", 0, 32 ** 2), ("medium", 32 ** 2, 96 ** 2), ("large", 96 ** 2, 1e5 ** 2))
+MAX_DETS = (1, 10, 100)
+STAT_NAMES = ("AP", "AP50", "AP75", "APs", "APm", "APl", "AR1", "AR10", "AR100", "ARs", "ARm", "ARl")
+
+GroundTruth = namedtuple("GroundTruth", ["image_ids", "category_ids", "boxes", "iscrowd", "areas"],
+                         defaults=(None, None))
+GroundTruth.__doc__ = """
+Ground truth boxes of all images.
+
+image_ids, category_ids : integer arrays of shape (N,)
+boxes : array of shape (N, 4)
+iscrowd : optional boolean array of shape (N,), crowd boxes are ignored and can be matched by many detections
+areas : optional areas used for the area ranges, width * height of the boxes by default
+"""
+
+Detections = namedtuple("Detections", ["image_ids", "category_ids", "boxes", "scores"])
+Detections.__doc__ = """
+Detected boxes of all images.
+
+image_ids, category_ids : integer arrays of shape (N,)
+boxes : array of shape (N, 4)
+scores : array of shape (N,)
+"""
+
+Evaluation = namedtuple("Evaluation", ["stats", "precision", "recall", "category_ids"])
+Evaluation.__doc__ = """
+Results of `evaluate`, see `COCOeval.eval` and `COCOeval.stats`.
+
+stats : the 12 summary values named by `STAT_NAMES`, -1 if undefined
+precision : array of shape (T, R, K, A, M) for IoU thresholds, recall thresholds, categories, area ranges
+    and maximal numbers of detections, -1 for categories without ground truth
+recall : array of shape (T, K, A, M)
+category_ids : sorted ids of the evaluated categories
+"""
+
+
+def _to_x0y0wh(boxes, image_ids, fmt, image_wh):
+    boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+    wh = None
+    if parse_format(fmt)[1]:
+        if image_wh is None:
+            raise ValueError("image_wh is required to evaluate boxes of format {!r}".format(fmt))
+        ids = np.array(sorted(image_wh))
+        sizes = np.array([image_wh[i] for i in ids], dtype=np.float64)
+        wh = sizes[np.searchsorted(ids, image_ids)]
+    return bbox_numpy.convert(boxes, fmt, "x0y0wh", wh)
+
+
+def _iou(dt, gt, crowd):
+    """
+    IoU of detections (..., D, 4) and ground truth (..., G, 4) in format x0y0wh computed as by pycocotools:
+    for crowd ground truth boxes the intersection is divided by the area of the detection.
+    """
+    dx, dy, dw, dh = (dt[..., :, None, i] for i in range(4))
+    gx, gy, gw, gh = (gt[..., None, :, i] for i in range(4))
+    w = np.minimum(dx + dw, gx + gw) - np.maximum(dx, gx)
+    h = np.minimum(dy + dh, gy + gh) - np.maximum(dy, gy)
+    overlaps = (w > 0) & (h > 0)
+    inter = w * h
+    det_area = dw * dh
+    union = np.where(crowd[..., None, :], det_area, det_area + gw * gh - inter)
+    return np.divide(inter, union, out=np.zeros(inter.shape), where=overlaps)
+
+
+def _match(ious, gt_valid, gt_ignore, gt_crowd, n_dets):
+    """
+    Greedy matching of COCOeval for many (image, category) pairs at once.
+
+    Parameters
+    ----------
+    ious : array (P, D, G) of IoU between detections sorted by score and ground truth of P pairs
+    gt_valid, gt_ignore, gt_crowd : boolean arrays (P, G)
+    n_dets : numbers of detections of the pairs
+
+    Returns
+    -------
+    boolean arrays (P, T, D): detections matched at every IoU threshold, detections matched to ignored ground truth
+    """
+    n_pairs, n_d, n_g = ious.shape
+    thresholds = np.minimum(IOU_THRESHOLDS, 1 - 1e-10)[None, :, None]
+    gt_matched = np.zeros((n_pairs, len(IOU_THRESHOLDS), n_g), dtype=bool)
+    dt_matched = np.zeros((n_pairs, len(IOU_THRESHOLDS), n_d), dtype=bool)
+    dt_ignore = np.zeros_like(dt_matched)
+    cols = np.arange(len(IOU_THRESHOLDS))[None, :]
+    regular = gt_valid & ~gt_ignore
+    for d in range(n_d):
+        # pairs having a d-th detection
+        active = np.flatnonzero(n_dets > d)
+        rows = active[:, None]
+        iou = ious[active, None, d, :]
+        crowd = gt_crowd[rows]
+        candidates = (iou >= thresholds) & (~gt_matched[active] | crowd) & gt_valid[rows]
+        # COCOeval takes the best regular ground truth box and only if there is none the best ignored one;
+        # among equal IoU the last box wins
+        has_regular = (candidates & regular[rows]).any(axis=-1, keepdims=True)
+        candidates &= ~has_regular | regular[rows]
+        found = candidates.any(axis=-1)
+        m = n_g - 1 - np.argmax(np.where(candidates, iou, -1.)[..., ::-1], axis=-1)
+        dt_matched[active, :, d] = found
+        dt_ignore[active, :, d] = found & gt_ignore[rows, m]
+        gt_matched[rows, cols, m] |= found & ~gt_crowd[rows, m]
+    return dt_matched, dt_ignore
+
+
+def _group_positions(groups):
+    """
+    For sorted group keys returns the position of every element within its group.
+    """
+    starts = np.searchsorted(groups, groups, side="left")
+    return np.arange(len(groups)) - starts
+
+
+def _evaluate_categories(task):
+    gt, dt, categories, chunk_size = task
+    n_t, n_r, n_k, n_a, n_m = len(IOU_THRESHOLDS), len(RECALL_THRESHOLDS), len(categories), len(AREA_RANGES), \
+        len(MAX_DETS)
+    precision = -np.ones((n_t, n_r, n_k, n_a, n_m))
+    recall = -np.ones((n_t, n_k, n_a, n_m))
+
+    gt_image, gt_cat, gt_boxes, gt_crowd, gt_area = gt
+    dt_image, dt_cat, dt_boxes, dt_scores = dt
+    images = np.unique(np.concatenate([gt_image, dt_image]))
+    n_images = len(images)
+
+    # (category, image) pairs in the order of COCOeval: category-major, images sorted by id
+    gt_key = np.searchsorted(categories, gt_cat) * n_images + np.searchsorted(images, gt_image)
+    order = np.argsort(gt_key, kind="mergesort")
+    gt_key, gt_boxes, gt_crowd, gt_area = gt_key[order], gt_boxes[order], gt_crowd[order], gt_area[order]
+    gt_cat_index = gt_key // n_images
+
+    dt_key = np.searchsorted(categories, dt_cat) * n_images + np.searchsorted(images, dt_image)
+    order = np.lexsort((-dt_scores, dt_key))
+    dt_key, dt_boxes, dt_scores = dt_key[order], dt_boxes[order], dt_scores[order]
+    dt_rank = _group_positions(dt_key)
+    kept = dt_rank < MAX_DETS[-1]
+    dt_key, dt_boxes, dt_scores, dt_rank = dt_key[kept], dt_boxes[kept], dt_scores[kept], dt_rank[kept]
+    dt_area = dt_boxes[:, 2] * dt_boxes[:, 3]
+
+    # padded (pair, position) layout of the detections and ground truth
+    pairs = np.unique(dt_key)
+    dt_pair = np.searchsorted(pairs, dt_key)
+    in_pairs = np.isin(gt_key, pairs)
+    gt_pair = np.searchsorted(pairs, gt_key[in_pairs])
+    gt_pos = _group_positions(gt_key[in_pairs])
+    gt_index = np.flatnonzero(in_pairs)
+    n_d = int(dt_rank.max()) + 1 if len(dt_rank) else 1
+    n_g = max(int(gt_pos.max()) + 1 if len(gt_pos) else 1, 1)
+
+    dt_matched = np.zeros((n_a, n_t, len(dt_key)), dtype=bool)
+    dt_ignore = np.zeros((n_a, n_t, len(dt_key)), dtype=bool)
+    for start in range(0, len(pairs), chunk_size):
+        stop = start + chunk_size
+        n_p = min(stop, len(pairs)) - start
+        sel_d = (dt_pair >= start) & (dt_pair < stop)
+        sel_g = (gt_pair >= start) & (gt_pair < stop)
+        p_d, r_d = dt_pair[sel_d] - start, dt_rank[sel_d]
+        p_g, r_g, i_g = gt_pair[sel_g] - start, gt_pos[sel_g], gt_index[sel_g]
+        boxes_d = np.zeros((n_p, n_d, 4))
+        boxes_d[p_d, r_d] = dt_boxes[sel_d]
+        boxes_g = np.zeros((n_p, n_g, 4))
+        boxes_g[p_g, r_g] = gt_boxes[i_g]
+        valid = np.zeros((n_p, n_g), dtype=bool)
+        valid[p_g, r_g] = True
+        crowd = np.zeros((n_p, n_g), dtype=bool)
+        crowd[p_g, r_g] = gt_crowd[i_g]
+        area = np.zeros((n_p, n_g))
+        area[p_g, r_g] = gt_area[i_g]
+        n_dets = np.bincount(p_d, minlength=n_p)
+        ious = _iou(boxes_d, boxes_g, crowd)
+        for a, (_, low, high) in enumerate(AREA_RANGES):
+            ignore = crowd | (area < low) | (area > high)
+            matched, matched_ignored = _match(ious, valid, ignore, crowd, n_dets)
+            dt_matched[a][:, sel_d] = matched[p_d, :, r_d].T
+            dt_ignore[a][:, sel_d] = matched_ignored[p_d, :, r_d].T
+
+    dt_cat_index = dt_key // n_images
+    cat_bounds = np.searchsorted(dt_cat_index, np.arange(n_k + 1))
+    for a, (_, low, high) in enumerate(AREA_RANGES):
+        dt_ignore[a] |= ~dt_matched[a] & ((dt_area < low) | (dt_area > high))
+        gt_ignore = gt_crowd | (gt_area < low) | (gt_area > high)
+        n_regular = np.bincount(gt_cat_index[~gt_ignore], minlength=n_k)
+        for k in range(n_k):
+            if n_regular[k] == 0:
+                continue
+            s = slice(cat_bounds[k], cat_bounds[k + 1])
+            for m, max_det in enumerate(MAX_DETS):
+                sel = dt_rank[s] < max_det
+                order = np.argsort(-dt_scores[s][sel], kind="mergesort")
+                matched = dt_matched[a][:, s][:, sel][:, order]
+                ignored = dt_ignore[a][:, s][:, sel][:, order]
+                tp_sum = np.cumsum(matched & ~ignored, axis=1).astype(float)
+                fp_sum = np.cumsum(~matched & ~ignored, axis=1).astype(float)
+                n_det = tp_sum.shape[1]
+                if n_det == 0:
+                    recall[:, k, a, m] = 0
+                    precision[:, :, k, a, m] = 0
+                    continue
+                rc = tp_sum / n_regular[k]
+                pr = tp_sum / (fp_sum + tp_sum + np.spacing(1))
+                recall[:, k, a, m] = rc[:, -1]
+                # precision envelope: maximum of the precision at higher recall
+                pr = np.maximum.accumulate(pr[:, ::-1], axis=1)[:, ::-1]
+                for t in range(n_t):
+                    inds = np.searchsorted(rc[t], RECALL_THRESHOLDS, side="left")
+                    precision[t, :, k, a, m] = np.where(inds < n_det, pr[t, np.minimum(inds, n_det - 1)], 0)
+    return precision, recall
+
+
+def _summarize(precision, recall):
+    def mean(values):
+        values = values[values > -1]
+        return np.mean(values) if len(values) else -1.
+
+    def ap(iou=None, area=0, max_det=2):
+        p = precision[..., area, max_det]
+        return mean(p if iou is None else p[np.where(IOU_THRESHOLDS == iou)[0]])
+
+    def ar(area=0, max_det=2):
+        return mean(recall[..., area, max_det])
+
+    return np.array([
+        ap(), ap(iou=.5), ap(iou=.75), ap(area=1), ap(area=2), ap(area=3),
+        ar(max_det=0), ar(max_det=1), ar(), ar(area=1), ar(area=2), ar(area=3),
+    ])
+
+
+def evaluate(ground_truth, detections, fmt="x0y0wh", image_wh=None, category_ids=None, max_workers=None,
+             n_shards=1, chunk_size=1024):
+    """
+    Evaluates detections against the ground truth as `COCOeval` of pycocotools with `iouType="bbox"`.
+
+    Parameters
+    ----------
+    ground_truth : `GroundTruth`
+    detections : `Detections`. Detections of categories which are not evaluated are ignored.
+    fmt : format of the boxes of both, e.g. "x0y0wh" as in COCO files or "cxcywh_rel"
+    image_wh : dict mapping image ids to (width, height), required for relative formats
+    category_ids : evaluated categories, all categories of the ground truth by default
+    max_workers : number of processes evaluating shards of categories in parallel
+    n_shards : number of shards of categories; with the default 1 everything is evaluated in this process
+    chunk_size : number of (image, category) pairs matched at once, bounds the memory of the matching
+
+    Returns
+    -------
+    `Evaluation`
+    """
+    gt_image = np.asarray(ground_truth.image_ids).reshape(-1)
+    gt_cat = np.asarray(ground_truth.category_ids).reshape(-1)
+    gt_boxes = _to_x0y0wh(ground_truth.boxes, gt_image, fmt, image_wh)
+    gt_crowd = np.zeros(len(gt_image), dtype=bool) if ground_truth.iscrowd is None \
+        else np.asarray(ground_truth.iscrowd, dtype=bool).reshape(-1)
+    gt_area = gt_boxes[:, 2] * gt_boxes[:, 3] if ground_truth.areas is None \
+        else np.asarray(ground_truth.areas, dtype=np.float64).reshape(-1)
+    dt_image = np.asarray(detections.image_ids).reshape(-1)
+    dt_cat = np.asarray(detections.category_ids).reshape(-1)
+    dt_boxes = _to_x0y0wh(detections.boxes, dt_image, fmt, image_wh)
+    dt_scores = np.asarray(detections.scores, dtype=np.float64).reshape(-1)
+
+    categories = np.unique(gt_cat if category_ids is None else np.asarray(category_ids))
+    tasks = []
+    for shard in np.array_split(categories, max(1, min(n_shards, len(categories)))):
+        g = np.isin(gt_cat, shard)
+        d = np.isin(dt_cat, shard)
+        tasks.append((
+            (gt_image[g], gt_cat[g], gt_boxes[g], gt_crowd[g], gt_area[g]),
+            (dt_image[d], dt_cat[d], dt_boxes[d], dt_scores[d]),
+            shard, chunk_size,
+        ))
+    if len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(_evaluate_categories, tasks))
+    else:
+        results = [_evaluate_categories(task) for task in tasks]
+    precision = np.concatenate([p for p, _ in results], axis=2)
+    recall = np.concatenate([r for _, r in results], axis=1)
+    return Evaluation(_summarize(precision, recall), precision, recall, categories)
@@ -0,0 +1,216 @@
+"""
+Opt-in instrumentation of the box functions: call counts, boxes, wall time, input shapes and dtypes.
+
+When enabled, the public methods of `ArrayProcessor` (and so of `bbox_numpy`, `bbox_torch` and other backends)
+and the public functions of `simplebbox.array` are replaced by wrappers recording every call. When disabled,
+the original functions are restored, so there is no overhead at all. Set the environment variable
+`SIMPLEBBOX_INSTRUMENTATION=1` to enable it on `import simplebbox`, or call `enable()`.
+
+Functions of `simplebbox.array` imported by name before `enable()` are not instrumented.
+Calls made by the instrumented functions themselves, e.g. conversions inside `nms`, are not recorded separately.
+
+>>> from simplebbox import array
+>>> enable()
+>>> array.convert([100, 200, 10, 20], "xywh", "xyxy")
+[100, 200, 110, 220]
+>>> stats = snapshot()["array.convert"]
+>>> stats.calls, stats.boxes
+(1, 1)
+>>> disable()
+"""
+import functools
+import threading
+import time
+from collections import Counter, namedtuple
+
+__all__ = ["enable", "disable", "is_enabled", "snapshot", "reset", "add_hook", "remove_hook", "CallStats",
+           "CallRecord"]
+
+# number of distinct shapes and dtypes kept per function, the others are counted as "other"
+MAX_DISTINCT = 64
+
+CallStats = namedtuple("CallStats", ["calls", "boxes", "seconds", "shapes", "dtypes"])
+CallStats.__doc__ = """
+Statistics of calls of a function.
+
+calls, boxes, seconds : numbers of calls and of processed boxes, total wall time
+shapes, dtypes : dicts counting the calls by the shape and the dtype of the first argument
+"""
+
+CallRecord = namedtuple("CallRecord", ["name", "shape", "dtype", "boxes", "seconds"])
+CallRecord.__doc__ = """
+A recorded call passed to the hooks: name of the function, shape and dtype of the first argument,
+number of boxes and wall time in seconds.
+"""
+
+_lock = threading.Lock()
+_local = threading.local()
+_stats = {}
+_hooks = []
+_originals = []
+# str() of numpy dtypes is slow, their names are cached
+_dtype_names = {}
+
+
+class _Stats:
+    __slots__ = ("calls", "boxes", "seconds", "shapes", "dtypes")
+
+    def __init__(self):
+        self.calls = self.boxes = 0
+        self.seconds = 0.
+        self.shapes = Counter()
+        self.dtypes = Counter()
+
+
+def _count(counter, key):
+    if key in counter or len(counter) < MAX_DISTINCT:
+        counter[key] += 1
+    else:
+        counter["other"] += 1
+
+
+def _describe(arg):
+    """
+    Returns the shape, dtype and number of boxes of the first argument of a box function.
+    """
+    shape = getattr(arg, "shape", None)
+    if shape is not None:
+        shape = tuple(shape)
+        boxes = 1
+        for n in shape[:-1]:
+            boxes *= n
+        # dtypes of different libraries may be equal-hashed but must not be compared
+        key = type(arg.dtype), arg.dtype
+        dtype = _dtype_names.get(key)
+        if dtype is None:
+            dtype = _dtype_names[key] = str(arg.dtype)
+        return shape, dtype, boxes
+    if isinstance(arg, (list, tuple)) and arg and isinstance(arg[0], (list, tuple)):
+        return (len(arg), len(arg[0])), type(arg[0][0]).__name__, len(arg)
+    if isinstance(arg, (list, tuple)) and arg:
+        return (len(arg),), type(arg[0]).__name__, 1
+    return (), type(arg).__name__, 0
+
+
+def _record(name, arg, seconds):
+    shape, dtype, boxes = _describe(arg)
+    with _lock:
+        stats = _stats.get(name)
+        if stats is None:
+            stats = _stats[name] = _Stats()
+        stats.calls += 1
+        stats.boxes += boxes
+        stats.seconds += seconds
+        _count(stats.shapes, shape)
+        _count(stats.dtypes, dtype)
+    if _hooks:
+        record = CallRecord(name, shape, dtype, boxes, seconds)
+        for hook in list(_hooks):
+            hook(record)
+
+
+def _wrap(fn, name_of):
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        depth = getattr(_local, "depth", 0)
+        if depth:
+            return fn(*args, **kwargs)
+        _local.depth = 1
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            seconds = time.perf_counter() - start
+            _local.depth = 0
+            name, arg = name_of(args, kwargs)
+            _record(name, arg, seconds)
+    wrapper.__wrapped__ = fn
+    return wrapper
+
+
+def _first_argument(args, kwargs, skip):
+    if len(args) > skip:
+        return args[skip]
+    return next(iter(kwargs.values()), None)
+
+
+def _processor_name(method):
+    def name_of(args, kwargs):
+        # keyed by the processor, not by the type of the boxes: lists passed to bbox_numpy count as numpy
+        return "{}.{}".format(args[0].name or "processor", method), _first_argument(args, kwargs, 1)
+    return name_of
+
+
+def _module_name(function):
+    name = "array." + function
+    return lambda args, kwargs: (name, _first_argument(args, kwargs, 0))
+
+
+def _targets():
+    from simplebbox import array
+    from simplebbox._array_processor import ArrayProcessor
+
+    for name, fn in vars(ArrayProcessor).items():
+        if not name.startswith("_") and name != "with_precision" and callable(fn):
+            yield ArrayProcessor, name, fn, _processor_name(name)
+    for name, fn in vars(array).items():
+        if not name.startswith("_") and callable(fn) and getattr(fn, "__module__", None) == array.__name__:
+            yield array, name, fn, _module_name(name)
+
+
+def enable():
+    """
+    Replaces the box functions with recording wrappers. Does nothing if already enabled.
+    """
+    with _lock:
+        if _originals:
+            return
+        for owner, name, fn, name_of in list(_targets()):
+            _originals.append((owner, name, fn))
+            setattr(owner, name, _wrap(fn, name_of))
+
+
+def disable():
+    """
+    Restores the original functions. The recorded statistics are kept.
+    """
+    with _lock:
+        while _originals:
+            owner, name, fn = _originals.pop()
+            setattr(owner, name, fn)
+
+
+def is_enabled():
+    return bool(_originals)
+
+
+def snapshot():
+    """
+    Returns a dict mapping names of the functions, e.g. "numpy.convert", "torch.iou" or "array.convert",
+    to `CallStats`. Methods of processors are prefixed by the name of the processor, not of the type of the boxes.
+    """
+    with _lock:
+        return {
+            name: CallStats(s.calls, s.boxes, s.seconds, dict(s.shapes), dict(s.dtypes))
+            for name, s in _stats.items()
+        }
+
+
+def reset():
+    """
+    Clears the recorded statistics.
+    """
+    with _lock:
+        _stats.clear()
+
+
+def add_hook(hook):
+    """
+    Registers a function called with a `CallRecord` after every recorded call, e.g. to forward it to a metrics
+    system. Hooks run in the calling thread and should be fast.
+    """
+    _hooks.append(hook)
+
+
+def remove_hook(hook):
+    _hooks.remove(hook)
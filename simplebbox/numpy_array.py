@@ -8,4 +8,52 @@ def _np_stack_last_axis(arrays):
     return np.stack(arrays, axis=-1)
 
 
-bbox_numpy = ArrayProcessor(stack_fn=_np_stack_last_axis)
+def _np_asarray(values, like):
+    return np.asarray(values)
+
+
+def _np_astype(arr, dtype):
+    return arr.astype(dtype, copy=False)
+
+
+def _np_is_floating(arr):
+    return np.issubdtype(arr.dtype, np.floating)
+
+
+def _np_concat(arrays, axis):
+    return np.concatenate(arrays, axis=axis)
+
+
+_NP_ROUNDINGS = {"round": np.rint, "floor": np.floor, "ceil": np.ceil, "trunc": np.trunc}
+
+
+def _np_round(arr, rounding, dtype):
+    # the ufunc writes rounded values directly into an array of the target dtype
+    return _NP_ROUNDINGS[rounding](arr, out=np.empty(arr.shape, dtype=dtype), casting="unsafe")
+
+
+def _np_dtype(name):
+    return np.dtype(name)
+
+
+def _np_repeat(arr, counts):
+    return np.repeat(arr, counts, axis=0)
+
+
+def _np_arange(n, like):
+    return np.arange(n, dtype=np.int64)
+
+
+bbox_numpy = ArrayProcessor(
+    stack_fn=_np_stack_last_axis,
+    asarray_fn=_np_asarray,
+    astype_fn=_np_astype,
+    is_floating_fn=_np_is_floating,
+    concat_fn=_np_concat,
+    xp=np,
+    round_fn=_np_round,
+    dtype_fn=_np_dtype,
+    repeat_fn=_np_repeat,
+    arange_fn=_np_arange,
+    name="numpy",
+)
@@ -0,0 +1,106 @@
+"""
+Parallel conversion of annotation files with a process pool.
+
+Files are split into chunks; every worker process reads a chunk of files and converts all their boxes
+with one call of `bbox_numpy.convert`. For formats with one output file per image (YOLO and VOC)
+the workers write the output files themselves. Otherwise the converted boxes are returned
+to the main process and passed to the writer in the order of the input files.
+"""
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from simplebbox.annotations import (
+    FORMATS, ConversionStats, convert_annotations, list_files, read_voc_file, read_yolo_file,
+)
+
+__all__ = ["convert_files", "list_annotation_files"]
+
+_FILE_READERS = {
+    "yolo": (".txt", read_yolo_file),
+    "voc": (".xml", read_voc_file),
+}
+
+
+class _Collector:
+    def __init__(self):
+        self.images = []
+
+    def write(self, image):
+        self.images.append(image)
+
+
+def _convert_chunk(task):
+    paths, src_format, dst_format, read_options, output_dir, classes = task
+    _, read_file = _FILE_READERS[src_format]
+    if output_dir is None:
+        writer = _Collector()
+    elif dst_format == "yolo":
+        writer = FORMATS[dst_format][2](output_dir, classes=classes)
+    else:
+        writer = FORMATS[dst_format][2](output_dir)
+    stats = convert_annotations(
+        (read_file(path, **read_options) for path in paths),
+        FORMATS[src_format][0], FORMATS[dst_format][0], writer,
+        chunk_size=float("inf"),
+    )
+    return writer.images if output_dir is None else stats
+
+
+def list_annotation_files(directory, src_format):
+    """
+    Returns sorted paths of annotation files of format "yolo" or "voc" in a directory.
+    """
+    return list_files(directory, _FILE_READERS[src_format][0])
+
+
+def convert_files(paths, src_format, dst_format, writer=None, output_dir=None, max_workers=None, chunk_size=64,
+                  read_options=None, classes=None):
+    """
+    Converts annotation files in parallel.
+
+    Parameters
+    ----------
+    paths : list of annotation files of format `src_format`, one file per image ("yolo" or "voc")
+    src_format : format of the input files
+    dst_format : "coco", "yolo" or "voc"
+    writer : writer of the output, e.g. `simplebbox.annotations.CocoWriter`. Called in the main process
+        in the order of `paths`.
+    output_dir : directory for output formats with one file per image ("yolo" or "voc"),
+        used instead of `writer`. The files are written by the worker processes.
+    max_workers : number of worker processes, by default the number of CPUs
+    chunk_size : number of files converted by a worker at once
+    read_options : keyword arguments of the file reader, e.g. `classes` and `image_wh` for YOLO
+    classes : list of class names for YOLO output written to `output_dir`
+
+    Returns
+    -------
+    ConversionStats with the numbers of images and boxes and the time spent.
+    """
+    if src_format not in _FILE_READERS:
+        raise ValueError("Parallel conversion supports only {} input".format(" and ".join(_FILE_READERS)))
+    if (writer is None) == (output_dir is None):
+        raise ValueError("Exactly one of writer and output_dir must be given")
+    if output_dir is not None and dst_format not in _FILE_READERS:
+        raise ValueError("output_dir can be used only for {} output".format(" and ".join(_FILE_READERS)))
+    if output_dir is not None and dst_format == "yolo" and not classes:
+        raise ValueError("classes are required to number classes consistently across workers")
+    start = time.perf_counter()
+    read_options = read_options or {}
+    tasks = [
+        (paths[i:i + chunk_size], src_format, dst_format, read_options, output_dir, classes)
+        for i in range(0, len(paths), chunk_size)
+    ]
+    n_images = n_boxes = 0
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        for res in executor.map(_convert_chunk, tasks):
+            if output_dir is not None:
+                n_images += res.images
+                n_boxes += res.boxes
+                continue
+            for image in res:
+                writer.write(image)
+                n_boxes += len(image.boxes)
+            n_images += len(res)
+    if output_dir is not None and dst_format == "yolo":
+        FORMATS["yolo"][2](output_dir, classes=classes).close()
+    return ConversionStats(n_images, n_boxes, time.perf_counter() - start)
@@ -0,0 +1,232 @@
+"""
+Pool of box buffers in shared memory for passing converted boxes between processes without pickling them.
+
+The pool is one block of `multiprocessing.shared_memory` divided into slots of `slot_boxes` boxes.
+Worker processes (e.g. of a torch `DataLoader`) write converted boxes into free slots and return small
+`BoxHandle` tuples instead of arrays; the main process wraps the slots as numpy arrays or torch tensors
+without copying and releases the slots after use.
+
+>>> with SharedBoxPool(n_slots=2, slot_boxes=10) as pool:
+...     handle = pool.write(np.array([[10, 20, 30, 40]]), src="x0y0wh", dst="x0y0x1y1")
+...     with pool.borrow(handle) as boxes:
+...         boxes.tolist()
+[[10.0, 20.0, 40.0, 60.0]]
+"""
+import contextlib
+import multiprocessing
+import os
+import queue
+import weakref
+from collections import namedtuple
+from multiprocessing import shared_memory
+
+import numpy as np
+from simplebbox._formats import parse_format
+from simplebbox.numpy_array import bbox_numpy
+
+__all__ = ["SharedBoxPool", "BoxHandle"]
+
+BoxHandle = namedtuple("BoxHandle", ["slot", "n_boxes", "generation"])
+BoxHandle.__doc__ = """
+Reference to boxes written into a slot of a `SharedBoxPool`: index of the slot, number of boxes
+and the number of times the slot was taken, which tells handles of earlier uses of the slot apart.
+"""
+
+
+def _attach_memory(name):
+    try:
+        # the creating process owns the memory, attached processes must not unlink it (Python 3.13+)
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        return shared_memory.SharedMemory(name=name)
+
+
+def _release_memory(memory, owner_pid):
+    if os.getpid() != owner_pid:
+        return
+    try:
+        memory.unlink()
+    except FileNotFoundError:
+        pass
+    try:
+        memory.close()
+    except BufferError:
+        # arrays wrapping the memory are still alive, the mapping is released with them
+        pass
+
+
+class SharedBoxPool:
+    """
+    Pool of `n_slots` slots of shared memory holding up to `slot_boxes` boxes of `dtype` each.
+
+    The process creating the pool owns the shared memory: it is unlinked by `close`, on exiting the `with`
+    block or when the pool is garbage collected. Pools in worker processes, forked or pickled at their start,
+    use the same memory and only close their mapping. The indices of free slots are kept
+    in a `multiprocessing.Queue`, so writers wait for free slots when all of them are in use; the pool
+    can be passed to worker processes only at their start, like the queue.
+
+    Every slot has a counter in the shared memory, incremented when the slot is taken and when it is released,
+    so releasing a handle twice or releasing a handle of an earlier use of the slot does nothing.
+
+    Parameters
+    ----------
+    n_slots : number of slots, bounds the number of batches in flight
+    slot_boxes : maximal number of boxes of a slot
+    dtype : dtype of the stored boxes
+    context : multiprocessing context creating the queue of free slots and the lock of the counters,
+        the default context by default
+    """
+
+    def __init__(self, n_slots, slot_boxes, dtype="float32", context=None):
+        self.n_slots = n_slots
+        self.slot_boxes = slot_boxes
+        self.dtype = np.dtype(dtype)
+        # the int64 counters of the slots are followed by the boxes
+        size = n_slots * 8 + n_slots * slot_boxes * 4 * self.dtype.itemsize
+        self._memory = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        context = context or multiprocessing
+        self._free = context.Queue()
+        self._lock = context.Lock()
+        for slot in range(n_slots):
+            self._free.put(slot)
+        self._owner_pid = os.getpid()
+        self._finalizer = weakref.finalize(self, _release_memory, self._memory, self._owner_pid)
+        self._map_arrays()
+        self._counters[:] = 0
+
+    @classmethod
+    def _attach(cls, name, n_slots, slot_boxes, dtype, free, lock):
+        pool = cls.__new__(cls)
+        pool.n_slots = n_slots
+        pool.slot_boxes = slot_boxes
+        pool.dtype = np.dtype(dtype)
+        pool._memory = _attach_memory(name)
+        pool._free = free
+        pool._lock = lock
+        pool._owner_pid = None
+        pool._finalizer = None
+        pool._map_arrays()
+        return pool
+
+    def __reduce__(self):
+        return SharedBoxPool._attach, (self.name, self.n_slots, self.slot_boxes, self.dtype.str, self._free,
+                                       self._lock)
+
+    def _map_arrays(self):
+        buf = self._memory.buf
+        self._counters = np.ndarray((self.n_slots,), dtype=np.int64, buffer=buf)
+        self._slots = np.ndarray((self.n_slots, self.slot_boxes, 4), dtype=self.dtype, buffer=buf,
+                                 offset=self.n_slots * 8)
+
+    @property
+    def name(self):
+        """
+        Name of the shared memory block.
+        """
+        return self._memory.name
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """
+        Releases the shared memory: the owner unlinks it, other processes close their mapping.
+        Arrays and tensors of the pool must not be used afterwards.
+        """
+        self._slots = self._counters = None
+        # forked workers inherit the pool but do not own it
+        if self._owner_pid == os.getpid():
+            self._finalizer()
+            self._free.close()
+            self._free.join_thread()
+            return
+        try:
+            self._memory.close()
+        except BufferError:
+            pass
+
+    def _acquire(self, timeout):
+        """
+        Takes a free slot, waiting at most `timeout` seconds. Returns the index of the slot and its counter.
+        """
+        try:
+            slot = self._free.get(timeout=timeout)
+        except queue.Empty:
+            raise TimeoutError("no free slot in {} seconds".format(timeout)) from None
+        with self._lock:
+            self._counters[slot] += 1
+            return slot, int(self._counters[slot])
+
+    def _release(self, slot, generation):
+        with self._lock:
+            if self._counters[slot] != generation:
+                return
+            self._counters[slot] += 1
+        self._free.put(slot)
+
+    def write(self, boxes, src=None, dst=None, image_wh=None, timeout=None):
+        """
+        Writes boxes of shape (N, 4) into a free slot, converting them from format `src` to `dst` if both
+        are given. Conversions with named functions of `bbox_numpy` write directly into the slot.
+        Waits at most `timeout` seconds (forever by default) for a free slot and raises `TimeoutError` if none
+        became free.
+
+        Returns
+        -------
+        `BoxHandle` to pass to the process reading the boxes
+        """
+        n = len(boxes)
+        if n > self.slot_boxes:
+            raise ValueError("{} boxes do not fit into slots of {} boxes".format(n, self.slot_boxes))
+        slot, generation = self._acquire(timeout)
+        try:
+            out = self._slots[slot, :n]
+            if src is None or dst is None or src == dst:
+                out[...] = boxes
+            else:
+                (src_layout, src_relative), (dst_layout, dst_relative) = parse_format(src), parse_format(dst)
+                write = getattr(bbox_numpy, "{}_to_{}".format(src_layout, dst_layout), None)
+                if write is not None and src_relative == dst_relative:
+                    write(np.asarray(boxes), out=out)
+                else:
+                    out[...] = bbox_numpy.convert(boxes, src, dst, image_wh)
+        except BaseException:
+            self._release(slot, generation)
+            raise
+        return BoxHandle(slot, n, generation)
+
+    def array(self, handle):
+        """
+        Returns the boxes of the handle as a numpy array sharing the memory of the slot.
+        Raises `ValueError` if the handle was released.
+        """
+        if self._counters[handle.slot] != handle.generation:
+            raise ValueError("{} was released".format(handle))
+        return self._slots[handle.slot, :handle.n_boxes]
+
+    def tensor(self, handle):
+        """
+        Returns the boxes of the handle as a torch tensor sharing the memory of the slot.
+        """
+        import torch
+        return torch.from_numpy(self.array(handle))
+
+    def release(self, handle):
+        """
+        Returns the slot of the handle to the pool. Arrays of the slot must not be used afterwards.
+        Releasing a handle which was already released does nothing.
+        """
+        self._release(handle.slot, handle.generation)
+
+    @contextlib.contextmanager
+    def borrow(self, handle, as_tensor=False):
+        """
+        Context manager giving the boxes of the handle as an array (or a tensor) and releasing the slot on exit.
+        """
+        try:
+            yield self.tensor(handle) if as_tensor else self.array(handle)
+        finally:
+            self.release(handle)
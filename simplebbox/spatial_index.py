@@ -0,0 +1,176 @@
+import numpy as np
+from simplebbox.numpy_array import bbox_numpy
+
+__all__ = ["SweepIndex"]
+
+
+def _expand_ranges(starts, stops):
+    """
+    For ranges [starts[i], stops[i]) returns arrays (owner, position) listing every position of every range.
+    """
+    counts = np.maximum(stops - starts, 0)
+    total = int(counts.sum())
+    owner = np.repeat(np.arange(len(starts)), counts)
+    first = np.cumsum(counts) - counts
+    position = np.arange(total) - np.repeat(first - starts, counts)
+    return owner, position
+
+
+def _chunks(counts, max_pairs):
+    """
+    Splits indices of `counts` into consecutive slices with sum of counts not much larger than `max_pairs`.
+    """
+    bounds = np.searchsorted(np.cumsum(counts), np.arange(max_pairs, int(counts.sum()), max_pairs))
+    edges = [0] + sorted(set(int(b) + 1 for b in bounds)) + [len(counts)]
+    return [slice(a, b) for a, b in zip(edges, edges[1:]) if a < b]
+
+
+class SweepIndex:
+    """
+    Spatial index of boxes in format x0y0x1y1 based on sorting by min x (sort and sweep).
+
+    A query box can only intersect indexed boxes with min x in the interval (query min x - max width, query max x),
+    which is a contiguous range of the sorted boxes found by binary search.
+    Only the boxes of this range are checked, so for sparse scenes the work is proportional
+    to the number of actual neighbours rather than to the number of all pairs.
+
+    Boxes are identified by the order of insertion. New boxes can be added at any moment;
+    they are sorted separately and merged with the already sorted boxes on the next query.
+
+    Parameters
+    ----------
+    boxes : optional array of shape (N, 4) with the initial boxes
+    max_pairs : maximal number of candidate pairs processed at once, bounds the memory of pair queries
+
+    >>> index = SweepIndex(np.array([[0, 0, 10, 10], [5, 5, 15, 15], [20, 20, 30, 30]]))
+    >>> index.query_point(7, 7).tolist()
+    [0, 1]
+    >>> rows, cols, iou = index.overlapping_pairs()
+    >>> rows.tolist(), cols.tolist()
+    ([0], [1])
+    """
+
+    def __init__(self, boxes=None, max_pairs=1 << 22):
+        self.max_pairs = max_pairs
+        self._boxes = np.empty((0, 4))
+        self._order = np.empty(0, dtype=np.int64)
+        self._x0 = np.empty(0)
+        self._pending = []
+        self._max_width = 0
+        if boxes is not None:
+            self.add(boxes)
+
+    def __len__(self):
+        return len(self._boxes) + sum(len(b) for b in self._pending)
+
+    def add(self, boxes):
+        """
+        Adds boxes of shape (N, 4) to the index. Returns ids of the added boxes.
+        """
+        boxes = np.asarray(boxes).reshape(-1, 4)
+        start = len(self)
+        self._pending.append(boxes)
+        return np.arange(start, start + len(boxes))
+
+    @property
+    def boxes(self):
+        """
+        All indexed boxes in the order of insertion.
+        """
+        self._build()
+        return self._boxes
+
+    def _build(self):
+        if not self._pending:
+            return
+        new = np.concatenate(self._pending)
+        self._pending = []
+        offset = len(self._boxes)
+        self._boxes = np.concatenate([self._boxes, new]) if offset else new
+        new_order = np.argsort(new[:, 0], kind="stable") + offset
+        # a stable sort of two sorted runs is a merge and takes linear time
+        order = np.concatenate([self._order, new_order])
+        self._order = order[np.argsort(self._boxes[order, 0], kind="stable")]
+        self._x0 = self._boxes[self._order, 0]
+        if len(new):
+            self._max_width = max(self._max_width, (new[:, 2] - new[:, 0]).max())
+
+    def _candidates(self, queries):
+        """
+        Returns ranges of sorted positions of boxes which may intersect the query boxes.
+        """
+        starts = np.searchsorted(self._x0, queries[:, 0] - self._max_width, side="left")
+        stops = np.searchsorted(self._x0, queries[:, 2], side="right")
+        return starts, stops
+
+    def query_window(self, window):
+        """
+        Returns ids of boxes having a common point with the window (x0, y0, x1, y1), sorted.
+        """
+        self._build()
+        window = np.asarray(window).reshape(1, 4)
+        starts, stops = self._candidates(window)
+        ids = self._order[starts[0]:stops[0]]
+        b = self._boxes[ids]
+        x0, y0, x1, y1 = window[0]
+        hit = (b[:, 0] <= x1) & (b[:, 2] >= x0) & (b[:, 1] <= y1) & (b[:, 3] >= y0)
+        return np.sort(ids[hit])
+
+    def query_point(self, x, y):
+        """
+        Returns ids of boxes containing the point, boundaries included, sorted.
+        """
+        return self.query_window((x, y, x, y))
+
+    def query_boxes(self, queries, iou_threshold=0.):
+        """
+        Finds pairs of overlapping boxes between `queries` of shape (M, 4) and the indexed boxes.
+
+        Returns
+        -------
+        tuple (rows, cols, iou) in COO form: indices of the query boxes, ids of the indexed boxes and IoU values.
+        Only pairs with intersection of positive area and IoU greater than `iou_threshold` are returned.
+        """
+        self._build()
+        queries = np.asarray(queries).reshape(-1, 4)
+        starts, stops = self._candidates(queries)
+        return self._pairs(queries, starts, stops, iou_threshold, exclude_self=False)
+
+    def overlapping_pairs(self, iou_threshold=0.):
+        """
+        Finds all pairs of overlapping indexed boxes.
+
+        Returns
+        -------
+        tuple (rows, cols, iou) in COO form with rows < cols.
+        Only pairs with intersection of positive area and IoU greater than `iou_threshold` are returned.
+        """
+        self._build()
+        # every pair is found once: from the box with the smaller min x in the sorted order
+        sorted_boxes = self._boxes[self._order]
+        starts = np.arange(1, len(sorted_boxes) + 1)
+        stops = np.searchsorted(self._x0, sorted_boxes[:, 2], side="left")
+        return self._pairs(sorted_boxes, starts, stops, iou_threshold, exclude_self=True)
+
+    def _pairs(self, queries, starts, stops, iou_threshold, exclude_self):
+        rows, cols, ious = [], [], []
+        for chunk in _chunks(np.maximum(stops - starts, 0), self.max_pairs):
+            owner, position = _expand_ranges(starts[chunk], stops[chunk])
+            owner += chunk.start
+            ids = self._order[position]
+            q, b = queries[owner], self._boxes[ids]
+            iou = bbox_numpy.iou(q, b)
+            hit = (iou > iou_threshold) & (np.minimum(q[:, 2], b[:, 2]) > np.maximum(q[:, 0], b[:, 0])) & \
+                (np.minimum(q[:, 3], b[:, 3]) > np.maximum(q[:, 1], b[:, 1]))
+            owner, ids, iou = owner[hit], ids[hit], iou[hit]
+            if exclude_self:
+                owner = self._order[owner]
+                owner, ids = np.minimum(owner, ids), np.maximum(owner, ids)
+            rows.append(owner)
+            cols.append(ids)
+            ious.append(iou)
+        if not rows:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), np.empty(0)
+        rows, cols, ious = np.concatenate(rows), np.concatenate(cols), np.concatenate(ious)
+        order = np.lexsort((cols, rows))
+        return rows[order], cols[order], ious[order]
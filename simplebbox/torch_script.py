@@ -0,0 +1,299 @@
+"""
+Box operations for torch written as plain type-annotated functions.
+
+Unlike `bbox_torch`, which is built from the generic `ArrayProcessor`, these functions can be compiled
+with `torch.jit.script`, traced by `torch.export` and `torch.compile`, and called from scripted modules,
+so the conversions run inside an exported model graph. Their results match the methods of `bbox_torch`
+with the same names. `nms` and `batched_nms` use shapes not depending on the data, so they are exported
+too, with the graph specialised to the number of boxes.
+
+>>> import torch
+>>> scripted = torch.jit.script(cxcywh_to_x0y0x1y1)
+>>> scripted(torch.tensor([[100., 200., 10., 20.]])).tolist()
+[[95.0, 190.0, 105.0, 210.0]]
+"""
+import math
+from typing import Optional, Tuple
+
+import torch
+from torch import Tensor
+
+__all__ = [
+    "x0y0wh_to_x0y0x1y1", "x0y0x1y1_to_x0y0wh", "cxcywh_to_x0y0wh", "cxcywh_to_x0y0wh_int_div",
+    "cxcywh_to_x0y0x1y1", "cxcywh_to_x0y0x1y1_int_div", "xyxy_abs_to_rel", "xyxy_rel_to_abs", "convert",
+    "iou", "giou", "diou", "ciou", "iou_matrix", "giou_matrix", "diou_matrix", "ciou_matrix", "nms", "batched_nms",
+]
+
+
+def x0y0wh_to_x0y0x1y1(boxes: Tensor) -> Tensor:
+    """
+    Converts boxes from format (min x, min y, width, height) to (min x, min y, max x, max y).
+    """
+    return torch.stack([
+        boxes[..., 0],
+        boxes[..., 1],
+        boxes[..., 0] + boxes[..., 2],
+        boxes[..., 1] + boxes[..., 3],
+    ], dim=-1)
+
+
+def x0y0x1y1_to_x0y0wh(boxes: Tensor) -> Tensor:
+    """
+    Converts boxes from format (min x, min y, max x, max y) to (min x, min y, width, height).
+    """
+    return torch.stack([
+        boxes[..., 0],
+        boxes[..., 1],
+        boxes[..., 2] - boxes[..., 0],
+        boxes[..., 3] - boxes[..., 1],
+    ], dim=-1)
+
+
+def cxcywh_to_x0y0wh(boxes: Tensor) -> Tensor:
+    """
+    Converts boxes from format (center x, center y, width, height) to (min x, min y, width, height).
+    """
+    return torch.stack([
+        boxes[..., 0] - boxes[..., 2] / 2,
+        boxes[..., 1] - boxes[..., 3] / 2,
+        boxes[..., 2],
+        boxes[..., 3],
+    ], dim=-1)
+
+
+def cxcywh_to_x0y0wh_int_div(boxes: Tensor) -> Tensor:
+    """
+    Converts boxes from format (center x, center y, width, height) to (min x, min y, width, height)
+    using integer (floor) division.
+    """
+    return torch.stack([
+        boxes[..., 0] - torch.div(boxes[..., 2], 2, rounding_mode="floor"),
+        boxes[..., 1] - torch.div(boxes[..., 3], 2, rounding_mode="floor"),
+        boxes[..., 2],
+        boxes[..., 3],
+    ], dim=-1)
+
+
+def cxcywh_to_x0y0x1y1(boxes: Tensor) -> Tensor:
+    """
+    Converts boxes from format (center x, center y, width, height) to (min x, min y, max x, max y).
+    """
+    x0 = boxes[..., 0] - boxes[..., 2] / 2
+    y0 = boxes[..., 1] - boxes[..., 3] / 2
+    return torch.stack([x0, y0, x0 + boxes[..., 2], y0 + boxes[..., 3]], dim=-1)
+
+
+def cxcywh_to_x0y0x1y1_int_div(boxes: Tensor) -> Tensor:
+    """
+    Converts boxes from format (center x, center y, width, height) to (min x, min y, max x, max y)
+    using integer (floor) division.
+    """
+    x0 = boxes[..., 0] - torch.div(boxes[..., 2], 2, rounding_mode="floor")
+    y0 = boxes[..., 1] - torch.div(boxes[..., 3], 2, rounding_mode="floor")
+    return torch.stack([x0, y0, x0 + boxes[..., 2], y0 + boxes[..., 3]], dim=-1)
+
+
+def xyxy_abs_to_rel(boxes: Tensor, image_wh: Tensor) -> Tensor:
+    """
+    Converts boxes (x, y, width, height) or (x, y, x, y) from absolute to relative values.
+    `image_wh` holds width and height of the image(s), broadcastable against `boxes[..., :2]`.
+    """
+    w = image_wh[..., 0]
+    h = image_wh[..., 1]
+    return torch.stack([boxes[..., 0] / w, boxes[..., 1] / h, boxes[..., 2] / w, boxes[..., 3] / h], dim=-1)
+
+
+def xyxy_rel_to_abs(boxes: Tensor, image_wh: Tensor) -> Tensor:
+    """
+    Converts boxes (x, y, width, height) or (x, y, x, y) from relative to absolute values.
+    `image_wh` holds width and height of the image(s), broadcastable against `boxes[..., :2]`.
+    """
+    w = image_wh[..., 0]
+    h = image_wh[..., 1]
+    return torch.stack([boxes[..., 0] * w, boxes[..., 1] * h, boxes[..., 2] * w, boxes[..., 3] * h], dim=-1)
+
+
+def _parse_format(fmt: str) -> Tuple[str, bool]:
+    """
+    Scriptable version of `simplebbox._formats.parse_format`.
+    """
+    layout = fmt
+    relative = False
+    if fmt.endswith("_rel"):
+        layout = fmt[:-4]
+        relative = True
+    elif fmt.endswith("_abs"):
+        layout = fmt[:-4]
+    if layout == "xyxy" or layout == "ltrb":
+        layout = "x0y0x1y1"
+    elif layout == "xywh" or layout == "ltwh":
+        layout = "x0y0wh"
+    if layout != "x0y0x1y1" and layout != "x0y0wh" and layout != "cxcywh":
+        raise ValueError("Unknown bounding box format " + fmt)
+    return layout, relative
+
+
+def convert(boxes: Tensor, src: str, dst: str, image_wh: Optional[Tensor] = None) -> Tensor:
+    """
+    Converts boxes between any two formats, e.g. from "cxcywh_rel" to "x0y0x1y1".
+    See `ArrayProcessor.convert` for the format names. Conversions between layouts go through x0y0x1y1.
+    """
+    src_layout, src_relative = _parse_format(src)
+    dst_layout, dst_relative = _parse_format(dst)
+    if src_layout != dst_layout:
+        if src_layout == "x0y0wh":
+            boxes = x0y0wh_to_x0y0x1y1(boxes)
+        elif src_layout == "cxcywh":
+            boxes = cxcywh_to_x0y0x1y1(boxes)
+        if dst_layout == "x0y0wh":
+            boxes = x0y0x1y1_to_x0y0wh(boxes)
+        elif dst_layout == "cxcywh":
+            boxes = torch.stack([
+                (boxes[..., 0] + boxes[..., 2]) / 2,
+                (boxes[..., 1] + boxes[..., 3]) / 2,
+                boxes[..., 2] - boxes[..., 0],
+                boxes[..., 3] - boxes[..., 1],
+            ], dim=-1)
+    if src_relative != dst_relative:
+        if image_wh is None:
+            raise ValueError("image_wh is required to convert from " + src + " to " + dst)
+        if src_relative:
+            boxes = xyxy_rel_to_abs(boxes, image_wh)
+        else:
+            boxes = xyxy_abs_to_rel(boxes, image_wh)
+    return boxes
+
+
+def _overlap(a: Tensor, b: Tensor, kind: str, eps: float) -> Tensor:
+    """
+    IoU of kind "iou", "giou", "diou" or "ciou" between boxes in format x0y0x1y1 broadcasting their leading axes.
+    """
+    ax0, ay0, ax1, ay1 = a[..., 0], a[..., 1], a[..., 2], a[..., 3]
+    bx0, by0, bx1, by1 = b[..., 0], b[..., 1], b[..., 2], b[..., 3]
+    aw, ah = ax1 - ax0, ay1 - ay0
+    bw, bh = bx1 - bx0, by1 - by0
+
+    inter = (torch.minimum(ax1, bx1) - torch.maximum(ax0, bx0)).clamp(min=0) * \
+        (torch.minimum(ay1, by1) - torch.maximum(ay0, by0)).clamp(min=0)
+    union = aw * ah + bw * bh - inter
+    # IoU of boxes with an empty union (zero-area boxes) is 0 and not NaN
+    iou = inter / torch.where(union > 0, union, torch.ones_like(union))
+    if kind == "iou":
+        return iou
+
+    hull_w = torch.maximum(ax1, bx1) - torch.minimum(ax0, bx0)
+    hull_h = torch.maximum(ay1, by1) - torch.minimum(ay0, by0)
+    if kind == "giou":
+        hull = hull_w * hull_h
+        return iou - (hull - union) / (hull + eps)
+
+    center_dist2 = ((bx0 + bx1 - ax0 - ax1) ** 2 + (by0 + by1 - ay0 - ay1) ** 2) / 4
+    diou = iou - center_dist2 / (hull_w ** 2 + hull_h ** 2 + eps)
+    if kind == "diou":
+        return diou
+
+    v = (4 / math.pi ** 2) * (torch.atan(bw / (bh + eps)) - torch.atan(aw / (ah + eps))) ** 2
+    alpha = v / (1 - iou + v + eps)
+    return diou - alpha * v
+
+
+def iou(a: Tensor, b: Tensor, fmt: str = "x0y0x1y1") -> Tensor:
+    """
+    Intersection over union of corresponding boxes of `a` and `b`.
+    """
+    return _overlap(convert(a, fmt, "x0y0x1y1"), convert(b, fmt, "x0y0x1y1"), "iou", 0.)
+
+
+def giou(a: Tensor, b: Tensor, fmt: str = "x0y0x1y1", eps: float = 1e-7) -> Tensor:
+    """
+    Generalized intersection over union of corresponding boxes of `a` and `b`.
+    """
+    return _overlap(convert(a, fmt, "x0y0x1y1"), convert(b, fmt, "x0y0x1y1"), "giou", eps)
+
+
+def diou(a: Tensor, b: Tensor, fmt: str = "x0y0x1y1", eps: float = 1e-7) -> Tensor:
+    """
+    Distance intersection over union of corresponding boxes of `a` and `b`.
+    """
+    return _overlap(convert(a, fmt, "x0y0x1y1"), convert(b, fmt, "x0y0x1y1"), "diou", eps)
+
+
+def ciou(a: Tensor, b: Tensor, fmt: str = "x0y0x1y1", eps: float = 1e-7) -> Tensor:
+    """
+    Complete intersection over union of corresponding boxes of `a` and `b`.
+    """
+    return _overlap(convert(a, fmt, "x0y0x1y1"), convert(b, fmt, "x0y0x1y1"), "ciou", eps)
+
+
+def _overlap_matrix(a: Tensor, b: Tensor, kind: str, fmt: str, eps: float) -> Tensor:
+    a = convert(a, fmt, "x0y0x1y1").unsqueeze(-2)
+    b = convert(b, fmt, "x0y0x1y1").unsqueeze(-3)
+    return _overlap(a, b, kind, eps)
+
+
+def iou_matrix(a: Tensor, b: Tensor, fmt: str = "x0y0x1y1") -> Tensor:
+    """
+    Intersection over union for every pair of boxes from `a` of shape (..., N, 4) and `b` of shape (..., M, 4).
+    """
+    return _overlap_matrix(a, b, "iou", fmt, 0.)
+
+
+def giou_matrix(a: Tensor, b: Tensor, fmt: str = "x0y0x1y1", eps: float = 1e-7) -> Tensor:
+    """
+    Generalized intersection over union for every pair of boxes from `a` and `b`.
+    """
+    return _overlap_matrix(a, b, "giou", fmt, eps)
+
+
+def diou_matrix(a: Tensor, b: Tensor, fmt: str = "x0y0x1y1", eps: float = 1e-7) -> Tensor:
+    """
+    Distance intersection over union for every pair of boxes from `a` and `b`.
+    """
+    return _overlap_matrix(a, b, "diou", fmt, eps)
+
+
+def ciou_matrix(a: Tensor, b: Tensor, fmt: str = "x0y0x1y1", eps: float = 1e-7) -> Tensor:
+    """
+    Complete intersection over union for every pair of boxes from `a` and `b`.
+    """
+    return _overlap_matrix(a, b, "ciou", fmt, eps)
+
+
+def _nms(boxes: Tensor, scores: Tensor, classes: Optional[Tensor], iou_threshold: float) -> Tensor:
+    """
+    Greedy non-maximum suppression with shapes not depending on the data: the mask of suppressions
+    is computed for all pairs of boxes at once and the boxes are decided by a loop over all N of them,
+    so the function can be exported. Time and memory grow as N ** 2.
+    """
+    order = torch.argsort(scores, descending=True)
+    boxes = boxes[order]
+    n = boxes.shape[0]
+    # box i suppresses box j > i in the order of decreasing score
+    suppresses = _overlap(boxes.unsqueeze(-2), boxes.unsqueeze(-3), "iou", 0.) > iou_threshold
+    if classes is not None:
+        classes = classes[order]
+        suppresses = suppresses & (classes.unsqueeze(-1) == classes.unsqueeze(-2))
+    suppresses = torch.triu(suppresses, diagonal=1)
+    keep = torch.ones(n, dtype=torch.bool, device=boxes.device)
+    for i in range(n):
+        keep = keep & ~(suppresses[i] & keep[i])
+    return order[keep]
+
+
+def nms(boxes: Tensor, scores: Tensor, iou_threshold: float, fmt: str = "x0y0x1y1") -> Tensor:
+    """
+    Greedy non-maximum suppression, see `ArrayProcessor.nms`.
+    Returns indices of the kept boxes sorted by decreasing score.
+
+    Unlike `bbox_torch.nms`, IoU is computed for all N x N pairs of boxes, which suits the candidates of
+    one image left by a top-k selection. An exported graph is specialised to the number of boxes.
+    """
+    return _nms(convert(boxes, fmt, "x0y0x1y1"), scores, None, iou_threshold)
+
+
+def batched_nms(boxes: Tensor, scores: Tensor, classes: Tensor, iou_threshold: float,
+                fmt: str = "x0y0x1y1") -> Tensor:
+    """
+    Non-maximum suppression applied independently to boxes of every class, see `ArrayProcessor.batched_nms`.
+    """
+    return _nms(convert(boxes, fmt, "x0y0x1y1"), scores, classes, iou_threshold)
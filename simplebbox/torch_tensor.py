@@ -8,4 +8,48 @@ def _torch_stack_last_axis(arrays):
     return torch.stack(arrays, axis=-1)
 
 
-bbox_torch = ArrayProcessor(stack_fn=_torch_stack_last_axis)
+def _torch_asarray(values, like):
+    return torch.tensor(values, device=like.device)
+
+
+def _torch_astype(arr, dtype):
+    return arr.to(dtype)
+
+
+def _torch_is_floating(arr):
+    return arr.is_floating_point()
+
+
+def _torch_concat(arrays, axis):
+    return torch.cat(arrays, dim=axis)
+
+
+def _torch_round(arr, rounding, dtype):
+    return getattr(torch, rounding)(arr).to(dtype)
+
+
+def _torch_dtype(name):
+    return getattr(torch, name)
+
+
+def _torch_repeat(arr, counts):
+    return torch.repeat_interleave(arr, counts, dim=0)
+
+
+def _torch_arange(n, like):
+    return torch.arange(n, device=like.device)
+
+
+bbox_torch = ArrayProcessor(
+    stack_fn=_torch_stack_last_axis,
+    asarray_fn=_torch_asarray,
+    astype_fn=_torch_astype,
+    is_floating_fn=_torch_is_floating,
+    concat_fn=_torch_concat,
+    xp=torch,
+    round_fn=_torch_round,
+    dtype_fn=_torch_dtype,
+    repeat_fn=_torch_repeat,
+    arange_fn=_torch_arange,
+    name="torch",
+)
@@ -0,0 +1,281 @@
+"""
+Association of detections with tracks for multi-object tracking by IoU (SORT / ByteTrack style).
+
+>>> tracker = IoUTracker(min_hits=1)
+>>> tracker.update(np.array([[0., 0., 10., 10.]]), np.array([0.9])).ids.tolist()
+[1]
+>>> tracker.update(np.array([[1., 0., 11., 10.]]), np.array([0.9])).ids.tolist()
+[1]
+"""
+from collections import namedtuple
+
+import numpy as np
+from simplebbox._formats import parse_format
+from simplebbox.numpy_array import bbox_numpy
+from simplebbox.spatial_index import _expand_ranges
+
+__all__ = ["IoUTracker", "Tracks", "greedy_assignment"]
+
+Tracks = namedtuple("Tracks", ["ids", "boxes", "scores", "labels", "detections"])
+Tracks.__doc__ = """
+Tracks updated by a frame.
+
+ids : ids of the tracks
+boxes, scores, labels : boxes, scores and labels of the detections assigned to the tracks
+detections : indices of the detections of the frame assigned to the tracks
+"""
+
+
+def _intersecting_pairs(queries, boxes):
+    """
+    Returns indices (rows, cols) of all pairs of query boxes and boxes in format x0y0x1y1 which intersect.
+    """
+    a, b = queries[:, None, :], boxes[None, :, :]
+    inside = (a[..., 0] <= b[..., 2]) & (b[..., 0] <= a[..., 2]) & (a[..., 1] <= b[..., 3]) & (b[..., 1] <= a[..., 3])
+    return np.nonzero(inside)
+
+
+def _grid_pairs(queries, boxes, cell):
+    """
+    Finds pairs of query boxes and boxes not larger than `cell` which may overlap, both in format x0y0x1y1.
+
+    Centers of the boxes are put into a uniform grid with cells of size `cell`, so overlapping boxes have centers
+    in the same or adjacent cells. The boxes are sorted by the cell, and the adjacent cells of a query
+    in the rows above, at and below it are three contiguous ranges found by binary search.
+    """
+    query_cells = np.floor((queries[:, :2] + queries[:, 2:]) / (2 * cell)).astype(np.int64)
+    box_cells = np.floor((boxes[:, :2] + boxes[:, 2:]) / (2 * cell)).astype(np.int64)
+    low = np.minimum(query_cells.min(axis=0), box_cells.min(axis=0)) - 1
+    query_cells -= low
+    box_cells -= low
+    n_columns = max(query_cells[:, 0].max(), box_cells[:, 0].max()) + 2
+    keys = box_cells[:, 1] * n_columns + box_cells[:, 0]
+    order = np.argsort(keys, kind="stable")
+    keys = keys[order]
+    rows, cols = [], []
+    for dy in (-1, 0, 1):
+        first = (query_cells[:, 1] + dy) * n_columns + query_cells[:, 0]
+        starts = np.searchsorted(keys, first - 1, side="left")
+        stops = np.searchsorted(keys, first + 1, side="right")
+        owner, position = _expand_ranges(starts, stops)
+        rows.append(owner)
+        cols.append(order[position])
+    return np.concatenate(rows), np.concatenate(cols)
+
+
+def _candidate_pairs(queries, boxes, percentile=99):
+    """
+    Finds pairs of query boxes and boxes which may overlap, both in format x0y0x1y1.
+
+    The cells of the grid are as large as the largest box, ignoring boxes larger than twice the `percentile`
+    of the sides, so a few large boxes do not coarsen the grid. Pairs with these large boxes, less than 1%
+    of the boxes by default, are found by testing them for intersection with all boxes of the other set.
+
+    Returns
+    -------
+    tuple (rows, cols) of indices of the query boxes and of the boxes
+    """
+    query_sizes = np.maximum(queries[:, 2] - queries[:, 0], queries[:, 3] - queries[:, 1])
+    box_sizes = np.maximum(boxes[:, 2] - boxes[:, 0], boxes[:, 3] - boxes[:, 1])
+    sizes = np.concatenate([query_sizes, box_sizes])
+    k = (len(sizes) - 1) * percentile // 100
+    sizes = sizes[sizes <= 2 * np.partition(sizes, k)[k]]
+    cell = max(sizes.max(), 1e-6)
+    if query_sizes.max() <= cell and box_sizes.max() <= cell:
+        return _grid_pairs(queries, boxes, cell)
+    large_queries, = np.nonzero(query_sizes > cell)
+    small_queries, = np.nonzero(query_sizes <= cell)
+    large_boxes, = np.nonzero(box_sizes > cell)
+    small_boxes, = np.nonzero(box_sizes <= cell)
+    rows, cols = [], []
+    if len(small_queries) and len(small_boxes):
+        r, c = _grid_pairs(queries[small_queries], boxes[small_boxes], cell)
+        rows.append(small_queries[r])
+        cols.append(small_boxes[c])
+    if len(large_queries):
+        r, c = _intersecting_pairs(queries[large_queries], boxes)
+        rows.append(large_queries[r])
+        cols.append(c)
+    if len(small_queries) and len(large_boxes):
+        r, c = _intersecting_pairs(queries[small_queries], boxes[large_boxes])
+        rows.append(small_queries[r])
+        cols.append(large_boxes[c])
+    if not rows:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    return np.concatenate(rows), np.concatenate(cols)
+
+
+def greedy_assignment(rows, cols, weights):
+    """
+    Greedy one-to-one assignment of weighted pairs in COO form: pairs are taken in the order of decreasing weight
+    unless their row or column is already taken.
+
+    The pairs are processed in rounds instead of one by one: a pair which is the best pair of both its row
+    and its column is taken, and the pairs sharing a row or a column with it are dropped.
+
+    Returns
+    -------
+    indices of the taken pairs
+    """
+    rows, cols = np.asarray(rows), np.asarray(cols)
+    remaining = np.argsort(-np.asarray(weights), kind="stable")
+    taken = []
+    while len(remaining):
+        r, c = rows[remaining], cols[remaining]
+        # first occurrences in the order of decreasing weight are the best pairs of the rows and columns
+        best_of_row = np.zeros(len(remaining), dtype=bool)
+        best_of_row[np.unique(r, return_index=True)[1]] = True
+        best_of_col = np.zeros(len(remaining), dtype=bool)
+        best_of_col[np.unique(c, return_index=True)[1]] = True
+        mutual = best_of_row & best_of_col
+        taken.append(remaining[mutual])
+        free = ~np.isin(r, r[mutual]) & ~np.isin(c, c[mutual])
+        remaining = remaining[free]
+    return np.sort(np.concatenate(taken)) if taken else np.empty(0, dtype=np.int64)
+
+
+class IoUTracker:
+    """
+    Tracker associating detections of every frame with the tracks by IoU.
+
+    Detections with scores at least `high_score` are matched with all tracks first; detections with scores
+    between `low_score` and `high_score` are matched with the remaining tracks (ByteTrack). Unmatched high
+    score detections start new tracks. Tracks move with a constant velocity smoothed over the frames
+    and are removed after `max_age` frames without detections.
+
+    The state of the tracks is kept in preallocated arrays indexed by slots, grown by doubling when full.
+    Candidate pairs of detections and predicted tracks are found with a uniform grid (large boxes are tested
+    against all boxes separately) and gated by labels and IoU before the assignment, so no full IoU matrix is built.
+
+    Parameters
+    ----------
+    iou_threshold : minimal IoU of a detection and a predicted track box to match them
+    high_score, low_score : score thresholds of the two stages of matching
+    max_age : number of frames a track survives without detections
+    min_hits : number of detections before a track is reported
+    momentum : smoothing of the velocity, 0 uses only the last displacement
+    fmt : format of the boxes
+    capacity : initial number of slots of the tracks
+    """
+
+    def __init__(self, iou_threshold=0.3, high_score=0.5, low_score=0.1, max_age=30, min_hits=3, momentum=0.8,
+                 fmt="x0y0x1y1", capacity=1024):
+        self.layout = parse_format(fmt)[0]
+        self.fmt = fmt
+        self.iou_threshold = iou_threshold
+        self.high_score = high_score
+        self.low_score = low_score
+        self.max_age = max_age
+        self.min_hits = min_hits
+        self.momentum = momentum
+        self.next_id = 1
+        self.frame = 0
+        self._allocate(capacity)
+
+    def _allocate(self, capacity):
+        self.capacity = capacity
+        self._boxes = np.zeros((capacity, 4))
+        self._velocity = np.zeros((capacity, 4))
+        self._ids = np.zeros(capacity, dtype=np.int64)
+        self._labels = np.zeros(capacity, dtype=np.int64)
+        self._hits = np.zeros(capacity, dtype=np.int64)
+        self._age = np.zeros(capacity, dtype=np.int64)
+        self._alive = np.zeros(capacity, dtype=bool)
+
+    def _grow(self, capacity):
+        old = (self._boxes, self._velocity, self._ids, self._labels, self._hits, self._age, self._alive)
+        n = self.capacity
+        self._allocate(capacity)
+        for new, values in zip((self._boxes, self._velocity, self._ids, self._labels, self._hits, self._age,
+                                self._alive), old):
+            new[:n] = values
+
+    def __len__(self):
+        return int(self._alive.sum())
+
+    @property
+    def tracks(self):
+        """
+        All live tracks including the coasting ones: tuple (ids, boxes in format `fmt`, labels).
+        """
+        slots = np.flatnonzero(self._alive)
+        return self._ids[slots], self._output(self._boxes[slots]), self._labels[slots]
+
+    def _output(self, boxes):
+        if self.layout == "x0y0x1y1":
+            return boxes
+        return bbox_numpy.convert(boxes, "x0y0x1y1", self.layout)
+
+    def _match(self, boxes, labels, detections, slots, predicted):
+        """
+        Matches the detections with the tracks of the slots; returns matched indices of both.
+        """
+        if not len(detections) or not len(slots):
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        rows, cols = _candidate_pairs(boxes[detections], predicted[slots])
+        iou = bbox_numpy.iou(boxes[detections[rows]], predicted[slots[cols]])
+        gated = (iou > self.iou_threshold) & (labels[detections[rows]] == self._labels[slots[cols]])
+        rows, cols, iou = rows[gated], cols[gated], iou[gated]
+        taken = greedy_assignment(rows, cols, iou)
+        return detections[rows[taken]], slots[cols[taken]]
+
+    def update(self, boxes, scores, labels=None):
+        """
+        Processes the detections of the next frame.
+
+        Parameters
+        ----------
+        boxes : array of shape (N, 4) in format `fmt`
+        scores : array of shape (N,)
+        labels : optional integer array of shape (N,); detections are matched only with tracks of their label
+
+        Returns
+        -------
+        `Tracks` matched with the detections of the frame and having at least `min_hits` detections
+        """
+        self.frame += 1
+        boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+        if self.layout != "x0y0x1y1":
+            boxes = bbox_numpy.convert(boxes, self.layout, "x0y0x1y1")
+        scores = np.asarray(scores).reshape(-1)
+        labels = np.zeros(len(boxes), dtype=np.int64) if labels is None else np.asarray(labels).reshape(-1)
+
+        predicted = self._boxes + self._velocity
+        alive = np.flatnonzero(self._alive)
+        high = np.flatnonzero(scores >= self.high_score)
+        low = np.flatnonzero((scores >= self.low_score) & (scores < self.high_score))
+        det_high, slot_high = self._match(boxes, labels, high, alive, predicted)
+        det_low, slot_low = self._match(boxes, labels, low, alive[~np.isin(alive, slot_high)], predicted)
+        dets, slots = np.concatenate([det_high, det_low]), np.concatenate([slot_high, slot_low])
+
+        # matched tracks follow their detections, the others coast with their velocity
+        self._boxes[alive] = predicted[alive]
+        self._velocity[slots] = self.momentum * self._velocity[slots] + \
+            (1 - self.momentum) * (boxes[dets] - self._boxes[slots] + self._velocity[slots])
+        self._boxes[slots] = boxes[dets]
+        self._hits[slots] += 1
+        self._age[alive] += 1
+        self._age[slots] = 0
+        self._alive[alive[self._age[alive] > self.max_age]] = False
+
+        new = high[~np.isin(high, det_high)]
+        free = np.flatnonzero(~self._alive)
+        if len(free) < len(new):
+            self._grow(max(2 * self.capacity, self.capacity + len(new)))
+            free = np.flatnonzero(~self._alive)
+        new_slots = free[:len(new)]
+        self._boxes[new_slots] = boxes[new]
+        self._velocity[new_slots] = 0
+        self._ids[new_slots] = np.arange(self.next_id, self.next_id + len(new))
+        self.next_id += len(new)
+        self._labels[new_slots] = labels[new]
+        self._hits[new_slots] = 1
+        self._age[new_slots] = 0
+        self._alive[new_slots] = True
+
+        dets, slots = np.concatenate([dets, new]), np.concatenate([slots, new_slots])
+        reported = self._hits[slots] >= self.min_hits
+        dets, slots = dets[reported], slots[reported]
+        order = np.argsort(self._ids[slots])
+        dets, slots = dets[order], slots[order]
+        return Tracks(self._ids[slots], self._output(boxes[dets]), scores[dets], labels[dets], dets)
@@ -0,0 +1,257 @@
+"""
+Geometric transforms of boxes following transforms of their images.
+
+A transform is a 3x3 matrix acting on homogeneous pixel coordinates (x, y, 1). Transforms are composed
+by multiplying their matrices, so a chain of resizes, flips, crops and affine maps is applied to the boxes
+at once, together with the conversions from the source format and to the destination format.
+
+Parameters of the transforms may be arrays of shape (B,), which gives a batch of B transforms,
+one per image: they are applied to boxes of shape (B, N, 4) or to ragged batches of boxes.
+
+>>> import numpy as np
+>>> t = resize((640, 480), (320, 240)).then(hflip(320))
+>>> t.apply(np.array([[100., 200., 20., 40.]]), src="x0y0wh").tolist()
+[[260.0, 100.0, 10.0, 20.0]]
+"""
+import numpy as np
+from simplebbox._formats import parse_format
+from simplebbox.backends import get_backend
+
+__all__ = [
+    "BoxTransform", "compose", "identity", "scale", "translate", "resize", "letterbox", "hflip", "vflip", "crop",
+    "affine", "rotate",
+]
+
+
+def _matrix(m00, m01, m02, m10, m11, m12):
+    """
+    Builds affine matrices of shape (..., 3, 3) from broadcast parameters.
+    """
+    values = np.broadcast_arrays(*[np.asarray(v, dtype=float) for v in (m00, m01, m02, m10, m11, m12)])
+    res = np.zeros(values[0].shape + (3, 3))
+    res[..., 0, 0], res[..., 0, 1], res[..., 0, 2] = values[:3]
+    res[..., 1, 0], res[..., 1, 1], res[..., 1, 2] = values[3:]
+    res[..., 2, 2] = 1
+    return res
+
+
+def _diag(sx, sy):
+    return _matrix(sx, 0, 0, 0, sy, 0)
+
+
+def _wh(image_wh):
+    image_wh = np.asarray(image_wh, dtype=float)
+    return image_wh[..., 0], image_wh[..., 1]
+
+
+class BoxTransform:
+    """
+    Transform of boxes given by a matrix of shape (3, 3), or (B, 3, 3) for per-image transforms.
+
+    Parameters
+    ----------
+    matrix : matrix acting on column vectors (x, y, 1). A last row other than (0, 0, 1) makes a projective map.
+    output_wh : optional width and height of the transformed image, used for relative destination formats
+    """
+    __slots__ = ("matrix", "output_wh")
+
+    def __init__(self, matrix, output_wh=None):
+        self.matrix = np.asarray(matrix, dtype=float)
+        if self.matrix.shape[-2:] != (3, 3):
+            raise ValueError("matrix must have shape (..., 3, 3), got {}".format(self.matrix.shape))
+        self.output_wh = output_wh
+
+    def __repr__(self):
+        return "BoxTransform({!r}, output_wh={!r})".format(self.matrix.tolist(), self.output_wh)
+
+    def then(self, other):
+        """
+        Returns the transform applying this transform and then `other`.
+        """
+        output_wh = self.output_wh if other.output_wh is None else other.output_wh
+        return BoxTransform(other.matrix @ self.matrix, output_wh)
+
+    @property
+    def is_axis_aligned(self):
+        """
+        True if the transform maps axis-aligned boxes to axis-aligned boxes (scales, flips and translations).
+        """
+        m = self.matrix
+        return not (m[..., 0, 1].any() or m[..., 1, 0].any() or m[..., 2, 0].any() or m[..., 2, 1].any()
+                    or (m[..., 2, 2] != 1).any())
+
+    def apply(self, boxes, src="x0y0x1y1", dst=None, src_wh=None, dst_wh=None, offsets=None):
+        """
+        Transforms boxes and converts them from format `src` to format `dst` in one vectorised call.
+
+        Axis-aligned transforms map the corners (x0, y0) and (x1, y1) of the boxes (swapping them for flips).
+        Other transforms map all four corners and return the axis-aligned boxes enclosing them.
+        Scaling from and to relative coordinates is folded into the matrix.
+
+        Parameters
+        ----------
+        boxes : numpy array or torch tensor of shape (..., N, 4). For a batch of B transforms
+            of shape (B, N, 4), or (total_boxes, 4) with `offsets` of a ragged batch.
+        src : format of the boxes
+        dst : format of the result, `src` by default
+        src_wh : width and height of the source image(s), required for relative `src`
+        dst_wh : width and height of the transformed image(s) for relative `dst`, `output_wh` by default
+        offsets : offsets of the images of a ragged batch, see `ArrayProcessor.xyxy_abs_to_rel_ragged`
+
+        Returns
+        -------
+        array of the transformed boxes of the same type and shape as `boxes`
+        """
+        backend = get_backend(boxes)
+        dst = src if dst is None else dst
+        src_layout, src_relative = parse_format(src)
+        dst_layout, dst_relative = parse_format(dst)
+        m = self.matrix
+        if src_relative:
+            if src_wh is None:
+                raise ValueError("src_wh is required to transform boxes of format {!r}".format(src))
+            m = m @ _diag(*_wh(src_wh))
+        if dst_relative:
+            dst_wh = self.output_wh if dst_wh is None else dst_wh
+            if dst_wh is None:
+                raise ValueError("dst_wh is required to transform boxes to format {!r}".format(dst))
+            w, h = _wh(dst_wh)
+            m = _diag(1 / w, 1 / h) @ m
+        batched = m.ndim > 2
+
+        def coefficient(i, j):
+            c = m[..., i, j]
+            if not batched:
+                return float(c)
+            c = backend.asarray(c, boxes)
+            if backend.is_floating(boxes):
+                c = backend.astype(c, boxes.dtype)
+            if offsets is not None:
+                return backend.repeat(c, offsets[1:] - offsets[:-1])
+            return c[..., None]
+
+        xp = backend.xp
+        x0, y0, x1, y1 = backend.x0y0x1y1_columns(boxes, src_layout)
+        if BoxTransform(m).is_axis_aligned:
+            sx, tx, sy, ty = coefficient(0, 0), coefficient(0, 2), coefficient(1, 1), coefficient(1, 2)
+            x0, x1 = x0 * sx + tx, x1 * sx + tx
+            y0, y1 = y0 * sy + ty, y1 * sy + ty
+            if (m[..., 0, 0] < 0).any():
+                x0, x1 = xp.minimum(x0, x1), xp.maximum(x0, x1)
+            if (m[..., 1, 1] < 0).any():
+                y0, y1 = xp.minimum(y0, y1), xp.maximum(y0, y1)
+        else:
+            c = [[coefficient(i, j) for j in range(3)] for i in range(3)]
+            projective = bool(m[..., 2, 0].any() or m[..., 2, 1].any() or (m[..., 2, 2] != 1).any())
+            xs, ys = [], []
+            for x, y in ((x0, y0), (x1, y0), (x0, y1), (x1, y1)):
+                u = c[0][0] * x + c[0][1] * y + c[0][2]
+                v = c[1][0] * x + c[1][1] * y + c[1][2]
+                if projective:
+                    z = c[2][0] * x + c[2][1] * y + c[2][2]
+                    u, v = u / z, v / z
+                xs.append(u)
+                ys.append(v)
+            x0 = xp.minimum(xp.minimum(xs[0], xs[1]), xp.minimum(xs[2], xs[3]))
+            x1 = xp.maximum(xp.maximum(xs[0], xs[1]), xp.maximum(xs[2], xs[3]))
+            y0 = xp.minimum(xp.minimum(ys[0], ys[1]), xp.minimum(ys[2], ys[3]))
+            y1 = xp.maximum(xp.maximum(ys[0], ys[1]), xp.maximum(ys[2], ys[3]))
+        if dst_layout == "x0y0x1y1":
+            res = [x0, y0, x1, y1]
+        elif dst_layout == "x0y0wh":
+            res = [x0, y0, x1 - x0, y1 - y0]
+        else:
+            res = [(x0 + x1) / 2, (y0 + y1) / 2, x1 - x0, y1 - y0]
+        return backend.stack(res)
+
+
+def compose(*transforms):
+    """
+    Returns the transform applying `transforms` one after another.
+    """
+    res = identity()
+    for t in transforms:
+        res = res.then(t)
+    return res
+
+
+def identity():
+    return BoxTransform(np.eye(3))
+
+
+def scale(sx, sy=None):
+    """
+    Scales coordinates by `sx` and `sy` (equal to `sx` by default).
+    """
+    return BoxTransform(_diag(sx, sx if sy is None else sy))
+
+
+def translate(tx, ty):
+    """
+    Shifts coordinates by (tx, ty).
+    """
+    return BoxTransform(_matrix(1, 0, tx, 0, 1, ty))
+
+
+def resize(src_wh, dst_wh):
+    """
+    Transform of boxes of an image of size `src_wh` resized to `dst_wh`.
+    """
+    sw, sh = _wh(src_wh)
+    dw, dh = _wh(dst_wh)
+    return BoxTransform(_diag(dw / sw, dh / sh), dst_wh)
+
+
+def letterbox(src_wh, dst_wh, center=True):
+    """
+    Transform of boxes of an image of size `src_wh` resized with the preserved aspect ratio to fit into `dst_wh`
+    and padded to `dst_wh`, centered or at the left top corner.
+    """
+    sw, sh = _wh(src_wh)
+    dw, dh = _wh(dst_wh)
+    s = np.minimum(dw / sw, dh / sh)
+    tx, ty = ((dw - sw * s) / 2, (dh - sh * s) / 2) if center else (0, 0)
+    return BoxTransform(_matrix(s, 0, tx, 0, s, ty), dst_wh)
+
+
+def hflip(image_w):
+    """
+    Horizontal flip of an image of width `image_w`.
+    """
+    return BoxTransform(_matrix(-1, 0, image_w, 0, 1, 0))
+
+
+def vflip(image_h):
+    """
+    Vertical flip of an image of height `image_h`.
+    """
+    return BoxTransform(_matrix(1, 0, 0, 0, -1, image_h))
+
+
+def crop(x0, y0, w, h):
+    """
+    Crop of the window with the left top corner (x0, y0) and size (w, h).
+    Boxes are not clipped to the window, use `ArrayProcessor.sanitize` for that.
+    """
+    return BoxTransform(_matrix(1, 0, -np.asarray(x0, dtype=float), 0, 1, -np.asarray(y0, dtype=float)), (w, h))
+
+
+def affine(matrix, output_wh=None):
+    """
+    Affine transform given by a matrix of shape (..., 2, 3) or a projective transform given by (..., 3, 3).
+    """
+    matrix = np.asarray(matrix, dtype=float)
+    if matrix.shape[-2:] == (2, 3):
+        last_row = np.broadcast_to([0., 0., 1.], matrix.shape[:-2] + (1, 3))
+        matrix = np.concatenate([matrix, last_row], axis=-2)
+    return BoxTransform(matrix, output_wh)
+
+
+def rotate(angle, center=(0, 0)):
+    """
+    Rotation by `angle` degrees counterclockwise on the screen (with y axis pointing down) around `center`.
+    """
+    a = np.deg2rad(angle)
+    cos, sin = np.cos(a), np.sin(a)
+    cx, cy = center
+    return translate(-cx, -cy).then(BoxTransform(_matrix(cos, sin, 0, -sin, cos, 0))).then(translate(cx, cy))
@@ -0,0 +1,19 @@
+"""
+Helpers shared by the tests.
+"""
+import numpy as np
+
+
+def random_boxes(shape, seed, extent=100, min_size=1, max_size=50, scores=False):
+    """
+    Returns random boxes in format x0y0x1y1 of shape `shape` + (4,) with the top-left corners in [0, extent)
+    and sides in [min_size, max_size), and random scores of shape `shape` if `scores` is true.
+    """
+    shape = (shape,) if isinstance(shape, int) else tuple(shape)
+    rng = np.random.RandomState(seed)
+    xy = rng.uniform(0, extent, size=shape + (2,))
+    wh = rng.uniform(min_size, max_size, size=shape + (2,))
+    boxes = np.concatenate([xy, xy + wh], axis=-1)
+    if scores:
+        return boxes, rng.uniform(size=shape)
+    return boxes
@@ -0,0 +1,79 @@
+"""
+Tests for `simplebbox.anchors`.
+"""
+import math
+
+import numpy as np
+import pytest
+import torch
+
+from simplebbox.anchors import AnchorGenerator
+from simplebbox.numpy_array import bbox_numpy
+
+
+def reference_anchors(feature_wh, stride, sizes, ratios, offset=0.5):
+    w, h = feature_wh
+    res = []
+    for y in range(h):
+        for x in range(w):
+            cx, cy = (x + offset) * stride, (y + offset) * stride
+            for size in sizes:
+                for ratio in ratios:
+                    aw, ah = size / math.sqrt(ratio), size * math.sqrt(ratio)
+                    res.append([cx - aw / 2, cy - ah / 2, cx + aw / 2, cy + ah / 2])
+    return np.array(res)
+
+
+def test_matches_reference():
+    generator = AnchorGenerator(strides=[8, 16], sizes=[(16, 24), 32], aspect_ratios=(0.5, 1., 2.))
+    assert generator.num_anchors_per_location() == [6, 3]
+    levels = generator([(5, 3), (3, 2)])
+    assert levels[0].dtype == np.float32
+    assert np.allclose(levels[0], reference_anchors((5, 3), 8, (16, 24), (0.5, 1., 2.)))
+    assert np.allclose(levels[1], reference_anchors((3, 2), 16, (32,), (0.5, 1., 2.)))
+
+
+def test_formats_and_torch():
+    image_wh = (80, 48)
+    xyxy = AnchorGenerator([16], [32], [1.])([(5, 3)])[0]
+    rel = AnchorGenerator([16], [32], [1.], fmt="cxcywh_rel")([(5, 3)], image_wh=image_wh)[0]
+    assert np.allclose(rel, bbox_numpy.convert(xyxy, "xyxy", "cxcywh_rel", np.array(image_wh)))
+    with pytest.raises(ValueError):
+        AnchorGenerator([16], [32], [1.], fmt="cxcywh_rel")([(5, 3)])
+
+    like = torch.empty(0, dtype=torch.float64)
+    t = AnchorGenerator([16], [32], [1.], fmt="xywh")([(5, 3)], like=like)[0]
+    assert t.dtype == torch.float64
+    assert np.allclose(t.numpy(), bbox_numpy.convert(xyxy, "xyxy", "xywh"))
+
+
+def test_cache_is_lru_and_bounded():
+    generator = AnchorGenerator([8], [16], cache_size=2)
+    first = generator([(4, 4)])[0]
+    assert generator([(4, 4)])[0] is first
+    assert not first.flags.writeable
+    generator([(5, 5)])
+    generator([(4, 4)], like=np.empty(0, dtype=np.float64))
+    assert generator.cache_info().entries == 2
+    assert generator([(4, 4)])[0] is not first
+    info = generator.cache_info()
+    assert (info.hits, info.misses) == (1, 4)
+
+    grid_bytes = first.nbytes
+    generator = AnchorGenerator([8], [16], max_cache_bytes=grid_bytes * 2)
+    for n in range(3):
+        generator([(4, 4 + n)])
+    assert generator.cache_info().bytes <= grid_bytes * 2
+    generator = AnchorGenerator([8], [16], max_cache_bytes=grid_bytes // 2)
+    generator([(4, 4)])
+    assert generator.cache_info().entries == 0
+
+
+def test_tiles_cover_the_grid():
+    generator = AnchorGenerator([8, 16], [16, 32])
+    full = generator([(7, 5), (4, 3)])[0].reshape(5, 7, 3, 4)
+    tiles = list(generator.tiles(0, (7, 5), (3, 2)))
+    assert len(tiles) == 9
+    for (x0, y0, x1, y1), anchors in tiles:
+        assert np.array_equal(anchors, full[y0:y1, x0:x1].reshape(-1, 4))
+    assert generator.cache_info().entries == 2
@@ -0,0 +1,128 @@
+"""
+Tests for `simplebbox.annotations` and the command line interface.
+"""
+import io
+import json
+
+import numpy as np
+import pytest
+from pytest import approx
+
+from simplebbox import cli
+from simplebbox.annotations import (
+    CocoWriter, ImageBoxes, VocWriter, YoloWriter, _iter_json_array, _JsonReader, convert_annotations, read_coco,
+    read_voc, read_voc_file, read_yolo,
+)
+
+COCO = {
+    "info": {"description": "a \"tricky\" [string] {with} brackets", "year": 2021},
+    "annotations": [
+        {"id": 1, "image_id": 1, "category_id": 3, "bbox": [10, 20, 30, 40], "area": 1200, "iscrowd": 0},
+        {"id": 2, "image_id": 1, "category_id": 5, "bbox": [0, 0, 64, 48], "area": 3072, "iscrowd": 0},
+        {"id": 3, "image_id": 2, "category_id": 3, "bbox": [1.5, 2.5, 3, 4], "area": 12, "iscrowd": 0},
+    ],
+    "images": [
+        {"id": 1, "file_name": "a.jpg", "width": 640, "height": 480},
+        {"id": 2, "file_name": "b.jpg", "width": 100, "height": 50},
+    ],
+    "categories": [{"id": 3, "name": "cat"}, {"id": 5, "name": "dog"}],
+}
+
+
+def test_json_reader_across_buffer_boundaries():
+    text = json.dumps({"a": 12345, "items": [{"x": [1, 2, 3]}, 10, "s"], "b": [1]})
+    for chunk_size in [1, 2, 3, 7, 1000]:
+        reader = _JsonReader(io.StringIO(text), chunk_size=chunk_size)
+        reader.take("{")
+        assert reader.value() == "a"
+        reader.take(":")
+        assert reader.value() == 12345
+
+
+def test_read_coco(tmp_path):
+    path = tmp_path / "coco.json"
+    path.write_text(json.dumps(COCO))
+    assert list(_iter_json_array(path, "categories")) == COCO["categories"]
+    images = list(read_coco(path))
+    assert [(im.file_name, im.width, im.height, im.labels) for im in images] == [
+        ("a.jpg", 640, 480, ["cat", "dog"]),
+        ("b.jpg", 100, 50, ["cat"]),
+    ]
+    assert images[0].boxes.tolist() == [[10, 20, 30, 40], [0, 0, 64, 48]]
+    assert [im.file_name for im in read_coco(path, grouped=True)] == ["a.jpg", "b.jpg"]
+
+
+def test_read_coco_ungrouped_annotations_and_empty_images(tmp_path):
+    coco = dict(COCO, images=COCO["images"] + [{"id": 7, "file_name": "c.jpg", "width": 10, "height": 10}])
+    coco["annotations"] = [COCO["annotations"][i] for i in (0, 2, 1)]
+    path = tmp_path / "coco.json"
+    path.write_text(json.dumps(coco))
+    images = list(read_coco(path))
+    assert [(im.file_name, im.labels) for im in images] == [("a.jpg", ["cat", "dog"]), ("b.jpg", ["cat"]),
+                                                            ("c.jpg", [])]
+    assert images[0].boxes.tolist() == [[10, 20, 30, 40], [0, 0, 64, 48]]
+    assert images[2].boxes.shape == (0, 4)
+    with pytest.raises(ValueError, match="not grouped"):
+        list(read_coco(path, grouped=True))
+    coco["annotations"] = COCO["annotations"]
+    path.write_text(json.dumps(coco))
+    assert [im.file_name for im in read_coco(path, grouped=True)] == ["a.jpg", "b.jpg", "c.jpg"]
+
+
+def test_yolo_class_numbers_and_voc_coordinates(tmp_path):
+    writer = YoloWriter(tmp_path / "yolo")
+    for name, labels in [("a.jpg", ["3", "cat"]), ("b.jpg", ["5", "1"])]:
+        writer.write(ImageBoxes(name, None, None, np.full((2, 4), 0.5), labels))
+    writer.close()
+    assert [line.split()[0] for line in (tmp_path / "yolo" / "b.txt").read_text().splitlines()] == ["2", "3"]
+    assert (tmp_path / "yolo" / "classes.txt").read_text().split() == ["3", "cat", "5", "1"]
+
+    writer = VocWriter(tmp_path / "voc")
+    writer.write(ImageBoxes("a.jpg", None, None, np.array([[1234567.5, 20, 30.25, 40]]), ["cat"]))
+    assert read_voc_file(tmp_path / "voc" / "a.xml").boxes.tolist() == [[1234567.5, 20, 30.25, 40]]
+    assert "<ymin>20</ymin>" in (tmp_path / "voc" / "a.xml").read_text()
+
+
+def test_round_trip_through_all_formats(tmp_path):
+    coco_path = tmp_path / "coco.json"
+    coco_path.write_text(json.dumps(COCO))
+
+    writer = YoloWriter(tmp_path / "yolo", classes=["dog", "cat"])
+    stats = convert_annotations(read_coco(coco_path), "x0y0wh", "cxcywh_rel", writer, chunk_size=2)
+    writer.close()
+    assert (stats.images, stats.boxes) == (2, 3)
+    assert (tmp_path / "yolo" / "a.txt").read_text().splitlines() == [
+        "1 0.039062 0.083333 0.046875 0.083333",
+        "0 0.050000 0.050000 0.100000 0.100000",
+    ]
+
+    writer = VocWriter(tmp_path / "voc")
+    yolo = read_yolo(tmp_path / "yolo", classes=["dog", "cat"], image_wh={"a.jpg": (640, 480), "b.jpg": (100, 50)})
+    convert_annotations(yolo, "cxcywh_rel", "x0y0x1y1", writer)
+    writer.close()
+    voc = list(read_voc(tmp_path / "voc"))
+    assert voc[1].boxes[0].tolist() == approx([1.5, 2.5, 4.5, 6.5], abs=1e-4)
+
+    writer = CocoWriter(tmp_path / "out.json")
+    convert_annotations(iter(voc), "x0y0x1y1", "x0y0wh", writer)
+    writer.close()
+    result = json.loads((tmp_path / "out.json").read_text())
+    assert [im["file_name"] for im in result["images"]] == ["a.jpg", "b.jpg"]
+    assert [c["name"] for c in result["categories"]] == ["cat", "dog"]
+    for ann, expected in zip(result["annotations"], COCO["annotations"]):
+        assert ann["bbox"] == approx(expected["bbox"], abs=1e-3)
+
+
+def test_cli(tmp_path, capsys):
+    coco_path = tmp_path / "coco.json"
+    coco_path.write_text(json.dumps(COCO))
+    assert cli.main(["--from", "coco", "--to", "voc", str(coco_path), str(tmp_path / "voc")]) == 0
+    assert "3 boxes" in capsys.readouterr().err
+    assert sorted(p.name for p in (tmp_path / "voc").iterdir()) == ["a.xml", "b.xml"]
+
+    assert cli.main(["--from", "voc", "--to", "yolo", str(tmp_path / "voc"), str(tmp_path / "yolo")]) == 0
+    assert (tmp_path / "yolo" / "classes.txt").read_text().split() == ["cat", "dog"]
+    assert cli.main(["--from", "yolo", "--to", "coco", "--image-size", "100x50", "--classes",
+                     str(tmp_path / "yolo" / "classes.txt"), str(tmp_path / "yolo"), str(tmp_path / "c.json")]) == 0
+    result = json.loads((tmp_path / "c.json").read_text())
+    assert result["annotations"][2]["bbox"] == approx([1.5, 2.5, 3, 4], abs=1e-4)
@@ -0,0 +1,93 @@
+"""
+Tests for `simplebbox.backends` and the top-level `simplebbox.convert`.
+"""
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+import torch
+
+import simplebbox
+from simplebbox import array, backends
+from simplebbox.numpy_array import bbox_numpy
+from simplebbox.torch_tensor import bbox_torch
+
+
+def test_import_is_lazy():
+    code = (
+        "import sys, simplebbox\n"
+        "assert simplebbox.convert([1, 2, 3, 4], 'xywh', 'xyxy') == [1, 2, 4, 6]\n"
+        "assert 'numpy' not in sys.modules and 'torch' not in sys.modules, sorted(sys.modules)\n"
+        "import numpy\n"
+        "simplebbox.convert(numpy.ones((2, 4)), 'xywh', 'xyxy')\n"
+        "assert 'torch' not in sys.modules\n"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+
+def test_dispatch():
+    assert simplebbox.get_backend([1, 2, 3, 4]) is array
+    assert simplebbox.get_backend(np.zeros((1, 4))) is bbox_numpy
+    assert simplebbox.get_backend(torch.zeros(1, 4)) is bbox_torch
+    with pytest.raises(TypeError):
+        simplebbox.get_backend({1, 2, 3, 4})
+
+
+def test_convert():
+    box = (0.5, 0.5, 0.5, 0.25)
+    expected = array.convert(box, "cxcywh_rel", "xyxy", (400, 200))
+    assert simplebbox.convert(box, "cxcywh_rel", "xyxy", (400, 200)) == expected
+    assert simplebbox.convert([box, box], "cxcywh_rel", "xyxy", (400, 200)) == [expected, expected]
+    assert simplebbox.convert([], "cxcywh_rel", "xyxy", (400, 200)) == []
+    res = simplebbox.convert(np.array([box]), "cxcywh_rel", "xyxy", (400, 200))
+    assert res.tolist() == [list(expected)]
+    res = simplebbox.convert(torch.tensor([box]), "cxcywh_rel", "xyxy", (400, 200))
+    assert res.tolist() == [list(expected)]
+
+
+def test_convert_integer_boxes_to_relative():
+    expected = [list(array.convert((10, 20, 30, 40), "xyxy", "xyxy_rel", (100, 100)))]
+    res = simplebbox.convert(np.array([[10, 20, 30, 40]]), "xyxy", "xyxy_rel", image_wh=(100, 100))
+    assert res.dtype == np.float64 and res.tolist() == expected
+    res = simplebbox.convert(torch.tensor([[10, 20, 30, 40]]), "xyxy", "xyxy_rel", image_wh=(100, 100))
+    assert res.is_floating_point()
+    assert res[0].tolist() == pytest.approx(expected[0])
+
+
+def test_array_api_namespace():
+    xp = pytest.importorskip("array_api_strict")
+    boxes = np.array([[10., 20., 4., 6.], [0.5, 1.5, 3., 2.]])
+    backend = simplebbox.get_backend(xp.asarray(boxes))
+    assert backend is simplebbox.get_backend(xp.asarray(boxes))
+    res = simplebbox.convert(xp.asarray(boxes), "cxcywh", "xyxy_rel", (40, 50))
+    assert np.asarray(res).tolist() == bbox_numpy.convert(boxes, "cxcywh", "xyxy_rel", np.array([40, 50])).tolist()
+    res = backend.with_precision("int32").cxcywh_to_x0y0x1y1(xp.asarray(boxes))
+    expected = [array.cxcywh_to_x0y0x1y1(box, convert_fn=round) for box in boxes.tolist()]
+    assert np.asarray(res).tolist() == expected
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    """
+    Restores the registered backends and the resolved processors after the test.
+    """
+    for name in ["_REGISTRY", "_BY_TYPE", "_BY_NAMESPACE"]:
+        monkeypatch.setattr(backends, name, dict(getattr(backends, name)))
+
+
+def test_register_backend(registry):
+    class Boxes:
+        pass
+    Boxes.__module__ = "custom_arrays.core"
+    simplebbox.register_backend("custom_arrays", "simplebbox.numpy_array:bbox_numpy")
+    assert simplebbox.get_backend(Boxes()) is bbox_numpy
+
+
+def test_register_backend_replaces_namespace_processor(registry):
+    xp = pytest.importorskip("array_api_strict")
+    boxes = xp.asarray(np.ones((1, 4)))
+    assert simplebbox.get_backend(boxes) is not bbox_torch
+    simplebbox.register_backend("array_api_strict", bbox_torch)
+    assert simplebbox.get_backend(boxes) is bbox_torch
+    assert not backends._BY_NAMESPACE
@@ -0,0 +1,114 @@
+"""
+Tests for `simplebbox.batching`.
+"""
+import asyncio
+
+import numpy as np
+import pytest
+from pytest import approx
+
+from simplebbox import array
+from simplebbox.batching import MicroBatcher
+from simplebbox.numpy_array import bbox_numpy
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+def test_results_match_scalar_functions():
+    rng = np.random.RandomState(0)
+    requests = []
+    for i in range(200):
+        boxes = rng.randint(1, 100, size=(rng.randint(0, 5), 4)).tolist()
+        if i % 3 == 0:
+            boxes = [tuple(box) for box in boxes]
+        requests.append(boxes)
+
+    async def main():
+        async with MicroBatcher(max_batch_boxes=64, max_delay=0.01) as batcher:
+            res = await asyncio.gather(
+                *[batcher.convert(boxes, "x0y0wh", "x0y0x1y1") for boxes in requests],
+                *[batcher.convert(boxes, "cxcywh", "xyxy_rel", image_wh=(200, 100)) for boxes in requests],
+                batcher.convert([1., 2., 3., 4.], "xywh", "xyxy"))
+            return res, batcher.stats()
+
+    res, stats = run(main())
+    n = len(requests)
+    for boxes, converted, relative in zip(requests, res[:n], res[n:2 * n]):
+        assert converted == [array.convert(box, "x0y0wh", "x0y0x1y1") for box in boxes]
+        expected = [array.convert(box, "cxcywh", "xyxy_rel", (200, 100)) for box in boxes]
+        assert [type(box) for box in relative] == [type(box) for box in expected]
+        assert np.ravel(relative).tolist() == approx(np.ravel(expected).tolist())
+    assert res[-1] == [1., 2., 4., 6.]
+    assert stats.requests == 2 * n + 1
+    assert stats.boxes == 2 * sum(len(boxes) for boxes in requests) + 1
+    assert 1 < stats.batches < stats.requests
+    assert stats.max_latency >= stats.mean_latency > 0
+
+
+def test_iou_and_errors():
+    a = np.array([[0, 0, 10, 10], [0, 0, 10, 10]])
+    b = np.array([[0, 0, 10, 5], [20, 20, 30, 30]])
+
+    async def main():
+        async with MicroBatcher() as batcher:
+            return await asyncio.gather(
+                batcher.iou(a.tolist(), b.tolist()), batcher.iou([0, 0, 10, 10], [5, 0, 15, 10]),
+                batcher.convert([[0.5, 0.5, 0.1, 0.1]], "cxcywh_rel", "xyxy"), return_exceptions=True)
+
+    pairs, single, error = run(main())
+    assert pairs == approx(bbox_numpy.iou(a, b).tolist())
+    assert single == approx(1 / 3)
+    assert isinstance(error, ValueError)
+
+
+def test_bad_request_fails_alone():
+    async def main():
+        async with MicroBatcher(max_delay=0.01) as batcher:
+            with pytest.raises(ValueError):
+                await batcher.iou([[0, 0, 10, 10], [0, 0, 10, 10]], [[0, 0, 10, 5]])
+            return await asyncio.gather(
+                batcher.convert([[10, 20, 30, 40]], "xyxy", "xyxy_rel", image_wh=(100, 100)),
+                batcher.convert([[10, 20, 30, 40]], "xyxy", "xyxy_rel", image_wh=(100, 100, 1)),
+                batcher.convert(np.array([10, 20, 30, 40]), "xyxy", "cxcywh_rel", image_wh=(100, 100)),
+                return_exceptions=True)
+
+    good, bad, single = run(main())
+    assert good == [approx([0.1, 0.2, 0.3, 0.4])]
+    assert isinstance(bad, ValueError)
+    assert single.tolist() == approx([0.2, 0.3, 0.2, 0.2])
+
+
+def test_numpy_inputs():
+    boxes = np.array([[1, 2, 3, 4], [5, 6, 7, 8]])
+
+    async def main():
+        async with MicroBatcher() as batcher:
+            return await asyncio.gather(
+                batcher.convert(boxes, "xywh", "xyxy"), batcher.convert(boxes[0], "xywh", "xyxy"),
+                batcher.convert(list(boxes), "xywh", "xyxy"), batcher.iou(boxes, boxes),
+                batcher.convert(np.ones((2, 2, 4)), "xywh", "xyxy"), return_exceptions=True)
+
+    batch, single, rows, iou, error = run(main())
+    assert isinstance(batch, np.ndarray) and batch.tolist() == [[1, 2, 4, 6], [5, 6, 12, 14]]
+    assert isinstance(single, np.ndarray) and single.tolist() == [1, 2, 4, 6]
+    assert len(rows) == 2 and all(isinstance(row, np.ndarray) for row in rows)
+    assert [row.tolist() for row in rows] == batch.tolist()
+    assert iou == approx([1., 1.])
+    assert isinstance(error, ValueError)
+
+
+def test_bounded_queue_applies_backpressure():
+    async def main():
+        batcher = MicroBatcher(max_queue=4, max_batch_boxes=2, max_delay=0)
+        batcher.start()
+        res = await asyncio.gather(*[batcher.convert([i, 0, 1, 1], "xywh", "xyxy") for i in range(50)])
+        await batcher.close()
+        return res, batcher.stats()
+
+    res, stats = run(main())
+    assert [box[0] for box in res] == list(range(50))
+    assert stats.max_queue_depth <= 4
+    with pytest.raises(RuntimeError):
+        MicroBatcher().start()
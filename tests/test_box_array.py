@@ -0,0 +1,62 @@
+"""
+Tests for `simplebbox.box_array`.
+"""
+import numpy as np
+import pytest
+import torch
+
+from simplebbox.box_array import BoxArray
+from simplebbox.numpy_array import bbox_numpy
+
+
+def test_conversions_are_cached():
+    cxcywh = [[100, 200, 10, 20], [100, 200, 11, 21]]
+    boxes = BoxArray(cxcywh, fmt="cxcywh")
+    x0y0x1y1 = boxes.x0y0x1y1
+    assert x0y0x1y1.tolist() == bbox_numpy.cxcywh_to_x0y0x1y1(np.array(cxcywh)).tolist()
+    assert np.shares_memory(boxes.x0y0x1y1, x0y0x1y1)
+    assert boxes.to("xyxy") is boxes.to("x0y0x1y1")
+    assert boxes.to("x0y0x1y1").to("cxcywh") is boxes
+    assert boxes.cxcywh.tolist() == [[100, 200, 10, 20], [100, 200, 11, 21]]
+
+
+def test_relative_conversions():
+    boxes = BoxArray([[0.5, 0.5, 0.5, 0.25]], fmt="cxcywh_rel", image_wh=(400, 200))
+    assert boxes.to("x0y0x1y1").numpy().tolist() == [[100., 75., 300., 125.]]
+    assert boxes.x0y0x1y1.tolist() == [[0.25, 0.375, 0.75, 0.625]]
+    with pytest.raises(ValueError):
+        BoxArray([[0.5, 0.5, 0.5, 0.25]], fmt="cxcywh_rel").to("x0y0x1y1")
+
+    # integer absolute boxes give floating relative boxes
+    ints = BoxArray([[1, 2, 3, 4]], fmt="xyxy", image_wh=(10, 10))
+    assert ints.to("xyxy_rel").numpy().tolist() == [[0.1, 0.2, 0.3, 0.4]]
+    assert ints.to("cxcywh_rel").numpy().tolist() == [[0.2, 0.3, 0.2, 0.2]]
+    assert ints.to("xyxy_rel").dtype == np.float64
+
+
+def test_zero_copy_views():
+    boxes = BoxArray(np.arange(40, dtype=np.float32).reshape(10, 4), fmt="x0y0wh")
+    assert boxes.columns.flags["C_CONTIGUOUS"]
+    assert np.shares_memory(boxes.numpy(), boxes.columns)
+    assert np.shares_memory(np.asarray(boxes), boxes.columns)
+    assert boxes.torch().data_ptr() == boxes.columns.ctypes.data
+    assert torch.equal(boxes.torch(), torch.arange(40, dtype=torch.float32).reshape(10, 4))
+
+    converted = boxes.x0y0x1y1
+    part = boxes[2:5]
+    assert len(part) == 3
+    assert np.shares_memory(part.columns, boxes.columns)
+    assert np.shares_memory(part.x0y0x1y1, converted)
+    assert part.x0y0x1y1.tolist() == converted[2:5].tolist()
+    assert boxes[-1].numpy().tolist() == [[36, 37, 38, 39]]
+
+
+def test_concatenate():
+    a = BoxArray([[0, 0, 1, 1]], fmt="x0y0wh")
+    b = BoxArray([[1, 1, 2, 2], [2, 2, 3, 3]], fmt="xywh")
+    res = BoxArray.concatenate([a, b])
+    assert len(res) == 3
+    assert res.fmt == "x0y0wh"
+    assert res.x0y0x1y1.tolist() == [[0, 0, 1, 1], [1, 1, 3, 3], [2, 2, 5, 5]]
+    with pytest.raises(ValueError):
+        BoxArray.concatenate([a, BoxArray([[0, 0, 1, 1]])])
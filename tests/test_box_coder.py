@@ -0,0 +1,77 @@
+"""
+Tests for encoding and decoding of boxes with respect to anchors by `ArrayProcessor`.
+"""
+import math
+
+import numpy as np
+import pytest
+import torch
+
+from simplebbox.numpy_array import bbox_numpy
+from simplebbox.torch_tensor import bbox_torch
+from tests.conftest import random_boxes
+
+WEIGHTS = (10., 10., 5., 5.)
+
+
+def reference_encode(box, anchor, weights):
+    bx, by = (box[0] + box[2]) / 2, (box[1] + box[3]) / 2
+    bw, bh = box[2] - box[0], box[3] - box[1]
+    ax, ay = (anchor[0] + anchor[2]) / 2, (anchor[1] + anchor[3]) / 2
+    aw, ah = anchor[2] - anchor[0], anchor[3] - anchor[1]
+    return [weights[0] * (bx - ax) / aw, weights[1] * (by - ay) / ah,
+            weights[2] * math.log(bw / aw), weights[3] * math.log(bh / ah)]
+
+
+def test_encode_matches_reference_and_decode_inverts_it():
+    anchors = random_boxes((30,), 0, extent=500, min_size=5, max_size=200)
+    boxes = random_boxes((4, 30), 1, extent=500, min_size=5, max_size=200)
+    deltas = bbox_numpy.encode_boxes(boxes, anchors, WEIGHTS)
+    assert deltas.shape == (4, 30, 4)
+    expected = [[reference_encode(b, a, WEIGHTS) for b, a in zip(image, anchors)] for image in boxes]
+    assert np.allclose(deltas, expected)
+    assert np.allclose(bbox_numpy.decode_boxes(deltas, anchors, WEIGHTS), boxes)
+
+    t_deltas = bbox_torch.encode_boxes(torch.tensor(boxes), torch.tensor(anchors), WEIGHTS)
+    assert np.allclose(t_deltas.numpy(), deltas)
+    assert np.allclose(bbox_torch.decode_boxes(t_deltas, torch.tensor(anchors), WEIGHTS).numpy(), boxes)
+
+
+@pytest.mark.parametrize("fmt", ["x0y0wh", "cxcywh", "cxcywh_rel", "xyxy_rel"])
+def test_decode_fuses_output_format(fmt):
+    anchors = random_boxes((20,), 2, extent=500, min_size=5, max_size=200)
+    deltas = np.random.RandomState(3).normal(size=(2, 20, 4))
+    image_wh = np.array([640, 480])
+    expected = bbox_numpy.convert(bbox_numpy.decode_boxes(deltas, anchors), "xyxy", fmt, image_wh)
+    assert np.allclose(bbox_numpy.decode_boxes(deltas, anchors, fmt=fmt, image_wh=image_wh), expected)
+
+    if not fmt.endswith("_rel"):
+        anchors_wh = bbox_numpy.convert(anchors, "xyxy", "xywh")
+        assert np.allclose(bbox_numpy.encode_boxes(expected, anchors_wh, fmt=fmt, anchor_fmt="xywh"), deltas)
+
+
+def test_decode_relative_anchors_and_clamp():
+    anchors = random_boxes((10,), 4, extent=500, min_size=5, max_size=200)
+    image_wh = np.array([640, 480])
+    rel_anchors = bbox_numpy.convert(anchors, "xyxy", "xyxy_rel", image_wh)
+    deltas = np.random.RandomState(5).normal(size=(10, 4))
+    assert np.allclose(bbox_numpy.decode_boxes(deltas, rel_anchors, anchor_fmt="xyxy_rel", image_wh=image_wh),
+                       bbox_numpy.decode_boxes(deltas, anchors))
+    with pytest.raises(ValueError):
+        bbox_numpy.decode_boxes(deltas, rel_anchors, anchor_fmt="xyxy_rel")
+
+    huge = np.array([[0., 0., 100., 100.]])
+    decoded = bbox_numpy.decode_boxes(huge, anchors[:1])
+    assert np.isfinite(decoded).all()
+    aw = anchors[0, 2] - anchors[0, 0]
+    assert np.isclose(decoded[0, 2] - decoded[0, 0], aw * 1000 / 16)
+
+
+def test_encode_rejects_mixed_absolute_and_relative():
+    anchors = random_boxes((5,), 6, extent=500, min_size=5, max_size=200)
+    rel_anchors = bbox_numpy.convert(anchors, "xyxy", "xyxy_rel", np.array([640, 480]))
+    with pytest.raises(ValueError, match="both absolute or both relative"):
+        bbox_numpy.encode_boxes(rel_anchors, anchors, fmt="xyxy_rel")
+    with pytest.raises(ValueError, match="both absolute or both relative"):
+        bbox_numpy.encode_boxes(anchors, rel_anchors, anchor_fmt="x0y0x1y1_rel")
+    assert np.allclose(bbox_numpy.encode_boxes(rel_anchors, rel_anchors, fmt="xyxy_rel", anchor_fmt="xyxy_rel"), 0)
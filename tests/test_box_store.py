@@ -0,0 +1,61 @@
+"""
+Tests for `simplebbox.box_store`.
+"""
+import numpy as np
+import pytest
+
+from simplebbox.box_store import BoxStore, BoxStoreWriter
+from simplebbox.numpy_array import bbox_numpy
+
+
+def test_write_and_read(tmp_path):
+    path = tmp_path / "boxes.bin"
+    rng = np.random.RandomState(0)
+    images = [rng.randint(0, 100, size=(n, 4)) for n in [3, 0, 5, 1]]
+    with BoxStoreWriter(path, fmt="x0y0wh", dtype="int32") as writer:
+        assert [writer.append(boxes) for boxes in images] == [0, 1, 2, 3]
+
+    store = BoxStore(path)
+    assert len(store) == 4
+    assert store.fmt == "x0y0wh"
+    assert store.dtype == np.int32
+    for i, boxes in enumerate(images):
+        assert store[i].tolist() == boxes.tolist()
+    assert isinstance(store[2], np.memmap)
+    assert store[-1].tolist() == images[-1].tolist()
+    with pytest.raises(IndexError):
+        store[4]
+
+    boxes, offsets = store.range(1, 4)
+    assert offsets.tolist() == [0, 0, 5, 6]
+    assert boxes.tolist() == np.concatenate(images[1:]).tolist()
+
+    assert store.convert(2, "x0y0x1y1").tolist() == bbox_numpy.x0y0wh_to_x0y0x1y1(images[2]).tolist()
+
+
+def test_append_to_existing_store(tmp_path):
+    path = tmp_path / "boxes.bin"
+    with BoxStoreWriter(path) as writer:
+        writer.append([[0, 0, 1, 1]])
+    assert len(BoxStore(path)) == 1
+
+    with pytest.raises(ValueError, match="format"):
+        BoxStoreWriter(path, fmt="cxcywh")
+    with pytest.raises(ValueError, match="dtype"):
+        BoxStoreWriter(path, dtype="int32")
+    with BoxStoreWriter(path, fmt="xyxy", dtype="float32") as writer:
+        assert writer.fmt == "x0y0x1y1"
+        assert writer.append([[1, 1, 2, 2], [2, 2, 3, 3]]) == 1
+    store = BoxStore(path)
+    assert store.dtype == np.float32
+    assert store[1].tolist() == [[1, 1, 2, 2], [2, 2, 3, 3]]
+
+
+def test_empty_store(tmp_path):
+    path = tmp_path / "boxes.bin"
+    BoxStoreWriter(path).close()
+    store = BoxStore(path)
+    assert len(store) == 0
+    boxes, offsets = store.range(0, 10)
+    assert boxes.shape == (0, 4)
+    assert offsets.tolist() == [0]
@@ -0,0 +1,115 @@
+"""
+Tests for the COCO-style evaluation.
+"""
+import contextlib
+import io
+import json
+
+import numpy as np
+import pytest
+
+from simplebbox.evaluation import Detections, GroundTruth, evaluate
+
+
+def fixture_dataset(n_images=40, n_categories=4, seed=0):
+    """
+    Synthetic dataset with boxes of all area ranges, crowd boxes, images without detections or ground truth
+    of some categories, duplicated and noisy detections and tied scores.
+    """
+    rng = np.random.RandomState(seed)
+    gt_rows, dt_rows = [], []
+    for image in range(1, n_images + 1):
+        for category in range(1, n_categories + 1):
+            for _ in range(rng.poisson(3)):
+                wh = rng.choice([8, 24, 60, 150]) * rng.uniform(0.7, 1.4, size=2)
+                xy = rng.uniform(0, 400, size=2)
+                crowd = rng.rand() < 0.05
+                gt_rows.append((image, category, *xy, *wh, crowd))
+                for _ in range(rng.poisson(1.5)):
+                    noise = rng.normal(scale=0.15, size=4) * np.r_[wh, wh]
+                    score = round(rng.uniform(), 1)
+                    dt_rows.append((image, category, *(np.r_[xy, wh] + noise), score))
+            for _ in range(rng.poisson(1)):
+                dt_rows.append((image, category, *rng.uniform(0, 400, size=2), *rng.uniform(5, 100, size=2),
+                                round(rng.uniform(), 2)))
+    gt, dt = np.array(gt_rows), np.array(dt_rows)
+    dt[:, 4:6] = np.abs(dt[:, 4:6])
+    ground_truth = GroundTruth(gt[:, 0].astype(int), gt[:, 1].astype(int), gt[:, 2:6], gt[:, 6].astype(bool))
+    detections = Detections(dt[:, 0].astype(int), dt[:, 1].astype(int), dt[:, 2:6], dt[:, 6])
+    return ground_truth, detections
+
+
+def pycocotools_eval(ground_truth, detections, tmp_path):
+    pytest.importorskip("pycocotools")
+    from pycocotools.coco import COCO
+    from pycocotools.cocoeval import COCOeval
+
+    annotations = [{
+        "id": i + 1, "image_id": int(image), "category_id": int(category), "bbox": [float(v) for v in box],
+        "area": float(box[2] * box[3]), "iscrowd": int(crowd),
+    } for i, (image, category, box, crowd) in enumerate(zip(*ground_truth[:4]))]
+    images = sorted(set(int(i) for i in ground_truth.image_ids) | set(int(i) for i in detections.image_ids))
+    dataset = {
+        "images": [{"id": i} for i in images], "annotations": annotations,
+        "categories": [{"id": int(c)} for c in np.unique(ground_truth.category_ids)],
+    }
+    results = [{
+        "image_id": int(image), "category_id": int(category), "bbox": [float(v) for v in box], "score": float(score),
+    } for image, category, box, score in zip(*detections)]
+    gt_path, dt_path = tmp_path / "gt.json", tmp_path / "dt.json"
+    gt_path.write_text(json.dumps(dataset))
+    dt_path.write_text(json.dumps(results))
+    with contextlib.redirect_stdout(io.StringIO()):
+        coco_gt = COCO(str(gt_path))
+        coco_eval = COCOeval(coco_gt, coco_gt.loadRes(str(dt_path)), "bbox")
+        coco_eval.evaluate()
+        coco_eval.accumulate()
+        coco_eval.summarize()
+    return coco_eval
+
+
+def test_matches_pycocotools(tmp_path):
+    ground_truth, detections = fixture_dataset()
+    expected = pycocotools_eval(ground_truth, detections, tmp_path)
+    res = evaluate(ground_truth, detections, chunk_size=7)
+    assert np.allclose(res.stats, expected.stats, rtol=0, atol=1e-12)
+    assert np.allclose(res.precision, expected.eval["precision"], rtol=0, atol=1e-12)
+    assert np.allclose(res.recall, expected.eval["recall"], rtol=0, atol=1e-12)
+    assert res.category_ids.tolist() == expected.params.catIds
+
+
+def test_many_detections_per_image(tmp_path):
+    ground_truth, detections = fixture_dataset(n_images=3, n_categories=1, seed=1)
+    rng = np.random.RandomState(2)
+    n = 150
+    detections = Detections(
+        np.r_[detections.image_ids, np.ones(n, dtype=int)], np.r_[detections.category_ids, np.ones(n, dtype=int)],
+        np.r_[detections.boxes, rng.uniform(1, 200, size=(n, 4))], np.r_[detections.scores, rng.uniform(size=n)])
+    expected = pycocotools_eval(ground_truth, detections, tmp_path)
+    res = evaluate(ground_truth, detections)
+    assert np.allclose(res.stats, expected.stats, rtol=0, atol=1e-12)
+
+
+def test_shards_and_formats():
+    ground_truth, detections = fixture_dataset(n_images=10)
+    expected = evaluate(ground_truth, detections)
+    assert np.array_equal(evaluate(ground_truth, detections, n_shards=3, max_workers=2).precision,
+                          expected.precision)
+
+    image_wh = {i: (500, 450) for i in range(1, 11)}
+
+    def to_rel(boxes):
+        boxes = np.asarray(boxes, dtype=float)
+        return np.c_[boxes[:, :2] + boxes[:, 2:] / 2, boxes[:, 2:]] / [500, 450, 500, 450]
+
+    res = evaluate(ground_truth._replace(boxes=to_rel(ground_truth.boxes)),
+                   detections._replace(boxes=to_rel(detections.boxes)), fmt="cxcywh_rel", image_wh=image_wh)
+    assert np.allclose(res.stats, expected.stats)
+    with pytest.raises(ValueError):
+        evaluate(ground_truth, detections, fmt="cxcywh_rel")
+
+
+def test_undefined_categories():
+    ground_truth = GroundTruth([1], [1], [[0, 0, 10, 10]], [True])
+    res = evaluate(ground_truth, Detections([1], [1], [[0, 0, 10, 10]], [1.]))
+    assert res.stats.tolist() == [-1.] * 12
@@ -0,0 +1,89 @@
+"""
+Tests for `fuse_boxes` of `ArrayProcessor`.
+"""
+import numpy as np
+import pytest
+import torch
+from pytest import approx
+
+import simplebbox
+from simplebbox.numpy_array import bbox_numpy
+from simplebbox.torch_tensor import bbox_torch
+
+
+def ensemble_boxes(n_objects, n_models, seed):
+    """
+    Predictions of several models for the same objects: noisy copies of the objects and some false positives.
+    """
+    rng = np.random.RandomState(seed)
+    xy = rng.uniform(0, 500, size=(n_objects, 2))
+    objects = np.concatenate([xy, xy + rng.uniform(10, 80, size=(n_objects, 2))], axis=1)
+    boxes = np.concatenate([objects + rng.normal(scale=3, size=objects.shape) for _ in range(n_models)]
+                           + [rng.uniform(0, 500, size=(n_objects // 4, 4)).cumsum(axis=1) / 2])
+    return boxes, rng.uniform(0.05, 1, size=len(boxes)), rng.randint(0, 3, size=len(boxes))
+
+
+def reference_fusion(boxes, scores, labels, iou_threshold, method, n_models=None):
+    iou = bbox_numpy.iou_matrix(boxes, boxes)
+    leaders, members = [], []
+    for i in np.argsort(-scores):
+        for leader, cluster in zip(leaders, members):
+            if labels[leader] == labels[i] and iou[leader, i] > iou_threshold:
+                cluster.append(i)
+                break
+        else:
+            leaders.append(i)
+            members.append([i])
+    res_boxes, res_scores = [], []
+    for leader, cluster in zip(leaders, members):
+        s = scores[cluster]
+        weights = {"wbf": s, "average": np.ones(len(s)), "soft_vote": s * iou[leader, cluster]}[method]
+        res_boxes.append((boxes[cluster] * weights[:, None]).sum(axis=0) / weights.sum())
+        score = scores[leader] if method == "soft_vote" else s.mean()
+        if n_models is not None:
+            score *= min(len(cluster), n_models) / n_models
+        res_scores.append(score)
+    return np.array(res_boxes), np.array(res_scores), leaders
+
+
+@pytest.mark.parametrize("method", ["wbf", "soft_vote", "average"])
+def test_matches_reference(method):
+    boxes, scores, labels = ensemble_boxes(60, 3, 0)
+    expected_boxes, expected_scores, expected_leaders = reference_fusion(boxes, scores, labels, 0.55, method)
+    res_boxes, res_scores, leaders = bbox_numpy.fuse_boxes(boxes, scores, labels, method=method, max_pairs=100)
+    assert leaders.tolist() == expected_leaders
+    assert res_boxes.ravel().tolist() == approx(expected_boxes.ravel().tolist())
+    assert res_scores.tolist() == approx(expected_scores.tolist())
+
+    res_boxes, res_scores, leaders = bbox_torch.fuse_boxes(
+        torch.tensor(boxes), torch.tensor(scores), torch.tensor(labels), method=method)
+    assert leaders.tolist() == expected_leaders
+    assert res_boxes.numpy().ravel().tolist() == approx(expected_boxes.ravel().tolist())
+
+
+def test_leaders_are_nms():
+    boxes, scores, _ = ensemble_boxes(100, 4, 1)
+    for threshold in [0.3, 0.7]:
+        _, _, leaders = bbox_numpy.fuse_boxes(boxes, scores, iou_threshold=threshold)
+        assert leaders.tolist() == bbox_numpy.nms(boxes, scores, threshold).tolist()
+
+
+def test_formats_and_model_count():
+    boxes, scores, labels = ensemble_boxes(30, 2, 2)
+    expected_boxes, expected_scores, _ = reference_fusion(boxes, scores, labels, 0.55, "wbf", n_models=2)
+    res_boxes, res_scores, _ = bbox_numpy.fuse_boxes(
+        bbox_numpy.convert(boxes, "xyxy", "cxcywh"), scores, labels, n_models=2, fmt="cxcywh")
+    assert bbox_numpy.convert(res_boxes, "cxcywh", "xyxy").ravel().tolist() == approx(expected_boxes.ravel().tolist())
+    assert res_scores.tolist() == approx(expected_scores.tolist())
+
+    res_boxes, res_scores, leaders = bbox_numpy.fuse_boxes(boxes[:0], scores[:0])
+    assert res_boxes.shape == (0, 4) and len(res_scores) == len(leaders) == 0
+    with pytest.raises(ValueError):
+        bbox_numpy.fuse_boxes(boxes, scores, method="median")
+
+
+def test_array_api_namespace_is_not_supported():
+    xp = pytest.importorskip("array_api_strict")
+    boxes = xp.asarray(np.array([[0., 0., 10., 10.], [1., 1., 10., 10.]]))
+    with pytest.raises(TypeError, match="arange_fn"):
+        simplebbox.get_backend(boxes).fuse_boxes(boxes, xp.asarray([0.9, 0.8]))
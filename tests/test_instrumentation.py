@@ -0,0 +1,95 @@
+"""
+Tests for `simplebbox.instrumentation`.
+"""
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+import torch
+
+import simplebbox
+from simplebbox import array, instrumentation
+from simplebbox._array_processor import ArrayProcessor
+from simplebbox.numpy_array import bbox_numpy
+from simplebbox.torch_tensor import bbox_torch
+
+
+@pytest.fixture
+def enabled():
+    instrumentation.reset()
+    instrumentation.enable()
+    yield
+    instrumentation.disable()
+    instrumentation.reset()
+
+
+def test_disable_restores_originals():
+    original_convert, original_many = ArrayProcessor.convert, array.x0y0wh_to_x0y0x1y1_many
+    instrumentation.enable()
+    instrumentation.enable()
+    assert instrumentation.is_enabled()
+    assert ArrayProcessor.convert is not original_convert
+    instrumentation.disable()
+    assert not instrumentation.is_enabled()
+    assert ArrayProcessor.convert is original_convert
+    assert array.x0y0wh_to_x0y0x1y1_many is original_many
+
+
+def test_records_calls(enabled):
+    boxes = np.ones((10, 4), dtype=np.float32)
+    bbox_numpy.convert(boxes, "xywh", "xyxy")
+    bbox_numpy.with_precision("float32").convert(boxes[:3], "xywh", "cxcywh")
+    bbox_torch.x0y0wh_to_x0y0x1y1(torch.zeros(2, 5, 4))
+    # conversions inside nms are not recorded separately
+    bbox_numpy.nms(boxes, np.zeros(10), 0.5, fmt="xywh")
+    array.x0y0wh_to_x0y0x1y1_many([[1, 2, 3, 4], [1, 2, 3, 4]])
+
+    stats = instrumentation.snapshot()
+    assert set(stats) == {"numpy.convert", "torch.x0y0wh_to_x0y0x1y1", "numpy.nms", "array.x0y0wh_to_x0y0x1y1_many"}
+    assert stats["numpy.convert"].calls == 2
+    assert stats["numpy.convert"].boxes == 13
+    assert stats["numpy.convert"].shapes == {(10, 4): 1, (3, 4): 1}
+    assert stats["numpy.convert"].dtypes == {"float32": 2}
+    assert stats["torch.x0y0wh_to_x0y0x1y1"].boxes == 10
+    assert stats["torch.x0y0wh_to_x0y0x1y1"].dtypes == {"torch.float32": 1}
+    assert stats["array.x0y0wh_to_x0y0x1y1_many"].boxes == 2
+    assert stats["numpy.nms"].seconds > 0
+
+    instrumentation.reset()
+    assert instrumentation.snapshot() == {}
+
+
+def test_records_are_keyed_by_processor(enabled):
+    # failing calls are recorded too
+    with pytest.raises(Exception):
+        bbox_numpy.convert([[1, 2, 3, 4]], "xywh", "xyxy")
+    bbox_torch.with_precision("float32").convert(torch.zeros(3, 4), "xywh", "xyxy")
+    stats = instrumentation.snapshot()
+    assert set(stats) == {"numpy.convert", "torch.convert"}
+    assert stats["numpy.convert"].shapes == {(1, 4): 1}
+    xp = pytest.importorskip("array_api_strict")
+    simplebbox.convert(xp.asarray(np.ones((2, 4))), "xywh", "xyxy")
+    assert instrumentation.snapshot()["array_api_strict.convert"].boxes == 2
+
+
+def test_hooks(enabled):
+    records = []
+    instrumentation.add_hook(records.append)
+    try:
+        array.convert((1, 2, 3, 4), "xywh", "xyxy")
+        with pytest.raises(ValueError):
+            bbox_numpy.convert(np.zeros((2, 4)), "xyxy", "xyxy_rel")
+    finally:
+        instrumentation.remove_hook(records.append)
+    array.convert((1, 2, 3, 4), "xywh", "xyxy")
+    assert [(r.name, r.shape, r.dtype, r.boxes) for r in records] == [
+        ("array.convert", (4,), "int", 1), ("numpy.convert", (2, 4), "float64", 2)]
+
+
+def test_environment_variable():
+    code = ("import simplebbox; from simplebbox import array, instrumentation; "
+            "array.convert([1, 2, 3, 4], 'xywh', 'xyxy'); "
+            "assert instrumentation.snapshot()['array.convert'].calls == 1")
+    subprocess.run([sys.executable, "-c", code], check=True, env=dict(os.environ, SIMPLEBBOX_INSTRUMENTATION="1"))
@@ -0,0 +1,88 @@
+"""
+Tests for IoU functions of `ArrayProcessor`.
+"""
+import math
+
+import numpy as np
+import torch
+from pytest import approx
+
+from simplebbox.numpy_array import bbox_numpy
+from simplebbox.torch_tensor import bbox_torch
+from tests.conftest import random_boxes
+
+
+def reference(a, b):
+    """
+    Straightforward computation of (iou, giou, diou, ciou) for two boxes in format x0y0x1y1.
+    """
+    iw = max(0, min(a[2], b[2]) - max(a[0], b[0]))
+    ih = max(0, min(a[3], b[3]) - max(a[1], b[1]))
+    inter = iw * ih
+    union = (a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - inter
+    iou = inter / union
+    hull_w = max(a[2], b[2]) - min(a[0], b[0])
+    hull_h = max(a[3], b[3]) - min(a[1], b[1])
+    giou = iou - (hull_w * hull_h - union) / (hull_w * hull_h)
+    rho2 = ((a[0] + a[2]) / 2 - (b[0] + b[2]) / 2) ** 2 + ((a[1] + a[3]) / 2 - (b[1] + b[3]) / 2) ** 2
+    diou = iou - rho2 / (hull_w ** 2 + hull_h ** 2)
+    v = 4 / math.pi ** 2 * (math.atan((b[2] - b[0]) / (b[3] - b[1])) - math.atan((a[2] - a[0]) / (a[3] - a[1]))) ** 2
+    ciou = diou - v / (1 - iou + v) * v if v else diou
+    return iou, giou, diou, ciou
+
+
+def test_matrices_match_reference():
+    a = random_boxes(7, 0)
+    b = random_boxes(5, 1)
+    expected = np.array([[reference(x, y) for y in b] for x in a])
+    for i, name in enumerate(["iou_matrix", "giou_matrix", "diou_matrix", "ciou_matrix"]):
+        assert getattr(bbox_numpy, name)(a, b) == approx(expected[..., i], abs=1e-6)
+        assert getattr(bbox_numpy, name)(a, b, chunk_size=3) == approx(expected[..., i], abs=1e-6)
+        res = getattr(bbox_torch, name)(torch.tensor(a), torch.tensor(b), chunk_size=2)
+        assert res.shape == (7, 5)
+        assert res.numpy() == approx(expected[..., i], abs=1e-6)
+
+
+def test_paired_match_matrix_diagonal():
+    a = random_boxes(6, 2)
+    b = random_boxes(6, 3)
+    for name in ["iou", "giou", "diou", "ciou"]:
+        paired = getattr(bbox_numpy, name)(a, b)
+        assert paired.shape == (6,)
+        assert paired == approx(np.diag(getattr(bbox_numpy, name + "_matrix")(a, b)))
+        assert getattr(bbox_torch, name)(torch.tensor(a), torch.tensor(b)).numpy() == approx(paired)
+
+
+def test_formats_and_batches():
+    a = random_boxes(4, 4)
+    b = random_boxes(3, 5)
+    expected = bbox_numpy.iou_matrix(a, b)
+    a_wh = bbox_numpy.x0y0x1y1_to_x0y0wh(a)
+    b_wh = bbox_numpy.x0y0x1y1_to_x0y0wh(b)
+    assert bbox_numpy.iou_matrix(a_wh, b_wh, fmt="x0y0wh") == approx(expected)
+    a_c = bbox_numpy.convert(a, "x0y0x1y1", "cxcywh")
+    b_c = bbox_numpy.convert(b, "x0y0x1y1", "cxcywh")
+    assert bbox_numpy.iou_matrix(a_c, b_c, fmt="cxcywh", chunk_size=1) == approx(expected)
+
+    batched = bbox_numpy.iou_matrix(np.stack([a, a]), np.stack([b, b]), chunk_size=3)
+    assert batched.shape == (2, 4, 3)
+    assert batched[1] == approx(expected)
+
+
+def test_known_values():
+    a = np.array([[0, 0, 10, 10]])
+    b = np.array([[0, 0, 10, 10], [5, 0, 15, 10], [20, 20, 30, 30]])
+    assert bbox_numpy.iou_matrix(a, b)[0].tolist() == approx([1., 1 / 3, 0.])
+    assert bbox_torch.iou_matrix(torch.tensor(a), torch.tensor(b))[0].tolist() == approx([1., 1 / 3, 0.])
+    assert bbox_numpy.giou_matrix(a, b)[0, 2] == approx(0 - (900 - 200) / 900)
+
+
+def test_empty_union_is_zero():
+    a = np.array([[5., 5., 5., 5.], [0., 0., 10., 0.], [0., 0., 10., 10.]])
+    b = np.array([[5., 5., 5., 5.], [0., 0., 10., 0.], [5., 5., 5., 5.]])
+    assert bbox_numpy.iou(a, b).tolist() == [0., 0., 0.]
+    assert not np.isnan(bbox_numpy.iou_matrix(a, b)).any()
+    assert bbox_torch.iou(torch.tensor(a), torch.tensor(b)).tolist() == [0., 0., 0.]
+    assert bbox_numpy.iou(a.astype(int), b.astype(int)).tolist() == [0., 0., 0.]
+    # degenerate boxes are kept by NMS as non-overlapping boxes
+    assert sorted(bbox_numpy.nms(a[:2].repeat(2, axis=0), np.arange(4.), 0.5).tolist()) == [0, 1, 2, 3]
@@ -0,0 +1,80 @@
+"""
+Tests for non-maximum suppression functions of `ArrayProcessor`.
+"""
+import numpy as np
+import torch
+from pytest import approx
+
+from simplebbox.numpy_array import bbox_numpy
+from simplebbox.torch_tensor import bbox_torch
+from tests.conftest import random_boxes
+
+
+def reference_nms(boxes, scores, iou_threshold):
+    iou = bbox_numpy.iou_matrix(boxes, boxes)
+    keep = []
+    for i in np.argsort(-scores):
+        if all(iou[i, k] <= iou_threshold for k in keep):
+            keep.append(i)
+    return keep
+
+
+def test_nms_matches_reference():
+    boxes, scores = random_boxes(200, 0, min_size=5, max_size=40, scores=True)
+    for threshold in [0.1, 0.5, 0.9]:
+        expected = reference_nms(boxes, scores, threshold)
+        assert bbox_numpy.nms(boxes, scores, threshold).tolist() == expected
+        assert bbox_torch.nms(torch.tensor(boxes), torch.tensor(scores), threshold).tolist() == expected
+        # candidate pairs processed in small chunks
+        assert bbox_numpy.nms(boxes, scores, threshold, max_pairs=16).tolist() == expected
+
+    wh = bbox_numpy.x0y0x1y1_to_x0y0wh(boxes)
+    assert bbox_numpy.nms(wh, scores, 0.5, fmt="x0y0wh").tolist() == reference_nms(boxes, scores, 0.5)
+    assert len(bbox_numpy.nms(boxes[:0], scores[:0], 0.5)) == 0
+
+
+def test_nms_of_sparse_and_degenerate_scenes():
+    boxes, scores = random_boxes(300, 3, extent=2000, min_size=5, max_size=40, scores=True)
+    # a box covering the scene, duplicates and boxes of zero height
+    boxes[0] = [-10, -10, 3000, 3000]
+    boxes[1:4] = boxes[4]
+    boxes[5:20, 3] = boxes[5:20, 1]
+    for threshold in [0., 0.5]:
+        expected = reference_nms(boxes, scores, threshold)
+        assert bbox_numpy.nms(boxes, scores, threshold).tolist() == expected
+        assert bbox_numpy.nms(boxes[1:], scores[1:], threshold, max_pairs=16).tolist() == \
+            reference_nms(boxes[1:], scores[1:], threshold)
+
+
+def test_batched_nms_is_nms_per_class():
+    boxes, scores = random_boxes(150, 1, min_size=5, max_size=40, scores=True)
+    classes = np.random.RandomState(2).randint(0, 3, size=len(boxes))
+    expected = set()
+    for c in range(3):
+        idx = np.flatnonzero(classes == c)
+        expected.update(idx[reference_nms(boxes[idx], scores[idx], 0.5)].tolist())
+    keep = bbox_numpy.batched_nms(boxes, scores, classes, 0.5)
+    assert set(keep.tolist()) == expected
+    assert list(scores[keep]) == sorted(scores[keep], reverse=True)
+    keep_torch = bbox_torch.batched_nms(torch.tensor(boxes), torch.tensor(scores), torch.tensor(classes), 0.5)
+    assert keep_torch.tolist() == keep.tolist()
+
+
+def test_soft_nms():
+    boxes = np.array([[0, 0, 10, 10], [0, 0, 10, 5], [20, 20, 30, 30]], dtype=float)
+    scores = np.array([0.9, 0.8, 0.7])
+
+    keep, new_scores = bbox_numpy.soft_nms(boxes, scores, sigma=0.5)
+    assert keep.tolist() == [0, 2, 1]
+    assert new_scores == approx([0.9, 0.7, 0.8 * np.exp(-0.5 ** 2 / 0.5)])
+
+    keep, new_scores = bbox_numpy.soft_nms(boxes, scores, method="linear", iou_threshold=0.3)
+    assert keep.tolist() == [0, 2, 1]
+    assert new_scores == approx([0.9, 0.7, 0.4])
+
+    keep_torch, scores_torch = bbox_torch.soft_nms(torch.tensor(boxes), torch.tensor(scores), method="linear")
+    assert keep_torch.tolist() == [0, 2, 1]
+    assert scores_torch.numpy() == approx([0.9, 0.7, 0.4])
+
+    keep, _ = bbox_numpy.soft_nms(boxes, scores, method="linear", iou_threshold=0.3, score_threshold=0.5)
+    assert keep.tolist() == [0, 2]
@@ -0,0 +1,62 @@
+"""
+Tests for `simplebbox.parallel`.
+"""
+import os
+
+import pytest
+from pytest import approx
+
+from simplebbox.annotations import VocWriter, convert_annotations, read_voc, read_yolo
+from simplebbox.parallel import _Collector, convert_files, list_annotation_files
+
+
+def _write_yolo(directory, n_files=20):
+    os.makedirs(directory)
+    for i in range(n_files):
+        with open(os.path.join(directory, "{:03d}.txt".format(i)), "w") as f:
+            for j in range(i % 4):
+                f.write("{} {:.6f} {:.6f} {:.6f} {:.6f}\n".format(j, 0.1 + 0.02 * i, 0.5, 0.1, 0.2 + 0.01 * j))
+
+
+def test_convert_files_keeps_order(tmp_path):
+    src = str(tmp_path / "yolo")
+    _write_yolo(src)
+    expected = _Collector()
+    convert_annotations(read_yolo(src, image_wh=(640, 480)), "cxcywh_rel", "x0y0x1y1", expected)
+
+    paths = list_annotation_files(src, "yolo")
+    assert len(paths) == 20
+    actual = _Collector()
+    stats = convert_files(paths, "yolo", "voc", actual, max_workers=2, chunk_size=3,
+                          read_options={"image_wh": (640, 480)})
+    assert stats.images == 20
+    assert stats.boxes == sum(i % 4 for i in range(20))
+    assert [im.file_name for im in actual.images] == [im.file_name for im in expected.images]
+    for a, e in zip(actual.images, expected.images):
+        assert a.labels == e.labels
+        assert a.boxes.ravel().tolist() == approx(e.boxes.ravel().tolist())
+
+
+def test_convert_files_to_output_dir(tmp_path):
+    src = str(tmp_path / "yolo")
+    _write_yolo(src)
+    dst = str(tmp_path / "voc")
+    stats = convert_files(list_annotation_files(src, "yolo"), "yolo", "voc", output_dir=dst, max_workers=2,
+                          chunk_size=4, read_options={"image_wh": (640, 480)})
+    assert stats.images == 20
+
+    expected = _Collector()
+    convert_annotations(read_yolo(src, image_wh=(640, 480)), "cxcywh_rel", "x0y0x1y1", expected)
+    actual = sorted(read_voc(dst), key=lambda im: im.file_name)
+    assert [im.file_name for im in actual] == [im.file_name for im in expected.images]
+    for a, e in zip(actual, expected.images):
+        assert a.boxes.ravel().tolist() == approx(e.boxes.ravel().tolist(), abs=1e-4)
+
+
+def test_convert_files_errors(tmp_path):
+    with pytest.raises(ValueError):
+        convert_files([], "coco", "voc", VocWriter(str(tmp_path)))
+    with pytest.raises(ValueError):
+        convert_files([], "yolo", "voc")
+    with pytest.raises(ValueError):
+        convert_files([], "voc", "yolo", output_dir=str(tmp_path))
@@ -0,0 +1,95 @@
+"""
+Tests for the dtype policies of `ArrayProcessor.with_precision`.
+"""
+import math
+
+import numpy as np
+import pytest
+import torch
+
+from simplebbox import array
+from simplebbox.numpy_array import bbox_numpy
+from simplebbox.torch_tensor import bbox_torch
+
+ROUNDING_FNS = {"round": round, "floor": math.floor, "ceil": math.ceil, "trunc": math.trunc}
+
+
+def random_cxcywh(n, seed):
+    rng = np.random.RandomState(seed)
+    # integers and halves produce ties for rounding
+    cxcy = rng.randint(0, 200, size=(n, 2)) + rng.choice([0, 0.5, 0.25], size=(n, 2))
+    wh = rng.randint(1, 51, size=(n, 2)) + rng.choice([0, 0.5, 0.8], size=(n, 2))
+    return np.concatenate([cxcy, wh], axis=1)
+
+
+@pytest.mark.parametrize("rounding", list(ROUNDING_FNS))
+def test_integer_results_are_bit_exact(rounding):
+    fn = ROUNDING_FNS[rounding]
+    boxes = random_cxcywh(500, 0)
+    ints = np.rint(boxes).astype(np.int32)
+    for processor, wrap in [(bbox_numpy, np.asarray), (bbox_torch, torch.from_numpy)]:
+        p = processor.with_precision("int32", rounding)
+        for name in ["cxcywh_to_x0y0wh", "cxcywh_to_x0y0x1y1", "cxcywh_to_x0y0wh_int_div",
+                     "cxcywh_to_x0y0x1y1_int_div"]:
+            for inputs in [boxes, ints]:
+                expected = [getattr(array, name)(box, convert_fn=fn) for box in inputs.tolist()]
+                res = getattr(p, name)(wrap(inputs))
+                assert res.dtype == p.get_dtype("int32")
+                assert res.tolist() == expected, name
+
+        rel = boxes / 400
+        image_wh = np.array([640, 480])
+        expected = [array.xyxy_rel_to_abs(box, [640, 480], convert_fn=fn) for box in rel.tolist()]
+        assert p.xyxy_rel_to_abs(wrap(rel), wrap(image_wh)).tolist() == expected
+        expected = [array.convert(box, "cxcywh_rel", "x0y0x1y1", [640, 480], convert_fn=fn) for box in rel.tolist()]
+        assert p.convert(wrap(rel), "cxcywh_rel", "x0y0x1y1", wrap(image_wh)).tolist() == expected
+
+
+def test_preserve_keeps_dtype():
+    boxes = random_cxcywh(100, 1)
+    p = bbox_numpy.with_precision("preserve")
+    for dtype in [np.float16, np.float32, np.float64, np.int32, np.int64]:
+        arr = boxes.astype(dtype)
+        assert p.cxcywh_to_x0y0x1y1(arr).dtype == dtype
+        assert p.cxcywh_to_x0y0wh(arr).dtype == dtype
+        assert p.xyxy_abs_to_rel(arr, np.array([640, 480])).dtype == dtype
+        assert p.convert(arr, "cxcywh", "x0y0x1y1").dtype == dtype
+
+    # integer inputs are rounded half to even
+    ints = np.rint(boxes).astype(np.int32)
+    expected = [array.cxcywh_to_x0y0x1y1(box, convert_fn=round) for box in ints.tolist()]
+    assert p.cxcywh_to_x0y0x1y1(ints).tolist() == expected
+
+    # float64 results are identical to the default promotion
+    assert np.array_equal(p.cxcywh_to_x0y0x1y1(boxes), bbox_numpy.cxcywh_to_x0y0x1y1(boxes))
+    expected = [array.cxcywh_to_x0y0x1y1(box) for box in boxes.tolist()]
+    assert p.cxcywh_to_x0y0x1y1(boxes).tolist() == expected
+
+    t = bbox_torch.with_precision("preserve")
+    for dtype in [torch.float16, torch.float32, torch.int32]:
+        assert t.cxcywh_to_x0y0x1y1(torch.from_numpy(boxes).to(dtype)).dtype == dtype
+
+
+def test_float32_policy():
+    boxes = random_cxcywh(100, 2)
+    p = bbox_numpy.with_precision("float32")
+    for arr in [boxes, np.rint(boxes).astype(np.int32)]:
+        res = p.cxcywh_to_x0y0x1y1(arr)
+        assert res.dtype == np.float32
+        # computed in float32 operation by operation like the scalar functions on float32 values
+        expected = [array.cxcywh_to_x0y0x1y1(list(box)) for box in arr.astype(np.float32)]
+        assert res.tolist() == np.array(expected, dtype=np.float32).tolist()
+        assert p.xyxy_abs_to_rel(arr, np.array([640, 480])).dtype == np.float32
+    t = bbox_torch.with_precision("float32")
+    assert t.xyxy_abs_to_rel(torch.from_numpy(boxes), torch.tensor([640, 480])).dtype == torch.float32
+
+
+def test_default_processor_is_unchanged():
+    ints = np.array([[100, 200, 11, 21]], dtype=np.int32)
+    assert bbox_numpy.cxcywh_to_x0y0x1y1(ints).dtype == np.float64
+    bbox_numpy.with_precision("int32")
+    assert bbox_numpy.cxcywh_to_x0y0x1y1(ints).dtype == np.float64
+    with pytest.raises(ValueError):
+        bbox_numpy.with_precision("float8")
+    with pytest.raises(ValueError):
+        bbox_numpy.with_precision("int32", rounding="half_up")
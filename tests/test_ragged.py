@@ -0,0 +1,72 @@
+"""
+Tests for ragged batches and clipping of `ArrayProcessor`.
+"""
+import numpy as np
+import pytest
+import torch
+
+from simplebbox.numpy_array import bbox_numpy
+from simplebbox.torch_tensor import bbox_torch
+
+
+def ragged_batch(seed):
+    rng = np.random.RandomState(seed)
+    counts = np.array([3, 0, 5, 1])
+    offsets = np.concatenate([[0], np.cumsum(counts)])
+    image_wh = rng.randint(100, 1000, size=(len(counts), 2))
+    xy = rng.uniform(-50, 900, size=(offsets[-1], 2))
+    wh = rng.uniform(1, 200, size=(offsets[-1], 2))
+    return np.concatenate([xy, xy + wh], axis=1), offsets, image_wh
+
+
+def test_ragged_matches_per_image_loop():
+    boxes, offsets, image_wh = ragged_batch(0)
+    per_image = [
+        (boxes[offsets[i]:offsets[i + 1]], image_wh[i]) for i in range(len(image_wh))
+    ]
+    rel = bbox_numpy.xyxy_abs_to_rel_ragged(boxes, offsets, image_wh)
+    assert np.allclose(rel, np.concatenate([bbox_numpy.xyxy_abs_to_rel(b, wh) for b, wh in per_image]))
+    assert np.allclose(bbox_numpy.xyxy_rel_to_abs_ragged(rel, offsets, image_wh), boxes)
+
+    converted = bbox_numpy.convert_ragged(boxes, offsets, "xyxy", "cxcywh_rel", image_wh)
+    expected = np.concatenate([bbox_numpy.convert(b, "xyxy", "cxcywh_rel", wh) for b, wh in per_image])
+    assert np.allclose(converted, expected)
+    assert np.allclose(bbox_numpy.convert_ragged(boxes, offsets, "xyxy", "xywh"),
+                       bbox_numpy.x0y0x1y1_to_x0y0wh(boxes))
+
+    clipped = bbox_numpy.clip_ragged(boxes, offsets, image_wh)
+    expected = np.concatenate([bbox_numpy.clip(b, wh) for b, wh in per_image])
+    assert np.array_equal(clipped, expected)
+    for b, wh in zip(np.split(clipped, offsets[1:-1]), image_wh):
+        assert (b >= 0).all() and (b[:, [0, 2]] <= wh[0]).all() and (b[:, [1, 3]] <= wh[1]).all()
+
+    out = np.empty_like(boxes)
+    assert bbox_numpy.xyxy_abs_to_rel_ragged(boxes, offsets, image_wh, out=out) is out
+    assert np.allclose(out, rel)
+
+
+def test_ragged_torch():
+    boxes, offsets, image_wh = ragged_batch(1)
+    expected = bbox_numpy.convert_ragged(boxes, offsets, "xyxy", "cxcywh_rel", image_wh)
+    res = bbox_torch.convert_ragged(torch.tensor(boxes), torch.tensor(offsets), "xyxy", "cxcywh_rel",
+                                    torch.tensor(image_wh))
+    assert np.allclose(res.numpy(), expected)
+    clipped = bbox_torch.clip_ragged(torch.tensor(boxes), torch.tensor(offsets), torch.tensor(image_wh))
+    assert np.allclose(clipped.numpy(), bbox_numpy.clip_ragged(boxes, offsets, image_wh))
+
+
+def test_clip_formats():
+    boxes = np.array([[-10., 5., 20., 30.], [90., 90., 20., 20.]])
+    assert bbox_numpy.clip(boxes, np.array([100, 100]), fmt="xywh").tolist() == [[0, 5, 10, 30], [90, 90, 10, 10]]
+    rel = np.array([[-0.1, 0.5, 1.2, 0.7]])
+    assert bbox_numpy.clip(rel, fmt="xyxy_rel").tolist() == [[0, 0.5, 1, 0.7]]
+    with pytest.raises(ValueError):
+        bbox_numpy.clip(boxes)
+
+
+def test_ragged_errors():
+    boxes, offsets, image_wh = ragged_batch(2)
+    with pytest.raises(ValueError):
+        bbox_numpy.xyxy_abs_to_rel_ragged(boxes, offsets[:-1], image_wh)
+    with pytest.raises(ValueError):
+        bbox_numpy.xyxy_abs_to_rel_ragged(boxes[:-1], offsets, image_wh)
@@ -0,0 +1,71 @@
+"""
+Tests for `sanitize` of `ArrayProcessor` and `simplebbox.array`.
+"""
+import numpy as np
+import pytest
+import torch
+
+from simplebbox import array
+from simplebbox.numpy_array import bbox_numpy
+from simplebbox.torch_tensor import bbox_torch
+
+
+def dirty_boxes(n, seed):
+    rng = np.random.RandomState(seed)
+    boxes = rng.uniform(-50, 150, size=(n, 4))
+    boxes[rng.rand(n) < 0.1, rng.randint(4)] = np.nan
+    return boxes
+
+
+def reference(boxes, image_wh, fmt, **kwargs):
+    res = [array.sanitize(box, image_wh, fmt=fmt, **kwargs) for box in boxes.tolist()]
+    keep = [i for i, box in enumerate(res) if box is not None]
+    return np.array([res[i] for i in keep]).reshape(-1, 4), keep
+
+
+@pytest.mark.parametrize("fmt", ["x0y0x1y1", "x0y0wh", "cxcywh", "xyxy_rel"])
+@pytest.mark.parametrize("kwargs", [{}, {"min_size": 10}, {"min_area": 500}, {"clip": False}])
+def test_matches_scalar(fmt, kwargs):
+    boxes = dirty_boxes(300, 0)
+    image_wh = None if fmt.endswith("_rel") else (100, 80)
+    if fmt.endswith("_rel"):
+        boxes = boxes / 100
+    expected, expected_keep = reference(boxes, image_wh, fmt, **kwargs)
+    wh = None if image_wh is None else np.array(image_wh)
+    res, keep = bbox_numpy.sanitize(boxes, wh, fmt=fmt, **kwargs)
+    assert keep.tolist() == expected_keep
+    assert np.allclose(res, expected)
+
+    wh = None if image_wh is None else torch.tensor(image_wh)
+    res, keep = bbox_torch.sanitize(torch.tensor(boxes), wh, fmt=fmt, **kwargs)
+    assert keep.tolist() == expected_keep
+    assert np.allclose(res.numpy(), expected)
+
+
+def test_ragged():
+    boxes = dirty_boxes(100, 1)
+    offsets = np.array([0, 10, 10, 55, 100])
+    image_wh = np.array([[100, 80], [10, 10], [50, 120], [150, 150]])
+    res, keep, new_offsets = bbox_numpy.sanitize_ragged(boxes, offsets, image_wh, min_size=5)
+    assert new_offsets[0] == 0 and new_offsets[-1] == len(keep)
+    for i, wh in enumerate(image_wh):
+        part = boxes[offsets[i]:offsets[i + 1]]
+        expected, expected_keep = bbox_numpy.sanitize(part, wh, min_size=5)
+        assert np.array_equal(res[new_offsets[i]:new_offsets[i + 1]], expected)
+        assert np.array_equal(keep[new_offsets[i]:new_offsets[i + 1]], expected_keep + offsets[i])
+
+    t_res, t_keep, t_offsets = bbox_torch.sanitize_ragged(
+        torch.tensor(boxes), torch.tensor(offsets), torch.tensor(image_wh), min_size=5)
+    assert t_keep.tolist() == keep.tolist() and t_offsets.tolist() == new_offsets.tolist()
+
+
+def test_nothing_kept():
+    res, keep = bbox_numpy.sanitize(np.array([[5., 5., 1., 1.]]))
+    assert res.shape == (0, 4) and len(keep) == 0
+
+
+def test_x0y0x1y1_columns():
+    boxes = np.array([[10., 20., 4., 6.], [1., 2., 3., 4.]])
+    for fmt, dst in [("x0y0x1y1", "x0y0x1y1"), ("x0y0wh", "x0y0x1y1"), ("cxcywh_rel", "x0y0x1y1_rel")]:
+        expected = bbox_numpy.convert(boxes, fmt, dst)
+        assert np.stack(bbox_numpy.x0y0x1y1_columns(boxes, fmt), axis=-1).tolist() == expected.tolist()
@@ -0,0 +1,75 @@
+"""
+Tests for `simplebbox.shared_memory`.
+"""
+import multiprocessing
+from multiprocessing import shared_memory
+
+import numpy as np
+import pytest
+import torch
+
+from simplebbox.numpy_array import bbox_numpy
+from simplebbox.shared_memory import SharedBoxPool
+
+
+def worker(pool, results, seed):
+    boxes = np.random.RandomState(seed).uniform(1, 100, size=(50, 4))
+    results.put((seed, pool.write(boxes, src="cxcywh", dst="xyxy_rel", image_wh=np.array([100, 50]))))
+    pool.close()
+
+
+@pytest.mark.parametrize("start_method", [
+    pytest.param("fork", marks=pytest.mark.skipif("fork" not in multiprocessing.get_all_start_methods(),
+                                                  reason="no fork")),
+    "spawn",
+])
+def test_write_and_read_in_workers(start_method):
+    context = multiprocessing.get_context(start_method)
+    with SharedBoxPool(n_slots=2, slot_boxes=64, dtype="float64", context=context) as pool:
+        results = context.Queue()
+        processes = [context.Process(target=worker, args=(pool, results, seed)) for seed in range(2)]
+        for p in processes:
+            p.start()
+        for _ in processes:
+            seed, handle = results.get(timeout=60)
+            boxes = np.random.RandomState(seed).uniform(1, 100, size=(50, 4))
+            expected = bbox_numpy.convert(boxes, "cxcywh", "xyxy_rel", np.array([100, 50]))
+            with pool.borrow(handle, as_tensor=True) as tensor:
+                assert isinstance(tensor, torch.Tensor)
+                assert np.array_equal(tensor.numpy(), expected)
+        for p in processes:
+            p.join()
+            assert p.exitcode == 0
+
+
+def test_slots_and_lifecycle():
+    pool = SharedBoxPool(n_slots=2, slot_boxes=4)
+    boxes = np.array([[1, 2, 3, 4], [5, 6, 7, 8]])
+    first = pool.write(boxes, src="x0y0wh", dst="cxcywh")
+    second = pool.write(boxes)
+    assert pool.array(first).tolist() == bbox_numpy.convert(boxes, "xywh", "cxcywh").tolist()
+    assert pool.array(second).dtype == np.float32 and pool.array(second).tolist() == boxes.tolist()
+    with pytest.raises(TimeoutError):
+        pool.write(boxes, timeout=0.01)
+    with pytest.raises(ValueError):
+        pool.write(np.zeros((5, 4)))
+    pool.release(first)
+    third = pool.write(boxes[:1])
+    assert third.slot == first.slot and third.generation > first.generation
+    with pytest.raises(ValueError, match="released"):
+        pool.array(first)
+
+    # releasing a handle twice or a stale handle does not free the slot again
+    pool.release(first)
+    pool.release(second)
+    pool.release(second)
+    fourth = pool.write(boxes)
+    assert fourth.slot == second.slot
+    with pytest.raises(TimeoutError):
+        pool.write(boxes, timeout=0.01)
+    assert pool.array(third).tolist() == boxes[:1].tolist()
+
+    name = pool.name
+    pool.close()
+    with pytest.raises(FileNotFoundError):
+        shared_memory.SharedMemory(name=name)
@@ -4,6 +4,7 @@ Tests for `simplebbox` package.
 
 import numpy as np
 import torch
+import pytest
 from pytest import approx
 
 from simplebbox.numpy_array import bbox_numpy
@@ -201,3 +202,132 @@ def test_xyxy_rel_to_abs():
 
     assert bbox_numpy.xyxy_rel_to_abs(np.array(in_bbox), np.array(wh)) == equal_np_array([100., 200., 200., 50.])
     assert bbox_torch.xyxy_rel_to_abs(torch.tensor(in_bbox), torch.tensor(wh)) == equal_tensor([100., 200., 200., 50.])
+
+
+def test_conversions_with_out_and_inplace():
+    boxes = [[100, 200, 10, 20], [100, 200, 11, 21]]
+    wh = [[400, 200], [10, 10]]
+    conversions = [
+        "x0y0wh_to_x0y0x1y1", "x0y0x1y1_to_x0y0wh",
+        "cxcywh_to_x0y0wh", "cxcywh_to_x0y0wh_int_div",
+        "cxcywh_to_x0y0x1y1", "cxcywh_to_x0y0x1y1_int_div",
+    ]
+    for name in conversions:
+        expected = getattr(bbox_numpy, name)(np.array(boxes, dtype='float'))
+
+        out = np.empty((2, 4))
+        assert getattr(bbox_numpy, name)(np.array(boxes, dtype='float'), out=out) is out
+        assert out == equal_np_array(expected)
+
+        arr = np.array(boxes, dtype='float')
+        assert getattr(bbox_numpy, name)(arr, inplace=True) is arr
+        assert arr == equal_np_array(expected)
+
+        tensor = torch.tensor(boxes, dtype=torch.float64)
+        assert getattr(bbox_torch, name)(tensor, inplace=True) is tensor
+        assert tensor == equal_tensor(expected)
+
+    arr = np.array(boxes, dtype='float')
+    assert bbox_numpy.xyxy_abs_to_rel(arr, np.array(wh), inplace=True) is arr
+    assert arr == equal_np_array(bbox_numpy.xyxy_abs_to_rel(np.array(boxes), np.array(wh)))
+    out = torch.empty(2, 4, dtype=torch.float64)
+    assert bbox_torch.xyxy_rel_to_abs(torch.tensor(arr), torch.tensor(wh), out=out) is out
+    assert out == equal_tensor(boxes, dtype=torch.float64)
+
+
+def test_out_validation():
+    with pytest.raises(ValueError):
+        bbox_numpy.x0y0wh_to_x0y0x1y1(np.zeros((2, 4)), out=np.zeros((3, 4)))
+    with pytest.raises(ValueError):
+        bbox_numpy.x0y0wh_to_x0y0x1y1(np.zeros((2, 4)), out=np.zeros((2, 4)), inplace=True)
+
+
+def test_convert():
+    cxcywh = [[100, 200, 10, 20], [100, 200, 11, 21]]
+    x0y0wh = bbox_numpy.cxcywh_to_x0y0wh(np.array(cxcywh))
+    x0y0x1y1 = bbox_numpy.cxcywh_to_x0y0x1y1(np.array(cxcywh))
+
+    assert bbox_numpy.convert(np.array(cxcywh), "cxcywh", "x0y0wh") == equal_np_array(x0y0wh)
+    assert bbox_numpy.convert(np.array(cxcywh), "cxcywh", "xyxy") == equal_np_array(x0y0x1y1)
+    assert bbox_numpy.convert(x0y0x1y1, "x0y0x1y1", "cxcywh") == equal_np_array(cxcywh, dtype='float')
+    assert bbox_numpy.convert(x0y0wh, "x0y0wh", "cxcywh") == equal_np_array(cxcywh, dtype='float')
+    assert bbox_numpy.convert(np.array(cxcywh), "cxcywh", "cxcywh") == equal_np_array(cxcywh, dtype='int')
+    assert bbox_numpy.convert(np.array([[1, 2, 3, 4]]), "x0y0wh", "x0y0x1y1") == equal_np_array([[1, 2, 4, 6]])
+    assert bbox_numpy.convert(np.array([1, 2, 3, 4], dtype=np.float32), "xywh", "xyxy").dtype == np.float32
+
+    assert bbox_torch.convert(torch.tensor(cxcywh), "cxcywh", "x0y0x1y1") == equal_tensor(x0y0x1y1, dtype=torch.float)
+    assert bbox_torch.convert(torch.tensor([1, 2, 3, 4]), "x0y0wh", "x0y0x1y1") == equal_tensor([1, 2, 4, 6])
+
+    for box in cxcywh:
+        assert bbox_array.convert(box, "cxcywh", "x0y0wh") == approx(bbox_array.cxcywh_to_x0y0wh(box))
+        assert bbox_array.convert(tuple(box), "cxcywh", "x0y0x1y1") == approx(bbox_array.cxcywh_to_x0y0x1y1(box))
+
+
+def test_convert_relative():
+    rel = [[0.5, 0.5, 0.5, 0.25], [0.25, 0.5, 0.5, 1.]]
+    wh = [[400, 200], [10, 10]]
+    expected = [[100., 75., 300., 125.], [0., 0., 5., 10.]]
+
+    assert bbox_numpy.convert(np.array(rel), "cxcywh_rel", "xyxy_abs", np.array(wh)) == equal_np_array(expected)
+    assert bbox_numpy.convert(np.array(rel), "cxcywh_rel", "xyxy_abs", np.array([400, 200]))[0] == \
+        equal_np_array(expected[0])
+    assert bbox_numpy.convert(np.array(expected), "xyxy", "cxcywh_rel", np.array(wh)) == equal_np_array(rel)
+    assert bbox_torch.convert(torch.tensor(rel), "cxcywh_rel", "x0y0x1y1", torch.tensor(wh)) == \
+        equal_tensor(expected)
+    assert bbox_array.convert(rel[0], "cxcywh_rel", "x0y0x1y1_abs", wh[0]) == expected[0]
+    assert bbox_array.convert(expected[0], "xyxy", "xyxy_rel", wh[0]) == \
+        bbox_array.xyxy_abs_to_rel(expected[0], wh[0])
+
+    # integer absolute boxes give floating relative boxes
+    ints = [[10, 20, 30, 40]]
+    assert bbox_numpy.convert(np.array(ints), "xyxy", "xyxy_rel", np.array([100, 100])) == \
+        equal_np_array([[0.1, 0.2, 0.3, 0.4]])
+    assert bbox_numpy.convert(np.array(ints), "xyxy", "cxcywh_rel", np.array([100, 100])) == \
+        equal_np_array([[0.2, 0.3, 0.2, 0.2]])
+    assert bbox_torch.convert(torch.tensor(ints), "xyxy", "xyxy_rel", torch.tensor([100, 100])) == \
+        equal_tensor([[0.1, 0.2, 0.3, 0.4]])
+    assert bbox_torch.convert(torch.tensor(ints), "xyxy", "cxcywh_rel", torch.tensor([100, 100])) == \
+        equal_tensor([[0.2, 0.3, 0.2, 0.2]])
+
+    with pytest.raises(ValueError):
+        bbox_numpy.convert(np.array(rel), "cxcywh_rel", "xyxy")
+    with pytest.raises(ValueError):
+        bbox_numpy.convert(np.array(rel), "cxcywh", "unknown")
+
+
+def test_convert_rounds_exact_coordinates():
+    # cx - w / 2 = 94.5 and cx + w / 2 = 105.5 are rounded half to even
+    box = [100, 200, 11, 21]
+    assert bbox_array.convert(box, "cxcywh", "x0y0x1y1", convert_fn=round) == [94, 190, 106, 210]
+    assert bbox_array.convert(box, "cxcywh", "x0y0x1y1", convert_fn=round) == \
+        [round(v) for v in bbox_array.convert(box, "cxcywh", "x0y0x1y1")]
+    # the single conversion keeps the width of the rounded box
+    assert bbox_array.cxcywh_to_x0y0x1y1(box, convert_fn=round) == [94, 190, 105, 211]
+    assert bbox_array.cxcywh_to_x0y0x1y1_many([box], convert_fn=round) == [[94, 190, 105, 211]]
+    p = bbox_numpy.with_precision("int64")
+    assert p.convert(np.array([box]), "cxcywh", "x0y0x1y1").tolist() == [[94, 190, 106, 210]]
+    assert p.cxcywh_to_x0y0x1y1(np.array([box])).tolist() == [[94, 190, 105, 211]]
+
+
+def test_many_functions_match_single_box_functions():
+    boxes = [[100, 200, 10, 20], (100, 200, 11, 21), [100.5, 200.5, 10.8, 21.8], (0, 0, 0, 0)]
+    wh = (400, 200)
+    for name, args in [
+        ("x0y0wh_to_x0y0x1y1", ()),
+        ("x0y0x1y1_to_x0y0wh", ()),
+        ("cxcywh_to_x0y0wh", ()),
+        ("cxcywh_to_x0y0wh", (round,)),
+        ("cxcywh_to_x0y0wh_int_div", (int,)),
+        ("cxcywh_to_x0y0x1y1", ()),
+        ("cxcywh_to_x0y0x1y1", (round,)),
+        ("cxcywh_to_x0y0x1y1_int_div", ()),
+        ("xyxy_abs_to_rel", (wh,)),
+        ("xyxy_rel_to_abs", (wh, round)),
+    ]:
+        single = getattr(bbox_array, name)
+        many = getattr(bbox_array, name + "_many")
+        expected = [single(box, *args) for box in boxes]
+        assert many(boxes, *args) == expected
+        assert many(iter(boxes), *args) == expected
+        assert [type(box) for box in many(boxes, *args)] == [type(box) for box in boxes]
+        assert many([], *args) == []
@@ -0,0 +1,48 @@
+"""
+Tests for `simplebbox.spatial_index`.
+"""
+import numpy as np
+from pytest import approx
+
+from simplebbox.numpy_array import bbox_numpy
+from simplebbox.spatial_index import SweepIndex
+from tests.conftest import random_boxes
+
+
+def test_overlapping_pairs_match_iou_matrix():
+    boxes = random_boxes(800, 0, extent=500, max_size=40)
+    index = SweepIndex(boxes[:300], max_pairs=100)
+    index.add(boxes[300:500])
+    index.add(boxes[500:])
+    iou = bbox_numpy.iou_matrix(boxes, boxes)
+    for threshold in [0., 0.3]:
+        rows, cols, values = index.overlapping_pairs(iou_threshold=threshold)
+        expected_rows, expected_cols = np.nonzero(np.triu(iou > threshold, k=1))
+        assert rows.tolist() == expected_rows.tolist()
+        assert cols.tolist() == expected_cols.tolist()
+        assert values == approx(iou[rows, cols])
+
+
+def test_query_boxes():
+    boxes = random_boxes(500, 1, extent=500, max_size=40)
+    queries = random_boxes(40, 2, extent=500, max_size=40)
+    index = SweepIndex(boxes)
+    rows, cols, values = index.query_boxes(queries, iou_threshold=0.05)
+    iou = bbox_numpy.iou_matrix(queries, boxes)
+    expected_rows, expected_cols = np.nonzero(iou > 0.05)
+    assert rows.tolist() == expected_rows.tolist()
+    assert cols.tolist() == expected_cols.tolist()
+    assert values == approx(iou[rows, cols])
+
+
+def test_point_and_window_queries():
+    index = SweepIndex()
+    assert index.query_point(0, 0).tolist() == []
+    index.add([[0, 0, 10, 10], [5, 5, 15, 15]])
+    index.add(np.array([[20, 20, 30, 30]]))
+    assert len(index) == 3
+    assert index.query_point(7, 7).tolist() == [0, 1]
+    assert index.query_point(10, 10).tolist() == [0, 1]
+    assert index.query_point(25, 21).tolist() == [2]
+    assert index.query_window((12, 0, 21, 21)).tolist() == [1, 2]
+    assert index.query_window((40, 40, 50, 50)).tolist() == []
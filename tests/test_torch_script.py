@@ -0,0 +1,106 @@
+"""
+Tests for `simplebbox.torch_script`: the functions are compiled with `torch.jit.script`
+and compared with `bbox_torch`.
+"""
+import pytest
+import torch
+
+from simplebbox import torch_script
+from simplebbox.torch_tensor import bbox_torch
+from tests.conftest import random_boxes
+
+
+@pytest.mark.parametrize("name", [
+    "x0y0wh_to_x0y0x1y1", "x0y0x1y1_to_x0y0wh", "cxcywh_to_x0y0wh", "cxcywh_to_x0y0wh_int_div",
+    "cxcywh_to_x0y0x1y1", "cxcywh_to_x0y0x1y1_int_div",
+])
+def test_conversions(name):
+    fn = torch.jit.script(getattr(torch_script, name))
+    boxes = torch.tensor(random_boxes(50, 0))
+    for inputs in [boxes, boxes.round().to(torch.int64), boxes[0], boxes.reshape(5, 10, 4)]:
+        assert torch.equal(fn(inputs), getattr(bbox_torch, name)(inputs))
+
+
+def test_abs_rel_and_convert():
+    boxes = torch.tensor(random_boxes(50, 1))
+    image_wh = torch.tensor([640, 480])
+    assert torch.equal(torch.jit.script(torch_script.xyxy_abs_to_rel)(boxes, image_wh),
+                       bbox_torch.xyxy_abs_to_rel(boxes, image_wh))
+    assert torch.equal(torch.jit.script(torch_script.xyxy_rel_to_abs)(boxes, image_wh),
+                       bbox_torch.xyxy_rel_to_abs(boxes, image_wh))
+    convert = torch.jit.script(torch_script.convert)
+    for src in ["xyxy", "xywh", "cxcywh_rel", "x0y0x1y1_abs"]:
+        for dst in ["x0y0x1y1", "ltwh", "cxcywh", "xyxy_rel"]:
+            assert torch.allclose(convert(boxes, src, dst, image_wh), bbox_torch.convert(boxes, src, dst, image_wh))
+    with pytest.raises(Exception):
+        convert(boxes, "xyxy", "xyxy_rel", None)
+
+
+@pytest.mark.parametrize("kind", ["iou", "giou", "diou", "ciou"])
+def test_overlaps(kind):
+    a = torch.tensor(random_boxes(30, 2))
+    b = torch.tensor(random_boxes(20, 3))
+    matrix = torch.jit.script(getattr(torch_script, kind + "_matrix"))
+    assert torch.allclose(matrix(a, b), getattr(bbox_torch, kind + "_matrix")(a, b))
+    paired = torch.jit.script(getattr(torch_script, kind))
+    assert torch.allclose(paired(a[:20], b, "xyxy"), getattr(bbox_torch, kind)(a[:20], b))
+
+
+def test_iou_of_empty_union():
+    empty = torch.tensor([[5., 5., 5., 5.], [0., 0., 10., 0.]])
+    assert torch.jit.script(torch_script.iou)(empty, empty).tolist() == [0., 0.]
+
+
+def test_nms():
+    boxes, scores = map(torch.tensor, random_boxes(200, 4, scores=True))
+    nms = torch.jit.script(torch_script.nms)
+    for threshold in [0.1, 0.5]:
+        assert nms(boxes, scores, threshold).tolist() == bbox_torch.nms(boxes, scores, threshold).tolist()
+    assert len(nms(boxes[:0], scores[:0], 0.5)) == 0
+    classes = torch.arange(200) % 3
+    batched = torch.jit.script(torch_script.batched_nms)
+    assert batched(boxes, scores, classes, 0.3).tolist() == bbox_torch.batched_nms(boxes, scores, classes, 0.3).tolist()
+
+
+class Decoder(torch.nn.Module):
+    def forward(self, boxes, image_wh):
+        return torch_script.convert(boxes, "cxcywh_rel", "xyxy", image_wh)
+
+
+def test_in_scripted_and_exported_modules():
+    boxes = torch.tensor(random_boxes(10, 5))
+    image_wh = torch.tensor([640., 480.])
+    expected = bbox_torch.convert(boxes, "cxcywh_rel", "xyxy", image_wh)
+    assert torch.allclose(torch.jit.script(Decoder())(boxes, image_wh), expected)
+    exported = torch.export.export(Decoder(), (boxes, image_wh))
+    assert torch.allclose(exported.module()(boxes, image_wh), expected)
+
+
+class Postprocessor(torch.nn.Module):
+    def forward(self, boxes, scores, classes):
+        keep = torch_script.nms(boxes, scores, 0.5, "cxcywh")
+        return keep, torch_script.batched_nms(boxes, scores, classes, 0.3, "cxcywh")
+
+
+def test_nms_in_exported_module():
+    boxes, scores = map(torch.tensor, random_boxes(100, 7, scores=True))
+    boxes = bbox_torch.convert(boxes, "xyxy", "cxcywh")
+    classes = torch.arange(100) % 3
+    exported = torch.export.export(Postprocessor(), (boxes, scores, classes))
+    keep, keep_batched = exported.module()(boxes, scores, classes)
+    assert keep.tolist() == bbox_torch.nms(boxes, scores, 0.5, fmt="cxcywh").tolist()
+    assert keep_batched.tolist() == bbox_torch.batched_nms(boxes, scores, classes, 0.3, fmt="cxcywh").tolist()
+    # the graph is specialised to the number of boxes and not to the values
+    boxes, scores = map(torch.tensor, random_boxes(100, 8, scores=True))
+    boxes = bbox_torch.convert(boxes, "xyxy", "cxcywh")
+    keep, keep_batched = exported.module()(boxes, scores, classes)
+    assert keep.tolist() == bbox_torch.nms(boxes, scores, 0.5, fmt="cxcywh").tolist()
+    assert keep_batched.tolist() == bbox_torch.batched_nms(boxes, scores, classes, 0.3, fmt="cxcywh").tolist()
+
+
+def test_compile_without_graph_breaks():
+    boxes = torch.tensor(random_boxes(10, 6))
+    image_wh = torch.tensor([640., 480.])
+    compiled = torch.compile(torch_script.convert, backend="aot_eager", fullgraph=True)
+    assert torch.allclose(compiled(boxes, "cxcywh_rel", "xyxy", image_wh),
+                          bbox_torch.convert(boxes, "cxcywh_rel", "xyxy", image_wh))
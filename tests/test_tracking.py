@@ -0,0 +1,97 @@
+"""
+Tests for `simplebbox.tracking`.
+"""
+import numpy as np
+import torch
+
+from simplebbox.numpy_array import bbox_numpy
+from simplebbox.tracking import IoUTracker, _candidate_pairs, greedy_assignment
+
+
+def moving_objects(n, n_frames, seed):
+    rng = np.random.RandomState(seed)
+    xy = rng.uniform(0, 2000, size=(n, 2))
+    wh = rng.uniform(20, 60, size=(n, 2))
+    velocity = rng.uniform(-4, 4, size=(n, 2))
+    for frame in range(n_frames):
+        p = xy + velocity * frame
+        yield np.concatenate([p, p + wh], axis=1) + rng.normal(scale=0.5, size=(n, 4))
+
+
+def reference_greedy(rows, cols, weights):
+    taken, used_rows, used_cols = [], set(), set()
+    for i in np.argsort(-weights, kind="stable"):
+        if rows[i] not in used_rows and cols[i] not in used_cols:
+            taken.append(i)
+            used_rows.add(rows[i])
+            used_cols.add(cols[i])
+    return sorted(taken)
+
+
+def test_greedy_assignment():
+    rng = np.random.RandomState(0)
+    rows, cols, weights = rng.randint(0, 30, size=200), rng.randint(0, 20, size=200), rng.uniform(size=200)
+    assert greedy_assignment(rows, cols, weights).tolist() == reference_greedy(rows, cols, weights)
+    assert len(greedy_assignment([], [], [])) == 0
+
+
+def test_candidate_pairs_contain_overlaps():
+    rng = np.random.RandomState(1)
+    xy = rng.uniform(-100, 300, size=(400, 2))
+    boxes = np.concatenate([xy, xy + rng.uniform(1, 30, size=(400, 2))], axis=1)
+    rows, cols = _candidate_pairs(boxes[:150], boxes[150:])
+    expected = set(zip(*np.nonzero(bbox_numpy.iou_matrix(boxes[:150], boxes[150:]) > 0)))
+    assert expected <= set(zip(rows.tolist(), cols.tolist()))
+    assert len(rows) < 150 * 250 / 4
+
+
+def test_candidate_pairs_of_mixed_sizes():
+    rng = np.random.RandomState(2)
+    xy = rng.uniform(0, 2000, size=(3000, 2))
+    boxes = np.concatenate([xy, xy + rng.uniform(20, 60, size=(3000, 2))], axis=1)
+    boxes = np.concatenate([boxes, [[0., 0., 2000., 2000.], [500., 500., 900., 700.]]])
+    queries = boxes[::-1] + 3
+    rows, cols = _candidate_pairs(queries, boxes)
+    expected = set(zip(*np.nonzero(bbox_numpy.iou_matrix(queries, boxes) > 0)))
+    assert expected <= set(zip(rows.tolist(), cols.tolist()))
+    # the large boxes do not coarsen the grid of the small boxes into a full matrix
+    assert len(rows) < 0.01 * len(queries) * len(boxes)
+
+
+def test_identities_are_kept():
+    tracker = IoUTracker(min_hits=2, capacity=16)
+    for frame, boxes in enumerate(moving_objects(300, 20, 0)):
+        order = np.random.RandomState(frame).permutation(len(boxes))
+        res = tracker.update(torch.tensor(boxes[order]), np.full(len(boxes), 0.9))
+        if frame == 0:
+            assert len(res.ids) == 0
+        else:
+            # the object of detection i was created as track i + 1 in the first frame
+            first_order = np.random.RandomState(0).permutation(len(boxes))
+            assert res.ids.tolist() == sorted(res.ids.tolist())
+            assert (res.ids - 1 == np.argsort(first_order)[order[res.detections]]).all()
+            assert len(res.ids) == 300
+    assert tracker.capacity >= 300 and len(tracker) == 300
+
+
+def test_low_score_detections_and_expiry():
+    tracker = IoUTracker(min_hits=1, max_age=2, fmt="x0y0wh")
+    box = np.array([[10., 10., 20., 20.]])
+    assert tracker.update(box, [0.9]).ids.tolist() == [1]
+    # low score detections keep the track but do not start new ones
+    assert tracker.update(box + [2, 0, 0, 0], [0.3]).ids.tolist() == [1]
+    assert tracker.update(box + [100, 0, 0, 0], [0.3]).ids.tolist() == []
+    ids, boxes, _ = tracker.tracks
+    assert ids.tolist() == [1] and boxes[0, 2:].tolist() == [20., 20.]
+    tracker.update(box[:0], [])
+    tracker.update(box[:0], [])
+    assert len(tracker) == 0
+    assert tracker.update(box, [0.9]).ids.tolist() == [2]
+
+
+def test_labels_gate_matching():
+    tracker = IoUTracker(min_hits=1)
+    box = np.array([[0., 0., 10., 10.]])
+    tracker.update(box, [0.9], labels=[1])
+    res = tracker.update(box, [0.9], labels=[2])
+    assert res.ids.tolist() == [2] and res.labels.tolist() == [2]
@@ -0,0 +1,68 @@
+"""
+Tests for `simplebbox.transforms`.
+"""
+import numpy as np
+import pytest
+import torch
+
+from simplebbox import transforms as T
+from simplebbox.numpy_array import bbox_numpy
+from tests.conftest import random_boxes
+
+
+def test_chain_matches_step_by_step():
+    boxes = random_boxes((50,), 0, extent=500, max_size=100)
+    t = T.compose(T.letterbox((640, 480), (416, 416)), T.hflip(416), T.crop(10, 20, 300, 300))
+    s = 416 / 640
+    expected = boxes * s + [0, 52, 0, 52]
+    expected = np.stack([416 - expected[:, 2], expected[:, 1], 416 - expected[:, 0], expected[:, 3]], axis=1)
+    expected = expected - [10, 20, 10, 20]
+    assert np.allclose(t.apply(boxes), expected)
+    assert t.output_wh == (300, 300)
+    assert np.allclose(t.apply(boxes, dst="cxcywh_rel"),
+                       bbox_numpy.convert(expected, "xyxy", "cxcywh_rel", np.array([300, 300])))
+
+    rel = bbox_numpy.convert(boxes, "xyxy", "xywh_rel", np.array([640, 480]))
+    assert np.allclose(t.apply(rel, src="xywh_rel", dst="xyxy", src_wh=(640, 480)), expected)
+    with pytest.raises(ValueError):
+        t.apply(rel, src="xywh_rel")
+
+
+def test_rotation_and_projective():
+    box = np.array([[0., 0., 20., 10.]])
+    assert np.allclose(T.rotate(90).apply(box), [[0, -20, 10, 0]])
+    assert np.allclose(T.rotate(45).apply(box), [[0, -20 / 2 ** 0.5, 30 / 2 ** 0.5, 10 / 2 ** 0.5]])
+    m = np.array([[1., 0., 0.], [0., 1., 0.], [0.01, 0., 1.]])
+    corners_x = [0 / 1, 20 / 1.2, 0 / 1, 20 / 1.2]
+    corners_y = [0 / 1, 0 / 1.2, 10 / 1, 10 / 1.2]
+    expected = [[min(corners_x), min(corners_y), max(corners_x), max(corners_y)]]
+    assert np.allclose(T.affine(m).apply(box), expected)
+    assert not T.affine(m).is_axis_aligned and T.hflip(10).is_axis_aligned
+
+
+def test_per_image_parameters():
+    boxes = random_boxes((3, 20), 1, extent=500, max_size=100)
+    src_wh = np.array([[640, 480], [1280, 720], [500, 500]])
+    flip = np.array([True, False, True])
+    t = T.letterbox(src_wh, (416, 416)).then(T.affine(np.where(flip[:, None, None], T.hflip(416).matrix, np.eye(3))))
+    res = t.apply(boxes, dst="cxcywh")
+    for i in range(3):
+        single = T.letterbox(src_wh[i], (416, 416))
+        if flip[i]:
+            single = single.then(T.hflip(416))
+        assert np.allclose(res[i], single.apply(boxes[i], dst="cxcywh"))
+
+    offsets = np.array([0, 5, 5, 20])
+    flat = boxes[0, :20]
+    ragged = t.apply(flat, offsets=offsets)
+    for i in range(3):
+        single = T.BoxTransform(t.matrix[i])
+        assert np.allclose(ragged[offsets[i]:offsets[i + 1]], single.apply(flat[offsets[i]:offsets[i + 1]]))
+
+
+def test_torch_matches_numpy():
+    boxes = random_boxes((2, 10), 2, extent=500, max_size=100)
+    t = T.compose(T.resize(np.array([[640, 480], [320, 240]]), (100, 100)), T.vflip(100), T.rotate(10, (50, 50)))
+    res = t.apply(torch.tensor(boxes, dtype=torch.float32), dst="xywh")
+    assert res.dtype == torch.float32
+    assert np.allclose(res.numpy(), t.apply(boxes, dst="xywh"), atol=1e-3)